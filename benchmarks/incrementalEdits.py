@@ -0,0 +1,95 @@
+"""Measures single character edits to a generated Lox file of 50000 lines.
+
+Compares a `Document`, which scans, parses and resolves again only what an edit
+changed, with scanning, parsing and resolving the whole file after every edit.
+
+    python benchmarks/incrementalEdits.py [edits]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from incremental.document import Document  # noqa: E402
+
+LINES = 50_000
+
+FUNCTION = """fun f{0}(n) {{
+  var total = 0;
+  for (var i = 0; i < n; i = i + 1) {{
+    if (i < n / 2) total = total + i * {0}; else total = total - 1;
+  }}
+  return total;
+}}
+"""
+
+CLASS = """class C{0} {{
+  init(x) {{
+    this.x = x;
+  }}
+  scaled(k) {{
+    return this.x * k + {0};
+  }}
+}}
+var c{0} = C{0}({0});
+print c{0}.scaled(2);
+"""
+
+
+class Runtime:
+    def reportError(self, error):
+        raise SystemExit(f"error in the benchmark source: {error.message}")
+
+
+def source() -> str:
+    parts = []
+    lines = 0
+    index = 0
+    while lines < LINES:
+        part = (FUNCTION if index % 2 == 0 else CLASS).format(index)
+        parts.append(part)
+        lines += part.count("\n")
+        index += 1
+    return "".join(parts)
+
+
+def edits(text: str, count: int) -> list[tuple[int, int, str]]:
+    """Edits that keep the source valid: a digit changed, a space or a newline
+    inserted, each undone by the next edit."""
+    random.seed(0)
+    digits = [i for i, c in enumerate(text) if c.isdigit()]
+    spaces = [i for i, c in enumerate(text) if c == " "]
+    result = []
+    for _ in range(count // 2):
+        kind = random.randrange(3)
+        if kind == 0:
+            offset = random.choice(digits)
+            result.append((offset, 1, "7"))
+            result.append((offset, 1, text[offset]))
+        else:
+            offset = random.choice(spaces)
+            inserted = " " if kind == 1 else "\n"
+            result.append((offset, 0, inserted))
+            result.append((offset, 1, ""))
+    return result
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    text = source()
+    runtime = Runtime()
+    start = time.perf_counter()
+    document = Document(runtime, text)
+    whole = time.perf_counter() - start
+    changes = edits(text, count)
+    start = time.perf_counter()
+    for offset, deleted, inserted in changes:
+        document.edit(offset, deleted, inserted)
+    incremental = (time.perf_counter() - start) / len(changes)
+    assert document.source == text
+    print(f"{text.count(chr(10))} lines, {len(document.tokens)} tokens")
+    print(f"  whole file:       {whole * 1000:8.2f} ms")
+    print(f"  incremental edit: {incremental * 1000:8.2f} ms on average")
@@ -0,0 +1,57 @@
+"""Measures the memory taken by Lox instances with three fields.
+
+Compares `PloxInstance`, which lays its fields out by shape, with the layout it
+replaced: one dict of fields per instance.
+
+    python benchmarks/instanceMemory.py [count]
+"""
+
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from runtime.ploxClass import PloxClass  # noqa: E402
+from runtime.ploxInstance import PloxInstance  # noqa: E402
+from scanner.token import Token  # noqa: E402
+from scanner.tokenType import TokenType  # noqa: E402
+
+FIELDS = [Token(TokenType.IDENTIFIER, name, None, 1) for name in ("x", "y", "z")]
+
+
+class DictInstance:
+    """The previous layout of `PloxInstance`."""
+
+    def __init__(self, klass):
+        self.__klass = klass
+        self.__fields = {}
+
+    def setAttr(self, name: Token, value: object) -> None:
+        self.__fields[name.lexeme] = value
+
+
+def bytesPerInstance(create, count: int) -> float:
+    klass = PloxClass("Point", None, {})
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = []
+    for i in range(count):
+        instance = create(klass)
+        for field in FIELDS:
+            instance.setAttr(field, float(i))
+        instances.append(instance)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The values and the list holding the instances are the same for both.
+    values = sys.getsizeof(0.0) * len(FIELDS) + 8
+    return (after - before) / count - values
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    dicts = bytesPerInstance(DictInstance, count)
+    shapes = bytesPerInstance(PloxInstance, count)
+    print(f"{count} instances with {len(FIELDS)} fields, bytes per instance:")
+    print(f"  dict of fields: {dicts:7.1f}")
+    print(f"  shape:          {shapes:7.1f}")
@@ -0,0 +1,626 @@
+from typing import Any, Callable, Optional
+from parser.expr import ExprVisitor, Get, Super, Variable
+from parser.stmt import StmtVisitor
+import parser.expr as expr
+import parser.stmt as stmt
+from parser.stmt import Stmt
+from closure.closureFunction import ClosureFunction
+from runtime.environment import Environment
+from runtime.globals import Globals
+from runtime.interpreter import checkNumberOperands, isEqual, overloadedPlus
+from runtime.interpreter import arityError, stringify
+from runtime.native.natives import callbackFunctions as NATIVE_FUNCTIONS
+from runtime.ploxCallable import PloxCallable
+from runtime.ploxClass import PloxClass
+from runtime.ploxInstance import PloxInstance
+from runtime.ploxReturnException import PloxReturnException
+from runtime.ploxRuntimeError import PloxRuntimeError
+from runtime.nativeError import NativeError
+from runtime.number import asFloat
+from scanner.token import Token
+from scanner.tokenType import TokenType
+
+Closure = Callable[[Environment], Any]
+
+
+class ClosureCompiler(ExprVisitor, StmtVisitor):
+    """Execution engine that compiles the resolved AST into Python closures.
+
+    Every node is visited exactly once. The visit methods return a closure
+    taking the current `Environment`, with operators, resolved depths and
+    constants already captured, so running the program is a tree of direct
+    calls instead of `accept` double dispatch.
+    """
+
+    def __init__(self, __runtime):
+        self.__runtime = __runtime
+        self.__result = None
+        self.__globals = Globals()
+        self.__environment = Environment()
+        for name, function in NATIVE_FUNCTIONS.items():
+            self.__globals.define(name, function)
+
+    @property
+    def result(self) -> Any:
+        return self.__result
+
+    @property
+    def globals(self) -> Globals:
+        return self.__globals
+
+    def run(self, program: list[Stmt]):
+        statements = [self.__compileStatement(statement) for statement in program]
+        try:
+            for statement in statements:
+                self.__result = statement(self.__environment)
+        except PloxRuntimeError as error:
+            self.__runtime.reportError(error)
+
+    def __compileStatement(self, statement: Stmt) -> Closure:
+        return statement.accept(self)
+
+    def __compileExpression(self, expression: expr.Expr) -> Closure:
+        return expression.accept(self)
+
+    def __compileSequence(self, statements: list[Stmt]) -> Closure:
+        compiled = tuple(self.__compileStatement(statement) for statement in statements)
+        if len(compiled) == 1:
+            return compiled[0]
+
+        def sequence(environment):
+            for statement in compiled:
+                statement(environment)
+
+        return sequence
+
+    def __compileLookUp(
+        self, name: Token, expression: expr.Variable | expr.This
+    ) -> Closure:
+        distance = expression.depth
+        slot = expression.slot
+        if distance is None:
+            get = self.__globals.get
+            index = expression.index
+            return lambda environment: get(name, index)
+        if distance == 0:
+            return lambda environment: environment.values[slot]
+        if distance == 1:
+            return lambda environment: environment.enclosing.values[slot]
+        return lambda environment: environment.getAt(distance, slot)
+
+    def __compileDefine(
+        self, slot: Optional[int], name: Token
+    ) -> Callable[[Environment, Any], None]:
+        if slot is None:
+            define = self.__globals.define
+            lexeme = name.lexeme
+            return lambda environment, value: define(lexeme, value)
+        return lambda environment, value: environment.define(slot, value)
+
+    def visit_assign_expr(self, expr: expr.Assign) -> Closure:
+        value = self.__compileExpression(expr.value)
+        distance = expr.depth
+        slot = expr.slot
+        name = expr.name
+        if distance is None:
+            assign = self.__globals.assign
+            index = expr.index
+
+            def assignGlobal(environment):
+                result = value(environment)
+                assign(name, result, index)
+                return result
+
+            return assignGlobal
+
+        if distance == 0:
+
+            def assignSlot(environment):
+                result = environment.values[slot] = value(environment)
+                return result
+
+            return assignSlot
+
+        def assignLocal(environment):
+            result = value(environment)
+            environment.assignAt(distance, slot, result)
+            return result
+
+        return assignLocal
+
+    def visit_binary_expr(self, expr: expr.Binary) -> Closure:
+        left = self.__compileExpression(expr.left)
+        right = self.__compileExpression(expr.right)
+        operator = expr.operator
+        match operator.tokenType:
+            case TokenType.PLUS:
+
+                def binary(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if type(a) is float and type(b) is float:
+                        return a + b
+                    return overloadedPlus(operator, a, b)
+
+            case TokenType.MINUS:
+
+                def binary(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if type(a) is float and type(b) is float:
+                        return a - b
+                    checkNumberOperands(operator, a, b)
+                    return float(a) - float(b)
+
+            case TokenType.STAR:
+
+                def binary(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if type(a) is float and type(b) is float:
+                        return a * b
+                    checkNumberOperands(operator, a, b)
+                    return float(a) * float(b)
+
+            case TokenType.SLASH:
+
+                def binary(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    checkNumberOperands(operator, a, b)
+                    if b == 0:
+                        raise PloxRuntimeError(operator, "Cannot divide by zero.")
+                    return float(a) / float(b)
+
+            case TokenType.GREATER:
+
+                def binary(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if type(a) is float and type(b) is float:
+                        return a > b
+                    checkNumberOperands(operator, a, b)
+                    return float(a) > float(b)
+
+            case TokenType.GREATER_EQUAL:
+
+                def binary(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if type(a) is float and type(b) is float:
+                        return a >= b
+                    checkNumberOperands(operator, a, b)
+                    return float(a) >= float(b)
+
+            case TokenType.LESS:
+
+                def binary(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if type(a) is float and type(b) is float:
+                        return a < b
+                    checkNumberOperands(operator, a, b)
+                    return float(a) < float(b)
+
+            case TokenType.LESS_EQUAL:
+
+                def binary(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if type(a) is float and type(b) is float:
+                        return a <= b
+                    checkNumberOperands(operator, a, b)
+                    return float(a) <= float(b)
+
+            case TokenType.EQUAL_EQUAL:
+
+                def binary(environment):
+                    return isEqual(left(environment), right(environment))
+
+            case TokenType.BANG_EQUAL:
+
+                def binary(environment):
+                    return not isEqual(left(environment), right(environment))
+
+            case _:
+                raise PloxRuntimeError(operator, f"Unknown operator {operator.lexeme}")
+        return binary
+
+    def visit_call_expr(self, expr: expr.Call) -> Closure:
+        if isinstance(expr.callee, Get):
+            return self.__compileInvoke(expr, expr.callee)
+        if isinstance(expr.callee, Super):
+            return self.__compileSuperInvoke(expr, expr.callee)
+        if isinstance(expr.callee, Variable) and expr.callee.depth is None:
+            return self.__compileGlobalCall(expr, expr.callee)
+        callee = self.__compileExpression(expr.callee)
+        arguments = tuple(self.__compileExpression(a) for a in expr.arguments)
+        paren = expr.paren
+        interpreter = self
+
+        def call(environment):
+            function = callee(environment)
+            values = [argument(environment) for argument in arguments]
+            if not isinstance(function, PloxCallable):
+                raise PloxRuntimeError(paren, "Can only call functions and classes.")
+            if len(values) != function.arity():
+                raise arityError(paren, function, values)
+            try:
+                return function.call(interpreter, values)
+            except RecursionError:
+                raise PloxRuntimeError(paren, "Stack overflow.")
+            except NativeError as error:
+                raise PloxRuntimeError(paren, error.message)
+
+        return call
+
+    def __compileGlobalCall(self, expr: expr.Call, variable: expr.Variable) -> Closure:
+        """Compile a call of a global, which skips looking the function up and
+        checking it for as long as the global functions stay the same."""
+        callee = self.__compileExpression(variable)
+        arguments = tuple(self.__compileExpression(a) for a in expr.arguments)
+        paren = expr.paren
+        interpreter = self
+        globals = self.__globals
+        cachedVersion = -1
+        cachedFunction = None
+
+        def call(environment):
+            nonlocal cachedVersion, cachedFunction
+            if cachedVersion == globals.version:
+                function = cachedFunction
+                values = [argument(environment) for argument in arguments]
+            else:
+                function = callee(environment)
+                values = [argument(environment) for argument in arguments]
+                if not isinstance(function, PloxCallable):
+                    raise PloxRuntimeError(
+                        paren, "Can only call functions and classes."
+                    )
+                if len(values) != function.arity():
+                    raise arityError(paren, function, values)
+                cachedVersion = globals.version
+                cachedFunction = function
+            try:
+                return function.call(interpreter, values)
+            except RecursionError:
+                raise PloxRuntimeError(paren, "Stack overflow.")
+            except NativeError as error:
+                raise PloxRuntimeError(paren, error.message)
+
+        return call
+
+    def __compileInvoke(self, expr: expr.Call, get: expr.Get) -> Closure:
+        """Compile `obj.name(...)` so that it calls the method with `obj` as the
+        receiver instead of binding the method first."""
+        obj = self.__compileExpression(get.obj)
+        arguments = tuple(self.__compileExpression(a) for a in expr.arguments)
+        name = get.name
+        cache = get.cache
+        paren = expr.paren
+        interpreter = self
+
+        def invoke(environment):
+            instance = obj(environment)
+            if not isinstance(instance, PloxInstance):
+                raise PloxRuntimeError(name, "Only instances have properties.")
+            method = instance.getMethod(name, cache)
+            if method is None:
+                # A field, which can hold any value, or an undefined property.
+                function = instance.getAttr(name, cache)
+                values = [argument(environment) for argument in arguments]
+                if not isinstance(function, PloxCallable):
+                    raise PloxRuntimeError(
+                        paren, "Can only call functions and classes."
+                    )
+                if len(values) != function.arity():
+                    raise arityError(paren, function, values)
+                try:
+                    return function.call(interpreter, values)
+                except RecursionError:
+                    raise PloxRuntimeError(paren, "Stack overflow.")
+                except NativeError as error:
+                    raise PloxRuntimeError(paren, error.message)
+            values = [argument(environment) for argument in arguments]
+            if len(values) != method.arity():
+                raise arityError(paren, method, values)
+            try:
+                return method.invoke(interpreter, instance, values)
+            except RecursionError:
+                raise PloxRuntimeError(paren, "Stack overflow.")
+
+        return invoke
+
+    def __compileSuperInvoke(self, expr: expr.Call, superExpr: expr.Super) -> Closure:
+        distance = superExpr.depth
+        slot = superExpr.slot
+        method = superExpr.method
+        cache = superExpr.cache
+        arguments = tuple(self.__compileExpression(a) for a in expr.arguments)
+        paren = expr.paren
+        interpreter = self
+
+        def superInvoke(environment):
+            superclass = environment.getAt(distance, slot)
+            obj = environment.getAt(distance - 1, 0)
+            function = cache.lookup(superclass, method.lexeme)
+            if function is None:
+                raise PloxRuntimeError(method, f"Undefined property {method.lexeme}.")
+            values = [argument(environment) for argument in arguments]
+            if len(values) != function.arity():
+                raise arityError(paren, function, values)
+            try:
+                return function.invoke(interpreter, obj, values)
+            except RecursionError:
+                raise PloxRuntimeError(paren, "Stack overflow.")
+
+        return superInvoke
+
+    def visit_comma_expr(self, expr: expr.Comma) -> Closure:
+        expressions = tuple(self.__compileExpression(e) for e in expr.expressions)
+
+        def comma(environment):
+            for expression in expressions:
+                value = expression(environment)
+            return value
+
+        return comma
+
+    def visit_get_expr(self, expr: expr.Get) -> Closure:
+        obj = self.__compileExpression(expr.obj)
+        name = expr.name
+        cache = expr.cache
+
+        def get(environment):
+            instance = obj(environment)
+            if isinstance(instance, PloxInstance):
+                return instance.getAttr(name, cache)
+            raise PloxRuntimeError(name, "Only instances have properties.")
+
+        return get
+
+    def visit_grouping_expr(self, expr: expr.Grouping) -> Closure:
+        return self.__compileExpression(expr.expression)
+
+    def visit_literal_expr(self, expr: expr.Literal) -> Closure:
+        value = asFloat(expr.value)
+        return lambda environment: value
+
+    def visit_logical_expr(self, expr: expr.Logical) -> Closure:
+        left = self.__compileExpression(expr.left)
+        right = self.__compileExpression(expr.right)
+        if expr.operator.tokenType == TokenType.OR:
+
+            def logical(environment):
+                value = left(environment)
+                if value is None or value is False:
+                    return right(environment)
+                return value
+
+        else:
+
+            def logical(environment):
+                value = left(environment)
+                if value is None or value is False:
+                    return value
+                return right(environment)
+
+        return logical
+
+    def visit_set_expr(self, expr: expr.Set) -> Closure:
+        obj = self.__compileExpression(expr.obj)
+        value = self.__compileExpression(expr.value)
+        name = expr.name
+
+        def setExpr(environment):
+            instance = obj(environment)
+            if not isinstance(instance, PloxInstance):
+                raise PloxRuntimeError(name, "Only instances have fields.")
+            result = value(environment)
+            instance.setAttr(name, result)
+            return result
+
+        return setExpr
+
+    def visit_super_expr(self, expr: expr.Super) -> Closure:
+        distance = expr.depth
+        slot = expr.slot
+        method = expr.method
+        cache = expr.cache
+
+        def superExpr(environment):
+            superclass = environment.getAt(distance, slot)
+            obj = environment.getAt(distance - 1, 0)
+            function = cache.lookup(superclass, method.lexeme)
+            if function is None:
+                raise PloxRuntimeError(method, f"Undefined property {method.lexeme}.")
+            return function.bind(obj)
+
+        return superExpr
+
+    def visit_this_expr(self, expr: expr.This) -> Closure:
+        return self.__compileLookUp(expr.keyword, expr)
+
+    def visit_unary_expr(self, expr: expr.Unary) -> Closure:
+        right = self.__compileExpression(expr.right)
+        operator = expr.operator
+        if operator.tokenType == TokenType.MINUS:
+
+            def unary(environment):
+                value = right(environment)
+                if not isinstance(value, (float, int)):
+                    raise PloxRuntimeError(operator, "Operand must be a number.")
+                return -float(value)
+
+        else:
+
+            def unary(environment):
+                value = right(environment)
+                return value is None or value is False
+
+        return unary
+
+    def visit_variable_expr(self, expr: expr.Variable) -> Closure:
+        return self.__compileLookUp(expr.name, expr)
+
+    def visit_block_stmt(self, stmt: stmt.Block) -> Closure:
+        body = self.__compileSequence(stmt.statements)
+        size = stmt.size
+        if size == 0:
+            # Nothing is declared, so the block shares the enclosing environment.
+            return body
+        if stmt.escapes:
+
+            def block(environment):
+                body(Environment(environment, size))
+
+            return block
+        # No closure can hold on to the environment once the block is left, so
+        # it goes back to a pool. A block left by an exception simply does not
+        # return its environment, and recursion takes a fresh one.
+        pool: list[Environment] = []
+
+        def pooledBlock(environment):
+            scope = pool.pop() if pool else Environment(None, size)
+            scope.enclosing = environment
+            body(scope)
+            pool.append(scope)
+
+        return pooledBlock
+
+    def visit_class_stmt(self, stmt: stmt.Class) -> Closure:
+        superclassExpr = None
+        if stmt.superclass is not None:
+            superclassExpr = self.__compileExpression(stmt.superclass)
+        name = stmt.name
+        define = self.__compileDefine(stmt.slot, stmt.name)
+        methods = [
+            (
+                method.name.lexeme,
+                len(method.params),
+                method.size,
+                self.__compileSequence(method.body),
+            )
+            for method in stmt.methods
+        ]
+
+        def klass(environment):
+            superclass = None
+            if superclassExpr is not None:
+                superclass = superclassExpr(environment)
+                if not isinstance(superclass, PloxClass):
+                    assert stmt.superclass is not None
+                    raise PloxRuntimeError(
+                        stmt.superclass.name, "Superclass must be a class."
+                    )
+            define(environment, None)
+            closure = environment
+            if superclass is not None:
+                closure = Environment(environment, 1)
+                closure.define(0, superclass)
+            functions = {
+                methodName: ClosureFunction(
+                    methodName, arity, size, body, closure, methodName == "init"
+                )
+                for methodName, arity, size, body in methods
+            }
+            define(environment, PloxClass(name.lexeme, superclass, functions))
+
+        return klass
+
+    def visit_expression_stmt(self, stmt: stmt.Expression) -> Closure:
+        return self.__compileExpression(stmt.expression)
+
+    def visit_function_stmt(self, stmt: stmt.Function) -> Closure:
+        name = stmt.name.lexeme
+        arity = len(stmt.params)
+        size = stmt.size
+        body = self.__compileSequence(stmt.body)
+        define = self.__compileDefine(stmt.slot, stmt.name)
+
+        def function(environment):
+            define(
+                environment,
+                ClosureFunction(name, arity, size, body, environment, False, stmt),
+            )
+
+        return function
+
+    def visit_if_stmt(self, stmt: stmt.If) -> Closure:
+        condition = self.__compileExpression(stmt.condition)
+        thenBranch = self.__compileStatement(stmt.thenBranch)
+        if stmt.elseBranch is None:
+
+            def ifThen(environment):
+                value = condition(environment)
+                if value is not None and value is not False:
+                    thenBranch(environment)
+
+            return ifThen
+        elseBranch = self.__compileStatement(stmt.elseBranch)
+
+        def ifThenElse(environment):
+            value = condition(environment)
+            if value is not None and value is not False:
+                thenBranch(environment)
+            else:
+                elseBranch(environment)
+
+        return ifThenElse
+
+    def visit_print_stmt(self, stmt: stmt.Print) -> Closure:
+        expression = self.__compileExpression(stmt.expression)
+
+        def printStmt(environment):
+            print(stringify(expression(environment)))
+
+        return printStmt
+
+    def visit_return_stmt(self, stmt: stmt.Return) -> Closure:
+        if stmt.value is None:
+
+            def returnNil(environment):
+                raise PloxReturnException(None)
+
+            return returnNil
+        value = self.__compileExpression(stmt.value)
+
+        def returnValue(environment):
+            raise PloxReturnException(value(environment))
+
+        return returnValue
+
+    def visit_var_stmt(self, stmt: stmt.Var) -> Closure:
+        slot = stmt.slot
+        initializer = None
+        if stmt.initializer is not None:
+            initializer = self.__compileExpression(stmt.initializer)
+        if slot is None:
+            define = self.__compileDefine(slot, stmt.name)
+            if initializer is None:
+                return lambda environment: define(environment, None)
+            return lambda environment: define(environment, initializer(environment))
+        if initializer is None:
+
+            def var(environment):
+                environment.values[slot] = None
+
+            return var
+
+        def varInit(environment):
+            environment.values[slot] = initializer(environment)
+
+        return varInit
+
+    def visit_while_stmt(self, stmt: stmt.While) -> Closure:
+        condition = self.__compileExpression(stmt.condition)
+        body = self.__compileStatement(stmt.body)
+
+        def whileStmt(environment):
+            while True:
+                value = condition(environment)
+                if value is None or value is False:
+                    return
+                body(environment)
+
+        return whileStmt
@@ -0,0 +1,75 @@
+from typing import Any, Callable, Optional
+from parser.stmt import Function
+from runtime.ploxCallable import PloxCallable
+from runtime.ploxInstance import PloxInstance
+from runtime.ploxReturnException import PloxReturnException
+from runtime.environment import Environment
+
+
+class ClosureFunction(PloxCallable):
+    """A Lox function whose body has been compiled into a Python closure."""
+
+    def __init__(
+        self,
+        name: str,
+        arity: int,
+        size: int,
+        body: Callable[[Environment], Any],
+        closure: Environment,
+        isInitializer: bool,
+        declaration: Optional[Function] = None,
+    ):
+        self.__name = name
+        self.__arity = arity
+        self.__size = size
+        self.__body = body
+        self.__closure = closure
+        self.__isInitializer = isInitializer
+        # The declaration of a function other than a method, whose purity the
+        # resolver revises as later declarations are resolved.
+        self.__declaration = declaration
+
+    def __str__(self) -> str:
+        return f"< fn {self.__name} >"
+
+    def arity(self) -> int:
+        return self.__arity
+
+    @property
+    def pure(self) -> bool:
+        return self.__declaration is not None and self.__declaration.pure
+
+    def bind(self, instance: PloxInstance) -> "ClosureFunction":
+        environment = Environment(self.__closure, 1)
+        environment.define(0, instance)
+        return ClosureFunction(
+            self.__name,
+            self.__arity,
+            self.__size,
+            self.__body,
+            environment,
+            self.__isInitializer,
+        )
+
+    def call(self, interpreter, arguments: list[Any]) -> Any:
+        environment = Environment(self.__closure, self.__size)
+        environment.values[: len(arguments)] = arguments
+        try:
+            self.__body(environment)
+        except PloxReturnException as ploxReturnException:
+            if self.__isInitializer:
+                return self.__closure.values[0]
+            return ploxReturnException.value
+
+    def invoke(self, interpreter, this: PloxInstance, arguments: list[Any]) -> Any:
+        """Call the method on `this` without creating a bound copy of it first."""
+        receiver = Environment(self.__closure, 1)
+        receiver.values[0] = this
+        environment = Environment(receiver, self.__size)
+        environment.values[: len(arguments)] = arguments
+        try:
+            self.__body(environment)
+        except PloxReturnException as ploxReturnException:
+            if self.__isInitializer:
+                return this
+            return ploxReturnException.value
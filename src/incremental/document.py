@@ -0,0 +1,142 @@
+from bisect import bisect_left
+from typing import Iterator, Optional
+from parser.parser import Parser
+from parser.parseError import ParseError
+from parser.stmt import Stmt
+from resolver.resolveError import ResolveError
+from resolver.resolver import Resolver
+from runtime.globals import Globals
+from scanner.scanError import ScanError
+from scanner.scanner import Scanner
+from scanner.tokenBuffer import TokenBuffer
+from scanner.token import Token
+
+
+class Document:
+    """A source kept scanned, parsed and resolved while it is edited, for an
+    editor or a runner watching a file.
+
+    An edit is scanned again only where it changed the tokens, and only the
+    top level declarations made of changed tokens are parsed and resolved
+    again. The other ones are kept, moved to their new lines. `program` holds
+    the declarations, each resolved on its own as a prompt line is.
+
+    Errors are reported to `runtime`. After an edit that leaves errors, the
+    next one processes the whole source again.
+    """
+
+    def __init__(self, runtime, source: str, globals: Optional[Globals] = None):
+        self.__runtime = runtime
+        self.__globals = globals
+        self.__load(source)
+
+    @property
+    def source(self) -> str:
+        return self.__source
+
+    @property
+    def tokens(self) -> TokenBuffer:
+        return self.__tokens
+
+    @property
+    def program(self) -> list[Stmt]:
+        return self.__program
+
+    @property
+    def hadError(self) -> bool:
+        return self.__hadError
+
+    def edit(self, offset: int, deleted: int, inserted: str):
+        """Replace `deleted` characters at `offset` with `inserted`."""
+        source = self.__source
+        if self.__hadError:
+            self.__load(source[:offset] + inserted + source[offset + deleted :])
+            return
+        try:
+            damage = Scanner(self).relex(self.__tokens, offset, deleted, inserted)
+        except ScanError as error:
+            self.__source = source[:offset] + inserted + source[offset + deleted :]
+            self.reportError(error)
+            return
+        self.__source = self.__tokens.source
+        # A declaration is kept if neither it nor the token after it, which the
+        # parser looks at to end it, changed.
+        kept = bisect_left(self.__ends, damage.first)
+        first = self.__ends[kept - 1] if kept else 0
+        program = self.__program[:kept]
+        starts = self.__starts[:kept]
+        ends = self.__ends[:kept]
+        parsed = self.__parsed[:kept]
+        moved = damage.newEnd - damage.oldEnd
+        for declaration, start, end, tokens in self.__parse(first):
+            program.append(declaration)
+            starts.append(start)
+            ends.append(end)
+            parsed.append(tokens)
+            if end < damage.newEnd:
+                continue
+            # The declarations after the changed tokens are parsed the same as
+            # before the edit once one starts where one did before.
+            index = bisect_left(self.__starts, end - moved)
+            if index < len(self.__starts) and self.__starts[index] == end - moved:
+                if damage.lines:
+                    for tokens in self.__parsed[index:]:
+                        for token in tokens:
+                            token.line += damage.lines
+                program.extend(self.__program[index:])
+                starts.extend(s + moved for s in self.__starts[index:])
+                ends.extend(e + moved for e in self.__ends[index:])
+                parsed.extend(self.__parsed[index:])
+                break
+        self.__program = program
+        self.__starts = starts
+        self.__ends = ends
+        self.__parsed = parsed
+
+    def reportError(self, error: ScanError | ParseError | ResolveError):
+        self.__hadError = True
+        self.__runtime.reportError(error)
+
+    def __load(self, source: str):
+        self.__source = source
+        self.__hadError = False
+        self.__program = []
+        self.__starts: list[int] = []
+        self.__ends: list[int] = []
+        self.__parsed: list[list[Token]] = []
+        scanner = Scanner(self)
+        scanner.run(source)
+        self.__tokens = scanner.tokens
+        if self.__hadError:
+            return
+        for declaration, start, end, tokens in self.__parse(0):
+            self.__program.append(declaration)
+            self.__starts.append(start)
+            self.__ends.append(end)
+            self.__parsed.append(tokens)
+
+    def __parse(self, first: int) -> Iterator[tuple[Stmt, int, int, list[Token]]]:
+        """Parse and resolve the declarations from the token at `first` on,
+        with the indexes of their first token and of the one after their last,
+        and the tokens they were parsed from, for their lines to be moved."""
+        parser = Parser(self)
+        tokens: list[Token] = []
+        pulled = self.__pull(self.__tokens.tokensFrom(first), tokens)
+        start = first
+        for declaration in parser.stream(pulled):
+            self.__resolve(declaration)
+            end = first + parser.position
+            # The parser has pulled the token after the declaration as well.
+            yield declaration, start, end, tokens[: end - start]
+            del tokens[: end - start]
+            start = end
+
+    def __pull(self, source: Iterator[Token], into: list[Token]) -> Iterator[Token]:
+        for token in source:
+            into.append(token)
+            yield token
+
+    def __resolve(self, declaration: Stmt):
+        # A declaration with syntax errors can have holes in its tree.
+        if not self.__hadError:
+            Resolver(self, self.__globals).run([declaration])
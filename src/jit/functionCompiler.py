@@ -0,0 +1,314 @@
+import math
+from typing import Any, Callable
+from parser.expr import ExprVisitor
+from parser.stmt import StmtVisitor
+import parser.expr as expr
+import parser.stmt as stmt
+from parser.stmt import Stmt
+from resolver.accessType import AccessType
+from runtime.globals import Globals
+from runtime.inlineCache import InlineCache
+from runtime.number import MAX_INTEGER
+from scanner.token import Token
+from scanner.tokenType import TokenType
+from transpiler.transpiler import isBoolean
+from jit.support import NAMESPACE
+from jit.unsupported import Unsupported
+
+# Int sums and differences are computed inline while they stay exact, anything
+# else is left to the helper implementing the full Lox semantics.
+ARITHMETIC = {
+    TokenType.PLUS: ("+", "add"),
+    TokenType.MINUS: ("-", "subtract"),
+}
+
+COMPARISONS = {
+    TokenType.GREATER: ">",
+    TokenType.GREATER_EQUAL: ">=",
+    TokenType.LESS: "<",
+    TokenType.LESS_EQUAL: "<=",
+}
+
+
+class FunctionCompiler(ExprVisitor, StmtVisitor):
+    """Compiles the body of one Lox function into a Python function that the
+    `Interpreter` runs in place of `Interpreter.executeFunction`.
+
+    The Python function takes the interpreter, the frame of the call and the
+    cells of the closure, and ends like `executeFunction` does. Slots become
+    Python locals and upvalues are read from the cells directly. Functions that
+    declare functions or classes, or use `super`, are not compiled.
+    """
+
+    def __init__(self, globals: Globals):
+        self.__globals = globals
+        self.__lines: list[str] = []
+        self.__indent = 0
+        self.__temporaries = 0
+        self.__constants: dict[str, Any] = {}
+
+    def compile(self, function: stmt.Function) -> Callable:
+        if function.cells:
+            raise Unsupported("its parameters are captured")
+        self.__emit("def compiled(I, frame, cells):")
+        self.__indent += 1
+        slots = [f"s{index}" for index in range(function.frameSize)]
+        if slots:
+            self.__emit(f"{', '.join(slots)}, = frame")
+        cells = [f"u{index}" for index in range(len(function.upvalues))]
+        if cells:
+            self.__emit(f"{', '.join(cells)}, = cells")
+        self.__indent -= 1
+        self.__emitBody(function.body)
+        namespace = dict(NAMESPACE)
+        namespace.update(self.__constants)
+        namespace["G"] = self.__globals
+        namespace["V"] = self.__globals.values
+        source = "\n".join(self.__lines) + "\n"
+        try:
+            code = compile(source, f"<jit {function.name.lexeme}>", "exec")
+        except (SyntaxError, RecursionError, MemoryError):
+            raise Unsupported("it nests too deeply")
+        exec(code, namespace)
+        return namespace["compiled"]
+
+    def __emit(self, line: str):
+        self.__lines.append("    " * self.__indent + line)
+
+    def __emitBody(self, statements: list[Stmt]):
+        self.__indent += 1
+        start = len(self.__lines)
+        for statement in statements:
+            statement.accept(self)
+        if len(self.__lines) == start:
+            self.__emit("pass")
+        self.__indent -= 1
+
+    def __expression(self, expression: expr.Expr) -> str:
+        return expression.accept(self)
+
+    def __temporary(self, prefix: str) -> str:
+        self.__temporaries += 1
+        return f"{prefix}{self.__temporaries}"
+
+    def __constant(self, value: Token | InlineCache | float) -> str:
+        name = f"k{len(self.__constants)}"
+        self.__constants[name] = value
+        return name
+
+    def __condition(self, expression: expr.Expr) -> str:
+        """Python text for the Lox truthiness of `expression`."""
+        if isBoolean(expression):
+            return self.__expression(expression)
+        temporary = self.__temporary("x")
+        code = self.__expression(expression)
+        return f"(({temporary} := {code}) is not None and {temporary} is not False)"
+
+    def __read(self, expression: expr.Variable | expr.This, name: Token) -> str:
+        access = expression.access
+        if access is AccessType.LOCAL:
+            return f"s{expression.index}"
+        if access is AccessType.UPVALUE:
+            return f"u{expression.index}.value"
+        if access is AccessType.GLOBAL:
+            x = self.__temporary("x")
+            index = self.__globalSlot(expression, name)
+            token = self.__constant(name)
+            return (
+                f"({x} if ({x} := V[{index}]) is not UNDEFINED "
+                f"else undefined({token}))"
+            )
+        raise Unsupported("its locals are captured")
+
+    def __globalSlot(
+        self, expression: expr.Variable | expr.Assign | expr.This, name: Token
+    ) -> int:
+        if expression.index is None:
+            return self.__globals.slot(name.lexeme)
+        return expression.index
+
+    def __arguments(self, call: expr.Call) -> str:
+        arguments = [self.__expression(argument) for argument in call.arguments]
+        return f"[{', '.join(arguments)}]"
+
+    def __call(self, helper: str, call: expr.Call) -> str:
+        paren = self.__constant(call.paren)
+        callee = call.callee
+        if isinstance(callee, expr.Get):
+            obj = self.__expression(callee.obj)
+            name = self.__constant(callee.name)
+            cache = self.__constant(callee.cache)
+            function = f"*method({obj}, {name}, {cache})"
+        elif isinstance(callee, expr.Super):
+            raise Unsupported("it uses super")
+        else:
+            function = f"{self.__expression(callee)}, None"
+        return f"{helper}(I, {paren}, {function}, {self.__arguments(call)})"
+
+    def visit_assign_expr(self, expr: expr.Assign) -> str:
+        value = self.__expression(expr.value)
+        access = expr.access
+        if access is AccessType.LOCAL:
+            return f"(s{expr.index} := {value})"
+        if access is AccessType.UPVALUE:
+            return f"assignCell(u{expr.index}, {value})"
+        if access is AccessType.GLOBAL:
+            token = self.__constant(expr.name)
+            index = self.__globalSlot(expr, expr.name)
+            return f"assignGlobal(G, {token}, {value}, {index})"
+        raise Unsupported("its locals are captured")
+
+    def visit_binary_expr(self, expr: expr.Binary) -> str:
+        tokenType = expr.operator.tokenType
+        left = self.__expression(expr.left)
+        right = self.__expression(expr.right)
+        if tokenType == TokenType.EQUAL_EQUAL:
+            return f"isEqual({left}, {right})"
+        if tokenType == TokenType.BANG_EQUAL:
+            return f"(not isEqual({left}, {right}))"
+        operator = self.__constant(expr.operator)
+        if tokenType == TokenType.SLASH:
+            return f"divide({operator}, {left}, {right})"
+        # Both operands are evaluated before the types are compared.
+        l, r = self.__temporary("l"), self.__temporary("r")
+        operands = f"type({l} := {left}) is type({r} := {right})"
+        if tokenType in ARITHMETIC:
+            v = self.__temporary("v")
+            op, helper = ARITHMETIC[tokenType]
+            return (
+                f"({v} if {operands} is int and "
+                f"-{MAX_INTEGER} <= ({v} := {l} {op} {r}) <= {MAX_INTEGER} "
+                f"else {helper}({operator}, {l}, {r}))"
+            )
+        if tokenType == TokenType.STAR:
+            return (
+                f"({l} * {r} if {operands} is float "
+                f"else multiply({operator}, {l}, {r}))"
+            )
+        op = COMPARISONS[tokenType]
+        return (
+            f"({l} {op} {r} if {operands} in NUMBERS "
+            f"else binary({operator}, {l}, {r}))"
+        )
+
+    def visit_call_expr(self, expr: expr.Call) -> str:
+        return self.__call("call", expr)
+
+    def visit_comma_expr(self, expr: expr.Comma) -> str:
+        values = [self.__expression(e) for e in expr.expressions]
+        return f"({', '.join(values)},)[-1]"
+
+    def visit_get_expr(self, expr: expr.Get) -> str:
+        obj = self.__expression(expr.obj)
+        name = self.__constant(expr.name)
+        return f"getAttr({obj}, {name}, {self.__constant(expr.cache)})"
+
+    def visit_grouping_expr(self, expr: expr.Grouping) -> str:
+        return f"({self.__expression(expr.expression)})"
+
+    def visit_literal_expr(self, expr: expr.Literal) -> str:
+        value = expr.value
+        if type(value) is float and not math.isfinite(value):
+            return self.__constant(value)
+        return repr(value)
+
+    def visit_logical_expr(self, expr: expr.Logical) -> str:
+        x = self.__temporary("x")
+        left = self.__expression(expr.left)
+        right = self.__expression(expr.right)
+        truthy = f"({x} := {left}) is not None and {x} is not False"
+        if expr.operator.tokenType == TokenType.OR:
+            return f"({x} if {truthy} else {right})"
+        return f"({right} if {truthy} else {x})"
+
+    def visit_set_expr(self, expr: expr.Set) -> str:
+        name = self.__constant(expr.name)
+        obj = f"instance({self.__expression(expr.obj)}, {name})"
+        return f"setAttr({obj}, {name}, {self.__expression(expr.value)})"
+
+    def visit_super_expr(self, expr: expr.Super) -> str:
+        raise Unsupported("it uses super")
+
+    def visit_this_expr(self, expr: expr.This) -> str:
+        return self.__read(expr, expr.keyword)
+
+    def visit_unary_expr(self, expr: expr.Unary) -> str:
+        if expr.operator.tokenType == TokenType.BANG:
+            return f"(not {self.__condition(expr.right)})"
+        x = self.__temporary("x")
+        right = self.__expression(expr.right)
+        operator = self.__constant(expr.operator)
+        return f"(-{x} if type({x} := {right}) is float else negate({operator}, {x}))"
+
+    def visit_variable_expr(self, expr: expr.Variable) -> str:
+        return self.__read(expr, expr.name)
+
+    # Nodes the interpreter has specialized compile like the generic ones.
+    visit_float_binary_expr = visit_binary_expr
+    visit_int_arithmetic_expr = visit_binary_expr
+    visit_int_comparison_expr = visit_binary_expr
+    visit_local_variable_expr = visit_variable_expr
+    visit_cell_variable_expr = visit_variable_expr
+    visit_upvalue_variable_expr = visit_variable_expr
+    visit_direct_call_expr = visit_call_expr
+
+    def visit_block_stmt(self, stmt: stmt.Block):
+        for statement in stmt.statements:
+            statement.accept(self)
+
+    def visit_class_stmt(self, stmt: stmt.Class):
+        raise Unsupported("it declares a class")
+
+    def visit_expression_stmt(self, stmt: stmt.Expression):
+        expression = stmt.expression
+        if not isinstance(expression, expr.Assign):
+            self.__emit(self.__expression(expression))
+            return
+        value = self.__expression(expression.value)
+        access = expression.access
+        if access is AccessType.LOCAL:
+            self.__emit(f"s{expression.index} = {value}")
+        elif access is AccessType.UPVALUE:
+            self.__emit(f"u{expression.index}.value = {value}")
+        elif access is AccessType.GLOBAL:
+            token = self.__constant(expression.name)
+            index = self.__globalSlot(expression, expression.name)
+            self.__emit(f"G.assign({token}, {value}, {index})")
+        else:
+            raise Unsupported("its locals are captured")
+
+    def visit_function_stmt(self, stmt: stmt.Function):
+        raise Unsupported("it declares a function")
+
+    def visit_if_stmt(self, stmt: stmt.If):
+        self.__emit(f"if {self.__condition(stmt.condition)}:")
+        self.__emitBody([stmt.thenBranch])
+        if stmt.elseBranch is not None:
+            self.__emit("else:")
+            self.__emitBody([stmt.elseBranch])
+
+    def visit_print_stmt(self, stmt: stmt.Print):
+        self.__emit(f"print(stringify({self.__expression(stmt.expression)}))")
+
+    def visit_return_stmt(self, stmt: stmt.Return):
+        value = stmt.value
+        if isinstance(value, expr.Call) and value.tail:
+            self.__emit(f"return {self.__call('tailCall', value)}")
+            return
+        if value is None:
+            self.__emit("I.returnValue = None")
+        else:
+            self.__emit(f"I.returnValue = {self.__expression(value)}")
+        self.__emit("return RETURN")
+
+    def visit_var_stmt(self, stmt: stmt.Var):
+        if stmt.captured:
+            raise Unsupported("its locals are captured")
+        value = "None"
+        if stmt.initializer is not None:
+            value = self.__expression(stmt.initializer)
+        self.__emit(f"s{stmt.index} = {value}")
+
+    def visit_while_stmt(self, stmt: stmt.While):
+        self.__emit(f"while {self.__condition(stmt.condition)}:")
+        self.__emitBody([stmt.body])
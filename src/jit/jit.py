@@ -0,0 +1,72 @@
+import sys
+import time
+import parser.stmt as stmt
+from runtime.globals import Globals
+from jit.functionCompiler import FunctionCompiler
+from jit.unsupported import Unsupported
+
+CALL_THRESHOLD = 100
+BACK_EDGE_THRESHOLD = 1000
+
+
+class Jit:
+    """Counts the calls of every Lox function and the iterations of the loops
+    in it, and compiles the function to Python once either count reaches its
+    threshold. The interpreter runs the compiled function from its next call
+    on, and keeps interpreting the functions that cannot be compiled.
+    """
+
+    def __init__(
+        self,
+        callThreshold: int = CALL_THRESHOLD,
+        backEdgeThreshold: int = BACK_EDGE_THRESHOLD,
+        log: bool = False,
+    ):
+        self.__callThreshold = callThreshold
+        self.__backEdgeThreshold = backEdgeThreshold
+        self.__log = log
+        self.__calls: dict[stmt.Function, int] = {}
+        self.__backEdges: dict[stmt.Function, int] = {}
+        self.__rejected: set[stmt.Function] = set()
+        self.__compileTime = 0.0
+
+    def countCall(self, function: stmt.Function, globals: Globals) -> bool:
+        """Count a call of `function` and return whether it has been compiled
+        for it."""
+        if function in self.__rejected:
+            return False
+        calls = self.__calls.get(function, 0) + 1
+        self.__calls[function] = calls
+        if (
+            calls < self.__callThreshold
+            and self.__backEdges.get(function, 0) < self.__backEdgeThreshold
+        ):
+            return False
+        return self.__promote(function, globals)
+
+    def countBackEdges(self, function: stmt.Function, count: int):
+        self.__backEdges[function] = self.__backEdges.get(function, 0) + count
+
+    def __promote(self, function: stmt.Function, globals: Globals) -> bool:
+        start = time.perf_counter()
+        try:
+            function.compiled = FunctionCompiler(globals).compile(function)
+        except Unsupported as error:
+            self.__rejected.add(function)
+            self.__report(function, f"kept in the interpreter: {error.reason}")
+            return False
+        elapsed = time.perf_counter() - start
+        self.__compileTime += elapsed
+        self.__report(
+            function,
+            f"compiled after {self.__calls[function]} calls and "
+            f"{self.__backEdges.get(function, 0)} loop iterations "
+            f"in {elapsed * 1000:.2f} ms ({self.__compileTime * 1000:.2f} ms "
+            "in total)",
+        )
+        return True
+
+    def __report(self, function: stmt.Function, message: str):
+        if self.__log:
+            name = function.name
+            print(f"jit: {name.lexeme} (line {name.line}) {message}", file=sys.stderr)
@@ -0,0 +1,129 @@
+from typing import Any, Optional
+from runtime.completion import RETURN, TAIL_CALL, Completion
+from runtime.globals import UNDEFINED
+from runtime.inlineCache import InlineCache
+from runtime.interpreter import arityError, binary, divide, isEqual, multiply
+from runtime.interpreter import negate, overloadedPlus, stringify, subtract
+from runtime.interpreter import NUMBERS
+from runtime.nativeError import NativeError
+from runtime.number import MAX_INTEGER
+from runtime.ploxCallable import PloxCallable
+from runtime.ploxFunction import PloxFunction
+from runtime.ploxInstance import PloxInstance
+from runtime.ploxRuntimeError import PloxRuntimeError
+from scanner.token import Token
+
+# Helpers of the functions the `FunctionCompiler` generates, with the checks the
+# `Interpreter` makes where they do not fit in an expression.
+
+
+def checkCall(paren: Token, function: Any, arguments: list[Any]):
+    if not isinstance(function, PloxCallable):
+        raise PloxRuntimeError(paren, "Can only call functions and classes.")
+    if len(arguments) != function.arity():
+        raise arityError(paren, function, arguments)
+
+
+def call(
+    interpreter,
+    paren: Token,
+    function: Any,
+    this: Optional[PloxInstance],
+    arguments: list[Any],
+) -> Any:
+    checkCall(paren, function, arguments)
+    try:
+        if this is None:
+            return function.call(interpreter, arguments)
+        return function.invoke(interpreter, this, arguments)
+    except RecursionError:
+        raise PloxRuntimeError(paren, "Stack overflow.")
+    except NativeError as error:
+        raise PloxRuntimeError(paren, error.message)
+
+
+def tailCall(
+    interpreter,
+    paren: Token,
+    function: Any,
+    this: Optional[PloxInstance],
+    arguments: list[Any],
+) -> Completion:
+    """End the compiled function with a call, see `TAIL_CALL`."""
+    if not isinstance(function, PloxFunction):
+        interpreter.returnValue = call(interpreter, paren, function, this, arguments)
+        return RETURN
+    checkCall(paren, function, arguments)
+    interpreter.returnValue = function, this, arguments
+    return TAIL_CALL
+
+
+def method(
+    obj: Any, name: Token, cache: InlineCache
+) -> tuple[Any, Optional[PloxInstance]]:
+    """The function `obj.name(...)` calls, with its receiver if it is a
+    method."""
+    if not isinstance(obj, PloxInstance):
+        raise PloxRuntimeError(name, "Only instances have properties.")
+    function = obj.getMethod(name, cache)
+    if function is None:
+        return obj.getAttr(name, cache), None
+    return function, obj
+
+
+def getAttr(obj: Any, name: Token, cache: InlineCache) -> Any:
+    if isinstance(obj, PloxInstance):
+        return obj.getAttr(name, cache)
+    raise PloxRuntimeError(name, "Only instances have properties.")
+
+
+def instance(obj: Any, name: Token) -> PloxInstance:
+    """`obj`, which a field is about to be set on."""
+    if not isinstance(obj, PloxInstance):
+        raise PloxRuntimeError(name, "Only instances have fields.")
+    return obj
+
+
+def setAttr(obj: PloxInstance, name: Token, value: Any) -> Any:
+    obj.setAttr(name, value)
+    return value
+
+
+def assignGlobal(globals, name: Token, value: Any, index: int) -> Any:
+    globals.assign(name, value, index)
+    return value
+
+
+def assignCell(cell, value: Any) -> Any:
+    cell.value = value
+    return value
+
+
+def undefined(name: Token):
+    raise PloxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
+
+
+NAMESPACE = {
+    "RETURN": RETURN,
+    "TAIL_CALL": TAIL_CALL,
+    "UNDEFINED": UNDEFINED,
+    "NUMBERS": NUMBERS,
+    "MAX_INTEGER": MAX_INTEGER,
+    "binary": binary,
+    "add": overloadedPlus,
+    "subtract": subtract,
+    "multiply": multiply,
+    "divide": divide,
+    "negate": negate,
+    "isEqual": isEqual,
+    "stringify": stringify,
+    "call": call,
+    "tailCall": tailCall,
+    "method": method,
+    "getAttr": getAttr,
+    "instance": instance,
+    "setAttr": setAttr,
+    "assignGlobal": assignGlobal,
+    "assignCell": assignCell,
+    "undefined": undefined,
+}
@@ -0,0 +1,6 @@
+class Unsupported(Exception):
+    """Raised by the `FunctionCompiler` for a function it cannot compile, which
+    keeps running in the interpreter."""
+
+    def __init__(self, reason: str):
+        self.reason: str = reason
@@ -0,0 +1,116 @@
+from parser.expr import ExprVisitor
+from parser.stmt import StmtVisitor
+import parser.expr as expr
+import parser.stmt as stmt
+from parser.stmt import Stmt
+from runtime.interpreter import stringify
+
+
+class AstPrinter(ExprVisitor, StmtVisitor):
+    """Prints a program as parenthesized prefix expressions, one statement per
+    line, so the effect of the optimizer can be inspected."""
+
+    def __init__(self):
+        self.__indent = 0
+
+    def print(self, program: list[Stmt]) -> str:
+        return "\n".join(self.__statement(statement) for statement in program)
+
+    def __statement(self, statement: Stmt) -> str:
+        return statement.accept(self)
+
+    def __expression(self, expression: expr.Expr) -> str:
+        return expression.accept(self)
+
+    def __parenthesize(self, name: str, *expressions: expr.Expr) -> str:
+        parts = [name] + [self.__expression(e) for e in expressions]
+        return f"({' '.join(parts)})"
+
+    def __body(self, statements: list[Stmt]) -> str:
+        self.__indent += 1
+        lines = ["    " * self.__indent + self.__statement(s) for s in statements]
+        self.__indent -= 1
+        return "\n".join(lines + ["    " * self.__indent + ")"])
+
+    def visit_assign_expr(self, expr: expr.Assign) -> str:
+        return self.__parenthesize(f"= {expr.name.lexeme}", expr.value)
+
+    def visit_binary_expr(self, expr: expr.Binary) -> str:
+        return self.__parenthesize(expr.operator.lexeme, expr.left, expr.right)
+
+    def visit_call_expr(self, expr: expr.Call) -> str:
+        return self.__parenthesize("call", expr.callee, *expr.arguments)
+
+    def visit_comma_expr(self, expr: expr.Comma) -> str:
+        return self.__parenthesize(",", *expr.expressions)
+
+    def visit_get_expr(self, expr: expr.Get) -> str:
+        return self.__parenthesize(f". {expr.name.lexeme}", expr.obj)
+
+    def visit_grouping_expr(self, expr: expr.Grouping) -> str:
+        return self.__parenthesize("group", expr.expression)
+
+    def visit_literal_expr(self, expr: expr.Literal) -> str:
+        if isinstance(expr.value, str):
+            return f'"{expr.value}"'
+        if isinstance(expr.value, bool):
+            return "true" if expr.value else "false"
+        return stringify(expr.value)
+
+    def visit_logical_expr(self, expr: expr.Logical) -> str:
+        return self.__parenthesize(expr.operator.lexeme, expr.left, expr.right)
+
+    def visit_set_expr(self, expr: expr.Set) -> str:
+        return self.__parenthesize(f"=. {expr.name.lexeme}", expr.obj, expr.value)
+
+    def visit_super_expr(self, expr: expr.Super) -> str:
+        return f"(super {expr.method.lexeme})"
+
+    def visit_this_expr(self, expr: expr.This) -> str:
+        return "this"
+
+    def visit_unary_expr(self, expr: expr.Unary) -> str:
+        return self.__parenthesize(expr.operator.lexeme, expr.right)
+
+    def visit_variable_expr(self, expr: expr.Variable) -> str:
+        return expr.name.lexeme
+
+    def visit_block_stmt(self, stmt: stmt.Block) -> str:
+        return "(block\n" + self.__body(stmt.statements)
+
+    def visit_class_stmt(self, stmt: stmt.Class) -> str:
+        name = stmt.name.lexeme
+        if stmt.superclass is not None:
+            name += f" < {stmt.superclass.name.lexeme}"
+        return f"(class {name}\n" + self.__body(stmt.methods)
+
+    def visit_expression_stmt(self, stmt: stmt.Expression) -> str:
+        return self.__parenthesize(";", stmt.expression)
+
+    def visit_function_stmt(self, stmt: stmt.Function) -> str:
+        params = " ".join(param.lexeme for param in stmt.params)
+        return f"(fun {stmt.name.lexeme} ({params})\n" + self.__body(stmt.body)
+
+    def visit_if_stmt(self, stmt: stmt.If) -> str:
+        branches = [stmt.thenBranch]
+        if stmt.elseBranch is not None:
+            branches.append(stmt.elseBranch)
+        condition = self.__expression(stmt.condition)
+        return f"(if {condition}\n" + self.__body(branches)
+
+    def visit_print_stmt(self, stmt: stmt.Print) -> str:
+        return self.__parenthesize("print", stmt.expression)
+
+    def visit_return_stmt(self, stmt: stmt.Return) -> str:
+        if stmt.value is None:
+            return "(return)"
+        return self.__parenthesize("return", stmt.value)
+
+    def visit_var_stmt(self, stmt: stmt.Var) -> str:
+        if stmt.initializer is None:
+            return f"(var {stmt.name.lexeme})"
+        return self.__parenthesize(f"var {stmt.name.lexeme}", stmt.initializer)
+
+    def visit_while_stmt(self, stmt: stmt.While) -> str:
+        condition = self.__expression(stmt.condition)
+        return f"(while {condition}\n" + self.__body([stmt.body])
@@ -0,0 +1,116 @@
+from parser.expr import ExprVisitor
+from parser.stmt import StmtVisitor
+import parser.expr as expr
+import parser.stmt as stmt
+from parser.stmt import Stmt
+
+
+class AstTransformer(ExprVisitor, StmtVisitor):
+    """Walks a tree and replaces every node with what its visit method returns.
+
+    The default visit methods keep the node and transform its children, so a
+    subclass only overrides the nodes it is interested in.
+    """
+
+    def transformExpression(self, expression: expr.Expr) -> expr.Expr:
+        return expression.accept(self)
+
+    def transformStatement(self, statement: Stmt) -> Stmt:
+        return statement.accept(self)
+
+    def transformStatements(self, statements: list[Stmt]) -> list[Stmt]:
+        return [self.transformStatement(statement) for statement in statements]
+
+    def visit_assign_expr(self, expr: expr.Assign) -> expr.Expr:
+        expr.value = self.transformExpression(expr.value)
+        return expr
+
+    def visit_binary_expr(self, expr: expr.Binary) -> expr.Expr:
+        expr.left = self.transformExpression(expr.left)
+        expr.right = self.transformExpression(expr.right)
+        return expr
+
+    def visit_call_expr(self, expr: expr.Call) -> expr.Expr:
+        expr.callee = self.transformExpression(expr.callee)
+        expr.arguments = [self.transformExpression(a) for a in expr.arguments]
+        return expr
+
+    def visit_comma_expr(self, expr: expr.Comma) -> expr.Expr:
+        expr.expressions = [self.transformExpression(e) for e in expr.expressions]
+        return expr
+
+    def visit_get_expr(self, expr: expr.Get) -> expr.Expr:
+        expr.obj = self.transformExpression(expr.obj)
+        return expr
+
+    def visit_grouping_expr(self, expr: expr.Grouping) -> expr.Expr:
+        expr.expression = self.transformExpression(expr.expression)
+        return expr
+
+    def visit_literal_expr(self, expr: expr.Literal) -> expr.Expr:
+        return expr
+
+    def visit_logical_expr(self, expr: expr.Logical) -> expr.Expr:
+        expr.left = self.transformExpression(expr.left)
+        expr.right = self.transformExpression(expr.right)
+        return expr
+
+    def visit_set_expr(self, expr: expr.Set) -> expr.Expr:
+        expr.obj = self.transformExpression(expr.obj)
+        expr.value = self.transformExpression(expr.value)
+        return expr
+
+    def visit_super_expr(self, expr: expr.Super) -> expr.Expr:
+        return expr
+
+    def visit_this_expr(self, expr: expr.This) -> expr.Expr:
+        return expr
+
+    def visit_unary_expr(self, expr: expr.Unary) -> expr.Expr:
+        expr.right = self.transformExpression(expr.right)
+        return expr
+
+    def visit_variable_expr(self, expr: expr.Variable) -> expr.Expr:
+        return expr
+
+    def visit_block_stmt(self, stmt: stmt.Block) -> Stmt:
+        stmt.statements = self.transformStatements(stmt.statements)
+        return stmt
+
+    def visit_class_stmt(self, stmt: stmt.Class) -> Stmt:
+        stmt.methods = [self.transformStatement(method) for method in stmt.methods]
+        return stmt
+
+    def visit_expression_stmt(self, stmt: stmt.Expression) -> Stmt:
+        stmt.expression = self.transformExpression(stmt.expression)
+        return stmt
+
+    def visit_function_stmt(self, stmt: stmt.Function) -> Stmt:
+        stmt.body = self.transformStatements(stmt.body)
+        return stmt
+
+    def visit_if_stmt(self, stmt: stmt.If) -> Stmt:
+        stmt.condition = self.transformExpression(stmt.condition)
+        stmt.thenBranch = self.transformStatement(stmt.thenBranch)
+        if stmt.elseBranch is not None:
+            stmt.elseBranch = self.transformStatement(stmt.elseBranch)
+        return stmt
+
+    def visit_print_stmt(self, stmt: stmt.Print) -> Stmt:
+        stmt.expression = self.transformExpression(stmt.expression)
+        return stmt
+
+    def visit_return_stmt(self, stmt: stmt.Return) -> Stmt:
+        if stmt.value is not None:
+            stmt.value = self.transformExpression(stmt.value)
+        return stmt
+
+    def visit_var_stmt(self, stmt: stmt.Var) -> Stmt:
+        if stmt.initializer is not None:
+            stmt.initializer = self.transformExpression(stmt.initializer)
+        return stmt
+
+    def visit_while_stmt(self, stmt: stmt.While) -> Stmt:
+        stmt.condition = self.transformExpression(stmt.condition)
+        stmt.body = self.transformStatement(stmt.body)
+        return stmt
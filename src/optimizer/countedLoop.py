@@ -0,0 +1,30 @@
+from parser.expr import Expr, Variable
+
+
+class CountedLoop:
+    """What a `while` loop needs to run as a counted loop: the loop runs while
+    `counter` is below `limit` (or above it, for a negative `step`), and the
+    statement at `increment` in its body is the only one that changes the
+    counter, adding `step` to it."""
+
+    __slots__ = ("counter", "limit", "inclusive", "step", "increment")
+
+    def __init__(
+        self,
+        counter: Variable,
+        limit: Expr,
+        inclusive: bool,
+        step: int,
+        increment: int,
+    ):
+        self.counter = counter
+        self.limit = limit
+        self.inclusive = inclusive
+        self.step = step
+        self.increment = increment
+
+    def stop(self, limit: int) -> int:
+        """The `stop` of the range of values the counter takes."""
+        if not self.inclusive:
+            return limit
+        return limit + 1 if self.step > 0 else limit - 1
@@ -0,0 +1,105 @@
+from typing import Optional
+from parser.expr import Assign, Binary, Literal, Variable
+import parser.expr as expr
+import parser.stmt as stmt
+from parser.stmt import Stmt
+from optimizer.astTransformer import AstTransformer
+from optimizer.countedLoop import CountedLoop
+from optimizer.loopAnalyzer import LoopAnalyzer
+from resolver.accessType import AccessType
+from scanner.tokenType import TokenType
+
+COMPARISONS = {
+    TokenType.LESS: (1, False),
+    TokenType.LESS_EQUAL: (1, True),
+    TokenType.GREATER: (-1, False),
+    TokenType.GREATER_EQUAL: (-1, True),
+}
+
+
+class CountedLoopDetector(AstTransformer):
+    """Marks the loops that count a local of the current frame up or down by a
+    constant integer step to an invariant limit, like the `for` loops that
+    count, so that the interpreter can run them over a range.
+
+    The counter must be compared with a literal or with a local nothing in the
+    loop assigns, and be advanced by a statement of the loop body itself which
+    nothing else in the loop assigns it besides. Whether the counter and the
+    limit are integers is only known when the loop starts, so the interpreter
+    checks them then and runs the loop as usual otherwise.
+
+    This runs last, as any later rewrite of the loop could invalidate it.
+    """
+
+    def run(self, program: list[Stmt]) -> list[Stmt]:
+        return self.transformStatements(program)
+
+    def visit_while_stmt(self, stmt: stmt.While) -> Stmt:
+        super().visit_while_stmt(stmt)
+        stmt.counted = self.__countedLoop(stmt)
+        return stmt
+
+    def __countedLoop(self, loop: stmt.While) -> Optional[CountedLoop]:
+        condition = loop.condition
+        if not isinstance(condition, Binary):
+            return None
+        direction, inclusive = COMPARISONS.get(condition.operator.tokenType, (0, False))
+        counter, limit = condition.left, condition.right
+        if not direction or not isLocal(counter):
+            return None
+        if not isinstance(loop.body, stmt.Block):
+            return None
+        assert isinstance(counter, Variable)
+        name = counter.name.lexeme
+        analyzer = LoopAnalyzer().analyzeStatement(loop)
+        if analyzer.assigned[name] != 1 or name in analyzer.declared:
+            return None
+        if not isinstance(limit, Literal):
+            if not isLocal(limit):
+                return None
+            assert isinstance(limit, Variable)
+            limitName = limit.name.lexeme
+            if analyzer.assigned[limitName] or limitName in analyzer.declared:
+                return None
+        for index, statement in enumerate(loop.body.statements):
+            step = self.__step(statement, name)
+            if step is not None:
+                break
+        else:
+            return None
+        if step * direction <= 0:
+            return None
+        return CountedLoop(counter, limit, inclusive, step, index)
+
+    def __step(self, statement: Stmt, counter: str) -> Optional[int]:
+        """The integer step of `counter = counter + step` or `counter - step`."""
+        if not isinstance(statement, stmt.Expression):
+            return None
+        assign = statement.expression
+        if not isinstance(assign, Assign) or assign.name.lexeme != counter:
+            return None
+        if assign.access is not AccessType.LOCAL:
+            return None
+        value = assign.value
+        if not isinstance(value, Binary):
+            return None
+        left, right = value.left, value.right
+        if value.operator.tokenType == TokenType.PLUS:
+            if isinstance(left, Literal):
+                left, right = right, left
+            sign = 1
+        elif value.operator.tokenType == TokenType.MINUS:
+            sign = -1
+        else:
+            return None
+        if not isinstance(left, Variable) or left.name.lexeme != counter:
+            return None
+        if not isinstance(right, Literal) or type(right.value) is not int:
+            return None
+        return sign * right.value
+
+
+def isLocal(expression: expr.Expr) -> bool:
+    """Whether `expression` reads a local of the current frame, which only the
+    code of the frame itself can assign."""
+    return isinstance(expression, Variable) and expression.access is AccessType.LOCAL
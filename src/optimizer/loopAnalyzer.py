@@ -0,0 +1,57 @@
+from collections import Counter
+import parser.expr as expr
+import parser.stmt as stmt
+from parser.stmt import Stmt
+from optimizer.astTransformer import AstTransformer
+
+
+class LoopAnalyzer(AstTransformer):
+    """Collects what running a piece of code can change: the names it assigns
+    and declares, and whether it calls functions or sets properties.
+
+    Names are not resolved, so a name assigned in a nested function or
+    shadowed by a declaration counts as well, which only errs on the safe side.
+    """
+
+    def __init__(self):
+        self.assigned: Counter[str] = Counter()
+        self.declared: set[str] = set()
+        self.calls = False
+        self.sets = False
+
+    def analyzeExpression(self, expression: expr.Expr) -> "LoopAnalyzer":
+        self.transformExpression(expression)
+        return self
+
+    def analyzeStatement(self, statement: Stmt) -> "LoopAnalyzer":
+        self.transformStatement(statement)
+        return self
+
+    @property
+    def hasEffects(self) -> bool:
+        return self.calls or self.sets or bool(self.assigned)
+
+    def visit_assign_expr(self, expr: expr.Assign) -> expr.Expr:
+        self.assigned[expr.name.lexeme] += 1
+        return super().visit_assign_expr(expr)
+
+    def visit_call_expr(self, expr: expr.Call) -> expr.Expr:
+        self.calls = True
+        return super().visit_call_expr(expr)
+
+    def visit_set_expr(self, expr: expr.Set) -> expr.Expr:
+        self.sets = True
+        return super().visit_set_expr(expr)
+
+    def visit_class_stmt(self, stmt: stmt.Class) -> Stmt:
+        self.declared.add(stmt.name.lexeme)
+        return super().visit_class_stmt(stmt)
+
+    def visit_function_stmt(self, stmt: stmt.Function) -> Stmt:
+        self.declared.add(stmt.name.lexeme)
+        self.declared.update(param.lexeme for param in stmt.params)
+        return super().visit_function_stmt(stmt)
+
+    def visit_var_stmt(self, stmt: stmt.Var) -> Stmt:
+        self.declared.add(stmt.name.lexeme)
+        return super().visit_var_stmt(stmt)
@@ -0,0 +1,290 @@
+import copy
+from typing import Optional
+from parser.expr import Assign, Binary, Call, Comma, Get, Grouping, Literal
+from parser.expr import Logical, Set, Super, This, Unary, Variable
+import parser.expr as expr
+import parser.stmt as stmt
+from parser.stmt import Stmt
+from optimizer.astTransformer import AstTransformer
+from optimizer.loopAnalyzer import LoopAnalyzer
+from optimizer.optimizer import isPure, isTruthy
+from optimizer.strengthReducer import StrengthReducer, isInteger, temporaryVariable
+from resolver.accessType import AccessType
+from scanner.token import Token
+from scanner.tokenType import TokenType
+
+
+class LoopOptimizer(AstTransformer):
+    """Moves work out of `while` loops.
+
+    An expression is hoisted into a temporary computed once before the loop
+    when nothing in the loop can change its value: none of its variables is
+    assigned in the loop, and if the loop calls functions or sets properties,
+    it reads neither properties nor variables a call could assign. It must also
+    be evaluated on every iteration before anything that could fail or be
+    observed, so that computing it early raises the same error. The loop is
+    guarded by its condition, so nothing is computed for a loop that never runs
+    and the condition still fails before anything hoisted does. Calls,
+    assignments and property sets are never hoisted.
+
+    A counter that starts at an integer and is advanced by an integer once per
+    iteration has its products with integers replaced by temporaries that are
+    advanced along with it.
+
+    The temporaries are new locals, so the program must be resolved again.
+    """
+
+    def __init__(self):
+        self.__temporaries = 0
+        self.__loop = LoopAnalyzer()
+        self.__hoisted: list[Stmt] = []
+        self.__clean = True
+
+    def run(self, program: list[Stmt]) -> list[Stmt]:
+        # Top-level loops keep their temporaries in a block of their own, as
+        # they would be globals otherwise.
+        return [self.transformStatement(statement) for statement in program]
+
+    def transformStatements(self, statements: list[Stmt]) -> list[Stmt]:
+        # Temporaries are declared next to the loop rather than in a new block,
+        # so that the loop body does not move further away from the variables
+        # it uses.
+        optimized = []
+        for statement in statements:
+            if isinstance(statement, stmt.While):
+                previous = optimized[-1] if optimized else None
+                optimized.extend(self.__optimizeLoop(statement, previous))
+            else:
+                optimized.append(self.transformStatement(statement))
+        return optimized
+
+    def visit_while_stmt(self, loop: stmt.While) -> Stmt:
+        optimized = self.__optimizeLoop(loop, None)
+        if len(optimized) == 1:
+            return optimized[0]
+        return stmt.Block(optimized)
+
+    def __optimizeLoop(self, loop: stmt.While, previous: Optional[Stmt]) -> list[Stmt]:
+        loop.body = self.transformStatement(loop.body)
+        return self.__reduceStrength(loop, previous) + self.__hoist(loop)
+
+    def __temporary(self, kind: str, line: int) -> Token:
+        name = f"${kind}{self.__temporaries}"
+        self.__temporaries += 1
+        return Token(TokenType.IDENTIFIER, name, None, line)
+
+    def __reduceStrength(
+        self, loop: stmt.While, previous: Optional[Stmt]
+    ) -> list[Stmt]:
+        """Reduce products of the counter declared right before the loop and
+        return the declarations of their temporaries."""
+        if not isinstance(previous, stmt.Var) or previous.captured:
+            return []
+        if not isinstance(previous.initializer, Literal):
+            return []
+        if not isInteger(previous.initializer.value):
+            return []
+        if not isinstance(loop.body, stmt.Block):
+            return []
+        counter = previous.name.lexeme
+        line = previous.name.line
+        analyzer = LoopAnalyzer().analyzeStatement(loop)
+        if analyzer.assigned[counter] != 1 or counter in analyzer.declared:
+            return []
+        for index, statement in enumerate(loop.body.statements):
+            if (increment := self.__increment(statement, counter)) is not None:
+                break
+        else:
+            return []
+
+        start = float(previous.initializer.value)
+        step, operator = increment
+        counted = StrengthReducer(counter, start, step)
+        counted.transformStatement(loop)
+        # Advancing a temporary costs as much as one multiplication.
+        temporaries = {
+            factor: self.__temporary("product", line)
+            for factor, uses in counted.uses.items()
+            if uses > 1
+        }
+        StrengthReducer(counter, start, step, temporaries).transformStatement(loop)
+        updates = []
+        declarations = []
+        for factor, name in temporaries.items():
+            declarations.append(stmt.Var(name, Literal(start * factor)))
+            value = Binary(temporaryVariable(name), operator, Literal(step * factor))
+            updates.append(stmt.Expression(Assign(name, value)))
+        loop.body.statements[index + 1 : index + 1] = updates
+        return declarations
+
+    def __increment(
+        self, statement: Stmt, counter: str
+    ) -> Optional[tuple[float, Token]]:
+        """The integer step of `counter = counter + step` or `counter - step`."""
+        if not isinstance(statement, stmt.Expression):
+            return None
+        assign = statement.expression
+        if not isinstance(assign, Assign) or assign.name.lexeme != counter:
+            return None
+        value = assign.value
+        if not isinstance(value, Binary):
+            return None
+        left, right = value.left, value.right
+        plus = Token(TokenType.PLUS, "+", None, value.operator.line)
+        if value.operator.tokenType == TokenType.PLUS:
+            if isinstance(left, Literal):
+                left, right = right, left
+            sign = 1.0
+        elif value.operator.tokenType == TokenType.MINUS:
+            sign = -1.0
+        else:
+            return None
+        if not isinstance(left, Variable) or left.name.lexeme != counter:
+            return None
+        if not isinstance(right, Literal) or not isInteger(right.value):
+            return None
+        return sign * float(right.value), plus
+
+    def __hoist(self, loop: stmt.While) -> list[Stmt]:
+        # The guard evaluates the condition once more before the first
+        # iteration, which is only unnoticeable if it has no effects.
+        if LoopAnalyzer().analyzeExpression(loop.condition).hasEffects:
+            return [loop]
+        self.__loop = LoopAnalyzer().analyzeStatement(loop)
+        self.__hoisted = []
+        self.__clean = True
+        guard = copy.deepcopy(loop.condition)
+        loop.condition = self.__scanExpression(loop.condition)
+        # Whatever the condition raises, the guard raises first.
+        self.__clean = True
+        self.__scanStatement(loop.body)
+        if not self.__hoisted:
+            return [loop]
+        if isinstance(guard, Literal) and isTruthy(guard.value):
+            return self.__hoisted + [loop]
+        # The temporaries are declared before the guard and assigned inside it,
+        # so that the guarded block declares nothing and needs no environment.
+        declarations: list[Stmt] = []
+        assignments: list[Stmt] = []
+        for hoisted in self.__hoisted:
+            assert isinstance(hoisted, stmt.Var) and hoisted.initializer
+            declarations.append(stmt.Var(hoisted.name, None))
+            assignment = Assign(hoisted.name, hoisted.initializer)
+            assignments.append(stmt.Expression(assignment))
+        body = stmt.Block(assignments + [loop])
+        return declarations + [stmt.If(guard, body, None)]
+
+    def __scanStatement(self, statement: Stmt):
+        """Hoist from the part of `statement` that runs on every iteration
+        before anything that could fail or be observed."""
+        if not self.__clean:
+            return
+        if isinstance(statement, stmt.Block):
+            for inner in statement.statements:
+                self.__scanStatement(inner)
+        elif isinstance(statement, stmt.Expression):
+            statement.expression = self.__scanExpression(statement.expression)
+        elif isinstance(statement, stmt.Print):
+            statement.expression = self.__scanExpression(statement.expression)
+            self.__clean = False
+        elif isinstance(statement, stmt.Var):
+            if statement.initializer is not None:
+                initializer = self.__scanExpression(statement.initializer)
+                statement.initializer = initializer
+        elif isinstance(statement, (stmt.If, stmt.While)):
+            statement.condition = self.__scanExpression(statement.condition)
+            self.__clean = False
+        elif isinstance(statement, stmt.Return):
+            if statement.value is not None:
+                statement.value = self.__scanExpression(statement.value)
+            self.__clean = False
+        elif isinstance(statement, stmt.Class):
+            self.__clean = False
+
+    def __scanExpression(self, expression: expr.Expr) -> expr.Expr:
+        if not self.__clean:
+            return expression
+        if self.__hoistable(expression):
+            name = self.__temporary("invariant", line(expression))
+            self.__hoisted.append(stmt.Var(name, expression))
+            return temporaryVariable(name)
+        if isinstance(expression, Grouping):
+            expression.expression = self.__scanExpression(expression.expression)
+        elif isinstance(expression, Unary):
+            expression.right = self.__scanExpression(expression.right)
+            if expression.operator.tokenType != TokenType.BANG:
+                self.__clean = False
+        elif isinstance(expression, Binary):
+            expression.left = self.__scanExpression(expression.left)
+            expression.right = self.__scanExpression(expression.right)
+            if expression.operator.tokenType not in (
+                TokenType.EQUAL_EQUAL,
+                TokenType.BANG_EQUAL,
+            ):
+                self.__clean = False
+        elif isinstance(expression, Logical):
+            # The right operand does not run on every iteration.
+            expression.left = self.__scanExpression(expression.left)
+            if not isPure(expression.right):
+                self.__clean = False
+        elif isinstance(expression, Comma):
+            expression.expressions = [
+                self.__scanExpression(e) for e in expression.expressions
+            ]
+        elif isinstance(expression, Assign):
+            expression.value = self.__scanExpression(expression.value)
+            if expression.access is AccessType.GLOBAL:
+                self.__clean = False
+        elif isinstance(expression, Variable):
+            # Reading a global fails if it is not defined.
+            if expression.access is AccessType.GLOBAL:
+                self.__clean = False
+        elif isinstance(expression, Call):
+            expression.callee = self.__scanExpression(expression.callee)
+            expression.arguments = [
+                self.__scanExpression(a) for a in expression.arguments
+            ]
+            self.__clean = False
+        elif isinstance(expression, Get):
+            expression.obj = self.__scanExpression(expression.obj)
+            self.__clean = False
+        elif isinstance(expression, Set):
+            expression.obj = self.__scanExpression(expression.obj)
+            expression.value = self.__scanExpression(expression.value)
+            self.__clean = False
+        elif isinstance(expression, Super):
+            self.__clean = False
+        return expression
+
+    def __hoistable(self, expression: expr.Expr) -> bool:
+        return isinstance(expression, (Binary, Get, Logical, Unary)) and (
+            self.__invariant(expression)
+        )
+
+    def __invariant(self, expression: expr.Expr) -> bool:
+        loop = self.__loop
+        if isinstance(expression, (Literal, This)):
+            return True
+        if isinstance(expression, Variable):
+            name = expression.name.lexeme
+            if name in loop.assigned or name in loop.declared:
+                return False
+            # A call can assign globals and the variables closures share.
+            return not loop.calls or expression.access is AccessType.LOCAL
+        if isinstance(expression, Grouping):
+            return self.__invariant(expression.expression)
+        if isinstance(expression, Unary):
+            return self.__invariant(expression.right)
+        if isinstance(expression, (Binary, Logical)):
+            return self.__invariant(expression.left) and self.__invariant(
+                expression.right
+            )
+        if isinstance(expression, Get):
+            return not (loop.calls or loop.sets) and self.__invariant(expression.obj)
+        return False
+
+
+def line(expression: Binary | Get | Logical | Unary) -> int:
+    if isinstance(expression, Get):
+        return expression.name.line
+    return expression.operator.line
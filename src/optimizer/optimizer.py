@@ -0,0 +1,269 @@
+from typing import Any, Optional
+from parser.expr import ExprVisitor
+from parser.stmt import StmtVisitor
+from parser.expr import Binary, Comma, Grouping, Literal, Logical, This, Unary
+from parser.expr import Variable
+import parser.expr as expr
+import parser.stmt as stmt
+from parser.stmt import Stmt
+from resolver.accessType import AccessType
+from runtime.interpreter import binary, negate
+from runtime.ploxRuntimeError import PloxRuntimeError
+from scanner.token import Token
+from scanner.tokenType import TokenType
+
+# Marks a local in the optimizer's scopes whose value is not a known literal.
+UNKNOWN = object()
+
+
+class Optimizer(ExprVisitor, StmtVisitor):
+    """Rewrites a resolved program into an equivalent, cheaper one.
+
+    Level 1 folds constant expressions, propagates locals that are never
+    assigned after being initialized with a literal, removes branches and
+    loops whose condition is a known literal, statements after a `return`
+    and expression statements without effects, and splices blocks that
+    declare nothing into the enclosing one. Operations that would raise a
+    runtime error are left alone, so errors are still reported at runtime.
+    """
+
+    def __init__(self, level: int = 1):
+        self.__level = level
+        self.__scopes: list[dict[str, Any]] = []
+
+    def run(self, program: list[Stmt]) -> list[Stmt]:
+        if self.__level < 1:
+            return program
+        # The value of the last statement is the result the prompt prints.
+        last = program[-1:]
+        optimized = self.__optimizeStatements(program[:-1])
+        for statement in last:
+            if isinstance(statement, stmt.Expression):
+                optimized.append(stmt.Expression(self.__fold(statement.expression)))
+            elif (statement := statement.accept(self)) is not None:
+                optimized.append(statement)
+        return optimized
+
+    def __optimizeStatements(self, statements: list[Stmt]) -> list[Stmt]:
+        optimized = []
+        for statement in statements:
+            statement = statement.accept(self)
+            if isinstance(statement, stmt.Block) and not declares(statement):
+                optimized.extend(statement.statements)
+            elif statement is not None:
+                optimized.append(statement)
+            if optimized and isinstance(optimized[-1], stmt.Return):
+                break
+        return optimized
+
+    def __optimizeBranch(self, statement: Stmt) -> Stmt:
+        optimized = statement.accept(self)
+        if optimized is None:
+            return stmt.Block([])
+        return optimized
+
+    def __fold(self, expression: expr.Expr) -> expr.Expr:
+        return expression.accept(self)
+
+    def __declare(self, name: Token, value: Any = UNKNOWN):
+        if self.__scopes:
+            self.__scopes[-1][name.lexeme] = value
+
+    def __beginScope(self):
+        self.__scopes.append({})
+
+    def __endScope(self):
+        self.__scopes.pop()
+
+    def visit_assign_expr(self, expr: expr.Assign) -> expr.Expr:
+        expr.value = self.__fold(expr.value)
+        return expr
+
+    def visit_binary_expr(self, expr: expr.Binary) -> expr.Expr:
+        expr.left = self.__fold(expr.left)
+        expr.right = self.__fold(expr.right)
+        if isinstance(expr.left, Literal) and isinstance(expr.right, Literal):
+            try:
+                value = binary(expr.operator, expr.left.value, expr.right.value)
+            except PloxRuntimeError:
+                return expr
+            return Literal(value)
+        return expr
+
+    def visit_call_expr(self, expr: expr.Call) -> expr.Expr:
+        expr.callee = self.__fold(expr.callee)
+        expr.arguments = [self.__fold(argument) for argument in expr.arguments]
+        return expr
+
+    def visit_comma_expr(self, expr: expr.Comma) -> expr.Expr:
+        expressions = [self.__fold(expression) for expression in expr.expressions]
+        # Only the last value is kept, the others just run for their effects.
+        effects = [e for e in expressions[:-1] if not isPure(e)]
+        expressions = effects + expressions[-1:]
+        if len(expressions) == 1:
+            return expressions[0]
+        expr.expressions = expressions
+        return expr
+
+    def visit_get_expr(self, expr: expr.Get) -> expr.Expr:
+        expr.obj = self.__fold(expr.obj)
+        return expr
+
+    def visit_grouping_expr(self, expr: expr.Grouping) -> expr.Expr:
+        return self.__fold(expr.expression)
+
+    def visit_literal_expr(self, expr: expr.Literal) -> expr.Expr:
+        return expr
+
+    def visit_logical_expr(self, expr: expr.Logical) -> expr.Expr:
+        expr.left = self.__fold(expr.left)
+        expr.right = self.__fold(expr.right)
+        if not isinstance(expr.left, Literal):
+            return expr
+        truthy = isTruthy(expr.left.value)
+        if truthy == (expr.operator.tokenType == TokenType.OR):
+            return expr.left
+        return expr.right
+
+    def visit_set_expr(self, expr: expr.Set) -> expr.Expr:
+        expr.obj = self.__fold(expr.obj)
+        expr.value = self.__fold(expr.value)
+        return expr
+
+    def visit_super_expr(self, expr: expr.Super) -> expr.Expr:
+        return expr
+
+    def visit_this_expr(self, expr: expr.This) -> expr.Expr:
+        return expr
+
+    def visit_unary_expr(self, expr: expr.Unary) -> expr.Expr:
+        expr.right = self.__fold(expr.right)
+        if not isinstance(expr.right, Literal):
+            return expr
+        value = expr.right.value
+        if expr.operator.tokenType == TokenType.BANG:
+            return Literal(not isTruthy(value))
+        if isinstance(value, (float, int)):
+            return Literal(negate(expr.operator, value))
+        return expr
+
+    def visit_variable_expr(self, expr: expr.Variable) -> expr.Expr:
+        for scope in reversed(self.__scopes):
+            if expr.name.lexeme in scope:
+                value = scope[expr.name.lexeme]
+                if value is UNKNOWN:
+                    return expr
+                return Literal(value)
+        return expr
+
+    def visit_block_stmt(self, stmt: stmt.Block) -> Optional[Stmt]:
+        self.__beginScope()
+        stmt.statements = self.__optimizeStatements(stmt.statements)
+        self.__endScope()
+        if not stmt.statements:
+            return None
+        return stmt
+
+    def visit_class_stmt(self, stmt: stmt.Class) -> Stmt:
+        self.__declare(stmt.name)
+        for method in stmt.methods:
+            self.__optimizeFunction(method)
+        return stmt
+
+    def visit_expression_stmt(self, stmt: stmt.Expression) -> Optional[Stmt]:
+        stmt.expression = self.__fold(stmt.expression)
+        if isPure(stmt.expression):
+            return None
+        return stmt
+
+    def visit_function_stmt(self, stmt: stmt.Function) -> Stmt:
+        self.__declare(stmt.name)
+        self.__optimizeFunction(stmt)
+        return stmt
+
+    def __optimizeFunction(self, function: stmt.Function):
+        self.__beginScope()
+        for param in function.params:
+            self.__declare(param)
+        function.body = self.__optimizeStatements(function.body)
+        self.__endScope()
+
+    def visit_if_stmt(self, stmt: stmt.If) -> Optional[Stmt]:
+        stmt.condition = self.__fold(stmt.condition)
+        if isinstance(stmt.condition, Literal):
+            if isTruthy(stmt.condition.value):
+                return stmt.thenBranch.accept(self)
+            if stmt.elseBranch is not None:
+                return stmt.elseBranch.accept(self)
+            return None
+        stmt.thenBranch = self.__optimizeBranch(stmt.thenBranch)
+        if stmt.elseBranch is not None:
+            stmt.elseBranch = self.__optimizeBranch(stmt.elseBranch)
+        return stmt
+
+    def visit_print_stmt(self, stmt: stmt.Print) -> Stmt:
+        stmt.expression = self.__fold(stmt.expression)
+        return stmt
+
+    def visit_return_stmt(self, stmt: stmt.Return) -> Stmt:
+        if stmt.value is not None:
+            stmt.value = self.__fold(stmt.value)
+        return stmt
+
+    def visit_var_stmt(self, stmt: stmt.Var) -> Stmt:
+        value = UNKNOWN
+        if stmt.initializer is not None:
+            stmt.initializer = self.__fold(stmt.initializer)
+            if isinstance(stmt.initializer, Literal):
+                value = stmt.initializer.value
+        else:
+            value = None
+        if stmt.assigned:
+            value = UNKNOWN
+        self.__declare(stmt.name, value)
+        return stmt
+
+    def visit_while_stmt(self, stmt: stmt.While) -> Optional[Stmt]:
+        stmt.condition = self.__fold(stmt.condition)
+        if isinstance(stmt.condition, Literal):
+            if not isTruthy(stmt.condition.value):
+                return None
+            stmt.condition = Literal(True)
+        stmt.body = self.__optimizeBranch(stmt.body)
+        return stmt
+
+
+def declares(block: stmt.Block) -> bool:
+    """Whether the block's statements can only run inside their own scope."""
+    return any(
+        isinstance(statement, (stmt.Var, stmt.Function, stmt.Class))
+        for statement in block.statements
+    )
+
+
+def isTruthy(value: Any) -> bool:
+    return value is not None and value is not False
+
+
+def isPure(expression: expr.Expr) -> bool:
+    """Whether evaluating ``expression`` can neither fail nor have effects."""
+    if isinstance(expression, (Literal, This)):
+        return True
+    if isinstance(expression, Variable):
+        return expression.access is not AccessType.GLOBAL
+    if isinstance(expression, Grouping):
+        return isPure(expression.expression)
+    if isinstance(expression, Logical):
+        return isPure(expression.left) and isPure(expression.right)
+    if isinstance(expression, Comma):
+        return all(isPure(e) for e in expression.expressions)
+    if isinstance(expression, Unary):
+        return expression.operator.tokenType == TokenType.BANG and isPure(
+            expression.right
+        )
+    if isinstance(expression, Binary):
+        return expression.operator.tokenType in (
+            TokenType.EQUAL_EQUAL,
+            TokenType.BANG_EQUAL,
+        ) and (isPure(expression.left) and isPure(expression.right))
+    return False
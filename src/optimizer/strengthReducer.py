@@ -0,0 +1,84 @@
+from collections import Counter
+from typing import Any, Optional
+from parser.expr import Literal, Variable
+import parser.expr as expr
+import parser.stmt as stmt
+from parser.stmt import Stmt
+from optimizer.astTransformer import AstTransformer
+from resolver.accessType import AccessType
+from scanner.token import Token
+from scanner.tokenType import TokenType
+
+# Products are only reduced while they stay far enough below 2**53 that adding
+# the step again and again gives the same float as the multiplication would.
+START_LIMIT = 2**40
+STEP_LIMIT = 2**20
+
+
+class StrengthReducer(AstTransformer):
+    """Counts the products `counter * k` for integers `k`, and replaces those
+    with a temporary for `k` by that temporary. The caller declares the
+    temporaries and advances them by `step * k` whenever the counter is advanced
+    by `step`."""
+
+    def __init__(
+        self,
+        counter: str,
+        start: float,
+        step: float,
+        temporaries: Optional[dict[float, Token]] = None,
+    ):
+        self.__counter = counter
+        self.__start = start
+        self.__step = step
+        self.__temporaries = temporaries or {}
+        self.uses: Counter[float] = Counter()
+
+    def visit_binary_expr(self, expr: expr.Binary) -> expr.Expr:
+        if expr.operator.tokenType == TokenType.STAR:
+            if self.__isCounter(expr.left) and self.__reducible(expr.right):
+                return self.__product(expr, expr.right.value)
+            if self.__isCounter(expr.right) and self.__reducible(expr.left):
+                return self.__product(expr, expr.left.value)
+        return super().visit_binary_expr(expr)
+
+    def visit_function_stmt(self, stmt: stmt.Function) -> Stmt:
+        # A nested function runs with its own counter, if it has one at all.
+        return stmt
+
+    def __isCounter(self, expression: expr.Expr) -> bool:
+        return (
+            isinstance(expression, Variable)
+            and expression.name.lexeme == self.__counter
+        )
+
+    def __reducible(self, expression: expr.Expr) -> bool:
+        if not isinstance(expression, Literal) or not isInteger(expression.value):
+            return False
+        factor = float(expression.value)
+        return (
+            abs(self.__start * factor) <= START_LIMIT
+            and abs(self.__step * factor) <= STEP_LIMIT
+        )
+
+    def __product(self, product: expr.Binary, factor: Any) -> expr.Expr:
+        factor = float(factor)
+        self.uses[factor] += 1
+        if factor in self.__temporaries:
+            return temporaryVariable(self.__temporaries[factor])
+        return product
+
+
+def temporaryVariable(name: Token) -> expr.Variable:
+    """A reference to a temporary, which is always a local of the current frame."""
+    variable = Variable(name)
+    variable.access = AccessType.LOCAL
+    return variable
+
+
+def isInteger(value: Any) -> bool:
+    return (
+        isinstance(value, (int, float))
+        and not isinstance(value, bool)
+        and float(value).is_integer()
+    )
@@ -3,7 +3,9 @@
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Optional
+from resolver.accessType import AccessType
+from runtime.inlineCache import InlineCache
 from scanner.token import Token
 
 
@@ -73,6 +75,10 @@ class Assign(Expr):
     def __init__(self, name: Token, value: Expr):
         self.name = name
         self.value = value
+        self.depth: Optional[int] = None
+        self.slot: Optional[int] = None
+        self.access: AccessType = AccessType.GLOBAL
+        self.index: Optional[int] = None
 
     def accept(self, visitor: ExprVisitor):
         """Create a accept method that calls the visitor."""
@@ -95,6 +101,9 @@ class Call(Expr):
         self.callee = callee
         self.paren = paren
         self.arguments = arguments
+        self.tail: bool = False
+        self.cachedCallee: Any = None
+        self.cachedVersion: int = -1
 
     def accept(self, visitor: ExprVisitor):
         """Create a accept method that calls the visitor."""
@@ -114,6 +123,7 @@ class Get(Expr):
     def __init__(self, obj: Expr, name: Token):
         self.obj = obj
         self.name = name
+        self.cache: InlineCache = InlineCache()
 
     def accept(self, visitor: ExprVisitor):
         """Create a accept method that calls the visitor."""
@@ -164,6 +174,12 @@ class Super(Expr):
     def __init__(self, keyword: Token, method: Token):
         self.keyword = keyword
         self.method = method
+        self.depth: Optional[int] = None
+        self.slot: Optional[int] = None
+        self.access: AccessType = AccessType.GLOBAL
+        self.index: Optional[int] = None
+        self.receiver: Optional[This] = None
+        self.cache: InlineCache = InlineCache()
 
     def accept(self, visitor: ExprVisitor):
         """Create a accept method that calls the visitor."""
@@ -173,6 +189,10 @@ class Super(Expr):
 class This(Expr):
     def __init__(self, keyword: Token):
         self.keyword = keyword
+        self.depth: Optional[int] = None
+        self.slot: Optional[int] = None
+        self.access: AccessType = AccessType.GLOBAL
+        self.index: Optional[int] = None
 
     def accept(self, visitor: ExprVisitor):
         """Create a accept method that calls the visitor."""
@@ -192,6 +212,10 @@ class Unary(Expr):
 class Variable(Expr):
     def __init__(self, name: Token):
         self.name = name
+        self.depth: Optional[int] = None
+        self.slot: Optional[int] = None
+        self.access: AccessType = AccessType.GLOBAL
+        self.index: Optional[int] = None
 
     def accept(self, visitor: ExprVisitor):
         """Create a accept method that calls the visitor."""
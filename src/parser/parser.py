@@ -41,7 +41,7 @@ printStmt      → "print" expression ";" ;
 
 expression     → ( assignment | comma ) ;
 comma          → assignment ( "," assignment )+ ;
-assignment     → logic_or ( "=" assignment )? ; 
+assignment     → logic_or ( "=" assignment )? ;
 logic_or       → logic_and ( "or" logic_and )* ;
 logic_and      → equality ( "and" equality )* ;
 equality       → comparison ( ( "!=" | "==" ) comparison )* ;
@@ -59,29 +59,104 @@ primary        → "true" | "false" | "nil" | "this"
 import parser.expr as exprType
 import parser.stmt as stmtType
 from parser.parseError import ParseError
-from typing import Optional
+from parser.precedence import Precedence
+from typing import Iterable, Iterator, Optional
 from scanner.token import Token
 from scanner.tokenType import TokenType
 
+# The precedence of each operator that follows an operand.
+BINDING = {
+    TokenType.EQUAL: Precedence.ASSIGNMENT,
+    TokenType.OR: Precedence.OR,
+    TokenType.AND: Precedence.AND,
+    TokenType.BANG_EQUAL: Precedence.EQUALITY,
+    TokenType.EQUAL_EQUAL: Precedence.EQUALITY,
+    TokenType.GREATER: Precedence.COMPARISON,
+    TokenType.GREATER_EQUAL: Precedence.COMPARISON,
+    TokenType.LESS: Precedence.COMPARISON,
+    TokenType.LESS_EQUAL: Precedence.COMPARISON,
+    TokenType.MINUS: Precedence.TERM,
+    TokenType.PLUS: Precedence.TERM,
+    TokenType.SLASH: Precedence.FACTOR,
+    TokenType.STAR: Precedence.FACTOR,
+    TokenType.LEFT_PAREN: Precedence.CALL,
+    TokenType.DOT: Precedence.CALL,
+}
+
+LITERALS = {TokenType.FALSE: False, TokenType.TRUE: True, TokenType.NIL: None}
+
 
 class Parser:
+    """Parses the tokens as it pulls them, looking one token ahead, so that it
+    does not need all of them at once.
+
+    Statements are parsed by recursive descent. Expressions are parsed by
+    operator precedence instead of a method per level of the grammar, so an
+    operand takes one call to its prefix rule and an operator one to its
+    infix rule.
+    """
+
     def __init__(self, runtime):
-        self.__current = 0
         self.__program = []
         self.__runtime = runtime
+        # The rules of the expression parser, by the type of the token that
+        # starts an operand and of the operator that follows one.
+        self.__prefix = {
+            TokenType.FALSE: self.__LITERAL,
+            TokenType.TRUE: self.__LITERAL,
+            TokenType.NIL: self.__LITERAL,
+            TokenType.NUMBER: self.__LITERAL,
+            TokenType.STRING: self.__LITERAL,
+            TokenType.SUPER: self.__SUPER,
+            TokenType.THIS: self.__THIS,
+            TokenType.IDENTIFIER: self.__VARIABLE,
+            TokenType.LEFT_PAREN: self.__GROUPING,
+            TokenType.BANG: self.__UNARY,
+            TokenType.MINUS: self.__UNARY,
+        }
+        self.__infix = {
+            TokenType.EQUAL: self.__ASSIGN,
+            TokenType.OR: self.__LOGICAL,
+            TokenType.AND: self.__LOGICAL,
+            TokenType.BANG_EQUAL: self.__BINARY,
+            TokenType.EQUAL_EQUAL: self.__BINARY,
+            TokenType.GREATER: self.__BINARY,
+            TokenType.GREATER_EQUAL: self.__BINARY,
+            TokenType.LESS: self.__BINARY,
+            TokenType.LESS_EQUAL: self.__BINARY,
+            TokenType.MINUS: self.__BINARY,
+            TokenType.PLUS: self.__BINARY,
+            TokenType.SLASH: self.__BINARY,
+            TokenType.STAR: self.__BINARY,
+            TokenType.LEFT_PAREN: self.__ARGUMENTS,
+            TokenType.DOT: self.__GET,
+        }
 
     @property
     def program(self) -> list[stmtType.Stmt]:
         return self.__program
 
-    def run(self, tokens: list[Token]):
-        self.__tokens = tokens
-        self.__PROGRAM()
+    def run(self, tokens: Iterable[Token]):
+        self.__program.extend(self.stream(tokens))
+
+    def stream(self, tokens: Iterable[Token]) -> Iterator[stmtType.Stmt]:
+        """Parse the top level declarations one at a time."""
+        self.__tokens = iter(tokens)
+        self.__current = next(self.__tokens)
+        self.__last: Optional[Token] = None
+        self.__position = 0
+        return self.__PROGRAM()
+
+    @property
+    def position(self) -> int:
+        """The number of tokens parsed, which is where the next declaration
+        starts when the last one has just been yielded by `stream`."""
+        return self.__position
 
-    def __PROGRAM(self):
+    def __PROGRAM(self) -> Iterator[stmtType.Stmt]:
         while not self.__isAtEnd():
             if declaration := self.__DECLARATION():
-                self.__program.append(declaration)
+                yield declaration
 
     def __DECLARATION(self) -> Optional[stmtType.Stmt]:
         try:
@@ -229,102 +304,52 @@ class Parser:
         return stmtType.Print(value)
 
     def __EXPRESSION(self) -> exprType.Expr:
-        assignments: list[exprType.Expr] = [self.__ASSIGNMENT()]
+        assignments = [self.__PRECEDENCE(Precedence.ASSIGNMENT)]
         while self.__match(TokenType.COMMA):
-            assignments.append(self.__ASSIGNMENT())
+            assignments.append(self.__PRECEDENCE(Precedence.ASSIGNMENT))
         if len(assignments) == 1:
             return assignments[0]
         return exprType.Comma(assignments)
 
-    def __ASSIGNMENT(self) -> exprType.Expr:
-        expr = self.__LOGIC_OR()
-        if self.__match(TokenType.EQUAL):
-            equals = self.__previous()
-            value = self.__ASSIGNMENT()
-            if isinstance(expr, exprType.Variable):
-                name = expr.name
-                return exprType.Assign(name, value)
-            elif isinstance(expr, exprType.Get):
-                return exprType.Set(expr.obj, expr.name, value)
-            raise ParseError(equals.line, "Invalid assignment target.")
-        return expr
-
-    def __LOGIC_OR(self) -> exprType.Expr:
-        expr = self.__LOGIC_AND()
-        while self.__match(TokenType.OR):
-            operator = self.__previous()
-            right = self.__LOGIC_AND()
-            expr = exprType.Logical(left=expr, operator=operator, right=right)
+    def __PRECEDENCE(self, precedence: Precedence) -> exprType.Expr:
+        """Parse an expression whose operators bind at least as tightly as
+        `precedence`, by the prefix rule of its first token and the infix rule
+        of each operator after it."""
+        prefix = self.__prefix.get(self.__current.tokenType)
+        if prefix is None:
+            raise ParseError(self.__current.line, "Expect expression.")
+        expr = prefix(self.__advance())
+        while BINDING.get(self.__current.tokenType, Precedence.NONE) >= precedence:
+            operator = self.__advance()
+            expr = self.__infix[operator.tokenType](expr, operator)
         return expr
 
-    def __LOGIC_AND(self) -> exprType.Expr:
-        expr = self.__EQUALITY()
-        while self.__match(TokenType.AND):
-            operator = self.__previous()
-            right = self.__EQUALITY()
-            expr = exprType.Logical(left=expr, operator=operator, right=right)
-        return expr
-
-    def __EQUALITY(self) -> exprType.Expr:
-        expr = self.__COMPARISON()
-        while self.__match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
-            operator = self.__previous()
-            right = self.__COMPARISON()
-            expr = exprType.Binary(expr, operator, right)
-        return expr
+    def __ASSIGN(self, target: exprType.Expr, equals: Token) -> exprType.Expr:
+        value = self.__PRECEDENCE(Precedence.ASSIGNMENT)
+        if isinstance(target, exprType.Variable):
+            return exprType.Assign(target.name, value)
+        elif isinstance(target, exprType.Get):
+            return exprType.Set(target.obj, target.name, value)
+        raise ParseError(equals.line, "Invalid assignment target.")
 
-    def __COMPARISON(self) -> exprType.Expr:
-        expr = self.__ADDITION()
-        while self.__match(
-            TokenType.GREATER,
-            TokenType.GREATER_EQUAL,
-            TokenType.LESS,
-            TokenType.LESS_EQUAL,
-        ):
-            operator = self.__previous()
-            right = self.__ADDITION()
-            expr = exprType.Binary(expr, operator, right)
-        return expr
+    def __LOGICAL(self, left: exprType.Expr, operator: Token) -> exprType.Expr:
+        right = self.__PRECEDENCE(Precedence(BINDING[operator.tokenType] + 1))
+        return exprType.Logical(left=left, operator=operator, right=right)
 
-    def __ADDITION(self) -> exprType.Expr:
-        expr = self.__MULTIPLICATION()
-        while self.__match(TokenType.MINUS, TokenType.PLUS):
-            operator = self.__previous()
-            right = self.__MULTIPLICATION()
-            expr = exprType.Binary(expr, operator, right)
-        return expr
+    def __BINARY(self, left: exprType.Expr, operator: Token) -> exprType.Expr:
+        right = self.__PRECEDENCE(Precedence(BINDING[operator.tokenType] + 1))
+        return exprType.Binary(left, operator, right)
 
-    def __MULTIPLICATION(self) -> exprType.Expr:
-        expr = self.__UNARY()
-        while self.__match(TokenType.SLASH, TokenType.STAR):
-            operator = self.__previous()
-            right = self.__UNARY()
-            expr = exprType.Binary(expr, operator, right)
-        return expr
+    def __UNARY(self, operator: Token) -> exprType.Expr:
+        right = self.__PRECEDENCE(Precedence.UNARY)
+        return exprType.Unary(operator, right)
 
-    def __UNARY(self) -> exprType.Expr:
-        if self.__match(TokenType.BANG, TokenType.MINUS):
-            operator = self.__previous()
-            right = self.__UNARY()
-            return exprType.Unary(operator, right)
-        return self.__CALL()
-
-    def __CALL(self) -> exprType.Expr:
-        expr = self.__PRIMARY()
-        while True:
-            if self.__match(TokenType.LEFT_PAREN):
-                expr = self.__ARGUMENTS(expr)
-            elif self.__match(TokenType.DOT):
-                name = self.__consume(
-                    TokenType.IDENTIFIER, "Expect property name after '.'."
-                )
-                assert name is not None
-                expr = exprType.Get(expr, name)
-            else:
-                break
-        return expr
+    def __GET(self, obj: exprType.Expr, _: Token) -> exprType.Expr:
+        name = self.__consume(TokenType.IDENTIFIER, "Expect property name after '.'.")
+        assert name is not None
+        return exprType.Get(obj, name)
 
-    def __ARGUMENTS(self, callee: exprType.Expr) -> exprType.Expr:
+    def __ARGUMENTS(self, callee: exprType.Expr, _: Token) -> exprType.Expr:
         arguments = []
         if not self.__check(TokenType.RIGHT_PAREN):
             arguments.append(self.__EXPRESSION())
@@ -338,32 +363,25 @@ class Parser:
         assert paren is not None
         return exprType.Call(callee, paren, arguments)
 
-    def __PRIMARY(self) -> exprType.Expr:
-        if self.__match(TokenType.FALSE):
-            return exprType.Literal(False)
-        if self.__match(TokenType.TRUE):
-            return exprType.Literal(True)
-        if self.__match(TokenType.NIL):
-            return exprType.Literal(None)
-        if self.__match(TokenType.NUMBER, TokenType.STRING):
-            return exprType.Literal(self.__previous().literal)
-        if self.__match(TokenType.SUPER):
-            keyword = self.__previous()
-            self.__consume(TokenType.DOT, "Expect '.' after 'super'.")
-            method = self.__consume(
-                TokenType.IDENTIFIER, "Expect superclass method name."
-            )
-            assert method is not None
-            return exprType.Super(keyword, method)
-        if self.__match(TokenType.THIS):
-            return exprType.This(self.__previous())
-        if self.__match(TokenType.IDENTIFIER):
-            return exprType.Variable(self.__previous())
-        if self.__match(TokenType.LEFT_PAREN):
-            expr = self.__EXPRESSION()
-            self.__consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
-            return exprType.Grouping(expr)
-        raise ParseError(self.__peek().line, "Expect expression.")
+    def __LITERAL(self, token: Token) -> exprType.Expr:
+        return exprType.Literal(LITERALS.get(token.tokenType, token.literal))
+
+    def __SUPER(self, keyword: Token) -> exprType.Expr:
+        self.__consume(TokenType.DOT, "Expect '.' after 'super'.")
+        method = self.__consume(TokenType.IDENTIFIER, "Expect superclass method name.")
+        assert method is not None
+        return exprType.Super(keyword, method)
+
+    def __THIS(self, keyword: Token) -> exprType.Expr:
+        return exprType.This(keyword)
+
+    def __VARIABLE(self, name: Token) -> exprType.Expr:
+        return exprType.Variable(name)
+
+    def __GROUPING(self, _: Token) -> exprType.Expr:
+        expr = self.__EXPRESSION()
+        self.__consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+        return exprType.Grouping(expr)
 
     def __match(self, *args: TokenType) -> bool:
         for tokentype in args:
@@ -384,14 +402,17 @@ class Parser:
 
     def __advance(self) -> Token:
         if not self.__isAtEnd():
-            self.__current += 1
+            self.__last = self.__current
+            self.__current = next(self.__tokens)
+            self.__position += 1
         return self.__previous()
 
     def __peek(self) -> Token:
-        return self.__tokens[self.__current]
+        return self.__current
 
     def __previous(self) -> Token:
-        return self.__tokens[self.__current - 1]
+        assert self.__last is not None
+        return self.__last
 
     def __isAtEnd(self) -> bool:
         return self.__peek().tokenType == TokenType.EOF
@@ -0,0 +1,16 @@
+from enum import IntEnum, auto
+
+
+class Precedence(IntEnum):
+    """How tightly the operators bind, from loosest to tightest."""
+
+    NONE = auto()
+    ASSIGNMENT = auto()
+    OR = auto()
+    AND = auto()
+    EQUALITY = auto()
+    COMPARISON = auto()
+    TERM = auto()
+    FACTOR = auto()
+    UNARY = auto()
+    CALL = auto()
@@ -3,9 +3,10 @@
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Callable, Optional
 from parser.expr import Expr, Variable
 from scanner.token import Token
+from optimizer.countedLoop import CountedLoop
 
 
 class StmtVisitor(ABC):
@@ -57,6 +58,9 @@ class Stmt(ABC):
 class Block(Stmt):
     def __init__(self, statements: list[Stmt]):
         self.statements = statements
+        self.size: int = 0
+        self.frameSize: int = 0
+        self.escapes: bool = False
 
     def accept(self, visitor: StmtVisitor):
         """Create a accept method that calls the visitor."""
@@ -70,6 +74,12 @@ class Class(Stmt):
         self.name = name
         self.superclass = superclass
         self.methods = methods
+        self.slot: Optional[int] = None
+        self.index: Optional[int] = None
+        self.captured: bool = False
+        self.assigned: bool = False
+        self.superIndex: Optional[int] = None
+        self.frameSize: int = 0
 
     def accept(self, visitor: StmtVisitor):
         """Create a accept method that calls the visitor."""
@@ -90,6 +100,16 @@ class Function(Stmt):
         self.name = name
         self.params = params
         self.body = body
+        self.slot: Optional[int] = None
+        self.index: Optional[int] = None
+        self.captured: bool = False
+        self.assigned: bool = False
+        self.size: int = 0
+        self.frameSize: int = 0
+        self.upvalues: list[tuple[bool, int]] = []
+        self.cells: list[int] = []
+        self.pure: bool = True
+        self.compiled: Optional[Callable] = None
 
     def accept(self, visitor: StmtVisitor):
         """Create a accept method that calls the visitor."""
@@ -130,6 +150,10 @@ class Var(Stmt):
     def __init__(self, name: Token, initializer: Optional[Expr]):
         self.name = name
         self.initializer = initializer
+        self.slot: Optional[int] = None
+        self.index: Optional[int] = None
+        self.captured: bool = False
+        self.assigned: bool = False
 
     def accept(self, visitor: StmtVisitor):
         """Create a accept method that calls the visitor."""
@@ -140,6 +164,7 @@ class While(Stmt):
     def __init__(self, condition: Expr, body: Stmt):
         self.condition = condition
         self.body = body
+        self.counted: Optional[CountedLoop] = None
 
     def accept(self, visitor: StmtVisitor):
         """Create a accept method that calls the visitor."""
@@ -1,19 +1,32 @@
 import sys
 import os
 import readline
+import argparse
 from parser.parser import Parser
 from parser.stmt import Stmt
-from typing import Any
+from typing import Any, Optional, Sequence, TextIO
 from resolver.resolver import Resolver
+from optimizer.optimizer import Optimizer
+from optimizer.loopOptimizer import LoopOptimizer
+from optimizer.countedLoopDetector import CountedLoopDetector
+from optimizer.astPrinter import AstPrinter
 from runtime.interpreter import Interpreter
 from runtime.interpreter import stringify
+from jit.jit import BACK_EDGE_THRESHOLD, CALL_THRESHOLD, Jit
 from scanner.scanner import Scanner
 from scanner.token import Token
 from scanner.scanError import ScanError
 from parser.parseError import ParseError
 from resolver.resolveError import ResolveError
 from runtime.ploxRuntimeError import PloxRuntimeError
+from vm.vm import VM
+from closure.closureCompiler import ClosureCompiler
+from transpiler.pythonEngine import PythonEngine
 from enum import Enum
+from functools import partial
+
+# Characters read at a time when a file is streamed.
+CHUNK_SIZE = 1 << 16
 
 
 class RunMode(Enum):
@@ -21,17 +34,47 @@ class RunMode(Enum):
     PROMPT = 1
 
 
+ENGINES = {
+    "interpreter": Interpreter,
+    "vm": VM,
+    "closure": ClosureCompiler,
+    "python": PythonEngine,
+}
+
+
 class Plox:
-    def __init__(self):
+    def __init__(
+        self,
+        engine: str = "interpreter",
+        optimize: int = 1,
+        dumpAst: bool = False,
+        maxDepth: Optional[int] = None,
+        quicken: bool = False,
+        jit: Optional[Jit] = None,
+        stream: bool = False,
+    ):
         self.__hadError = False
         self.__runtime = self
-        self.__interpreter = Interpreter(self.__runtime)
+        options: dict[str, Any] = {}
+        if maxDepth is not None:
+            options["maxDepth"] = maxDepth
+        if quicken:
+            options["quicken"] = True
+        if jit is not None:
+            options["jit"] = jit
+        self.__engine = ENGINES[engine](self.__runtime, **options)
+        self.__optimize = optimize
+        self.__dumpAst = dumpAst
+        self.__stream = stream
 
     def runFile(self, path: str):
         self.__runMode = RunMode.FILE
         with open(path) as file:
-            self.source = file.read()
-        self.run()
+            if self.__stream:
+                self.__runStream(file)
+            else:
+                self.source = file.read()
+                self.run()
         if self.__hadError:
             sys.exit(65)
         exit(0)
@@ -71,16 +114,42 @@ class Plox:
         if self.__hadError:
             return
         self.__runResolver(program)
-        return self.__runInterpreter(program)
+        if self.__hadError:
+            return
+        program = self.__runOptimizer(program)
+        if self.__dumpAst:
+            print(AstPrinter().print(program))
+        return self.__runEngine(program)
 
-    def __runScanner(self, source: str) -> list[Token]:
+    def __runStream(self, file: TextIO):
+        """Run each top level declaration of `file` as soon as it is parsed,
+        reading the file in chunks, so that neither the whole source nor all
+        of its tokens and tree are held at once. Once there is an error the
+        rest of the file is only parsed, to report its errors."""
+        chunks = iter(partial(file.read, CHUNK_SIZE), "")
+        tokens = Scanner(self.__runtime).stream(chunks)
+        try:
+            for declaration in Parser(self.__runtime).stream(tokens):
+                if self.__hadError:
+                    continue
+                self.__runResolver([declaration])
+                if self.__hadError:
+                    continue
+                program = self.__runOptimizer([declaration])
+                if self.__dumpAst:
+                    print(AstPrinter().print(program))
+                self.__runEngine(program)
+        except ScanError as error:
+            self.reportError(error)
+
+    def __runScanner(self, source: str) -> Sequence[Token]:
         scanner = Scanner(self.__runtime)
         scanner.run(source)
         if self.__hadError:
             return []
         return scanner.tokens
 
-    def __runParser(self, tokens: list[Token]) -> list[Stmt]:
+    def __runParser(self, tokens: Sequence[Token]) -> list[Stmt]:
         parser = Parser(self.__runtime)
         parser.run(tokens)
         if self.__hadError:
@@ -88,12 +157,24 @@ class Plox:
         return parser.program
 
     def __runResolver(self, program: list[Stmt]):
-        resolver = Resolver(self.__interpreter, self.__runtime)
+        # Engines that keep their globals in slots have them resolved too.
+        resolver = Resolver(self.__runtime, getattr(self.__engine, "globals", None))
         resolver.run(program)
 
-    def __runInterpreter(self, program: list[Stmt]) -> Any:
-        self.__interpreter.run(program)
-        return self.__interpreter.result
+    def __runOptimizer(self, program: list[Stmt]) -> list[Stmt]:
+        optimizer = Optimizer(self.__optimize)
+        program = optimizer.run(program)
+        if self.__optimize >= 2:
+            program = LoopOptimizer().run(program)
+            # The loop optimizer declares temporaries, which need slots.
+            self.__runResolver(program)
+        if self.__optimize >= 1:
+            program = CountedLoopDetector().run(program)
+        return program
+
+    def __runEngine(self, program: list[Stmt]) -> Any:
+        self.__engine.run(program)
+        return self.__engine.result
 
     def reportError(
         self, error: ScanError | ParseError | ResolveError | PloxRuntimeError
@@ -114,12 +195,96 @@ class Plox:
 
 
 if __name__ == "__main__":
-    lox = Plox()
-    args = sys.argv[1:]
-    if len(args) > 1:
-        print("Usage: lox [script]")
-        exit(64)
-    elif len(args) == 1:
-        lox.runFile(args[0])
+    argParser = argparse.ArgumentParser(prog="plox")
+    argParser.add_argument("script", nargs="?")
+    argParser.add_argument(
+        "--engine",
+        choices=ENGINES.keys(),
+        default="interpreter",
+        help="execution engine (default: the tree-walking interpreter)",
+    )
+    argParser.add_argument(
+        "-O",
+        dest="optimize",
+        type=int,
+        choices=(0, 1, 2),
+        default=1,
+        help="optimization level: 0 disables the optimizer, 2 also optimizes loops "
+        "(default: 1)",
+    )
+    argParser.add_argument(
+        "--dump-ast",
+        action="store_true",
+        help="print the tree handed to the engine after optimization",
+    )
+    argParser.add_argument(
+        "--max-depth",
+        type=int,
+        help="maximum number of nested Lox calls on the vm engine, which keeps "
+        "them off the Python stack (default: 100000)",
+    )
+    argParser.add_argument(
+        "--quicken",
+        action="store_true",
+        help="let the interpreter specialize nodes for the values they have seen",
+    )
+    argParser.add_argument(
+        "--jit",
+        action="store_true",
+        help="let the interpreter compile hot functions to Python",
+    )
+    argParser.add_argument(
+        "--jit-calls",
+        type=int,
+        default=CALL_THRESHOLD,
+        help="calls after which the jit compiles a function "
+        f"(default: {CALL_THRESHOLD})",
+    )
+    argParser.add_argument(
+        "--jit-back-edges",
+        type=int,
+        default=BACK_EDGE_THRESHOLD,
+        help="loop iterations in a function after which the jit compiles it "
+        f"(default: {BACK_EDGE_THRESHOLD})",
+    )
+    argParser.add_argument(
+        "--jit-log",
+        action="store_true",
+        help="report the functions the jit compiles and the time it takes",
+    )
+    argParser.add_argument(
+        "--stream",
+        action="store_true",
+        help="read the script in chunks and run each top level declaration as "
+        "soon as it is parsed, so that large scripts need little memory",
+    )
+    args = argParser.parse_args()
+    if args.max_depth is not None:
+        if args.engine != "vm":
+            argParser.error("--max-depth is only supported by the vm engine")
+        if args.max_depth < 1:
+            argParser.error("--max-depth must be positive")
+    if args.quicken and args.engine != "interpreter":
+        argParser.error("--quicken is only supported by the interpreter engine")
+    jit = None
+    if args.jit or args.jit_log:
+        if args.engine != "interpreter":
+            argParser.error("--jit is only supported by the interpreter engine")
+        if args.jit_calls < 1 or args.jit_back_edges < 1:
+            argParser.error("jit thresholds must be positive")
+        jit = Jit(args.jit_calls, args.jit_back_edges, args.jit_log)
+    if args.stream and args.script is None:
+        argParser.error("--stream needs a script")
+    lox = Plox(
+        args.engine,
+        args.optimize,
+        args.dump_ast,
+        args.max_depth,
+        args.quicken,
+        jit,
+        args.stream,
+    )
+    if args.script is not None:
+        lox.runFile(args.script)
     else:
         lox.runPrompt()
@@ -0,0 +1,9 @@
+from enum import Enum, auto
+
+
+class AccessType(Enum):
+
+    GLOBAL = auto()
+    LOCAL = auto()
+    CELL = auto()
+    UPVALUE = auto()
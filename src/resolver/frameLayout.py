@@ -0,0 +1,27 @@
+from typing import Optional
+
+
+class FrameLayout:
+    """The flat frame of one function: its local slots and the cells it captures.
+
+    Block scopes do not get frames of their own, their variables take the next
+    free slots of the enclosing function and give them back when they end.
+    """
+
+    def __init__(self, enclosing: Optional["FrameLayout"]):
+        self.enclosing = enclosing
+        self.next = 0
+        self.size = 0
+        self.upvalues: list[tuple[bool, int]] = []
+
+    def allocate(self) -> int:
+        index = self.next
+        self.next += 1
+        self.size = max(self.size, self.next)
+        return index
+
+    def addUpvalue(self, isLocal: bool, index: int) -> int:
+        upvalue = (isLocal, index)
+        if upvalue not in self.upvalues:
+            self.upvalues.append(upvalue)
+        return self.upvalues.index(upvalue)
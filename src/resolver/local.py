@@ -0,0 +1,36 @@
+from typing import TYPE_CHECKING, Optional
+from parser.expr import Expr
+from parser.stmt import Stmt
+from resolver.frameLayout import FrameLayout
+
+if TYPE_CHECKING:
+    from resolver.scope import Scope
+
+
+class Local:
+    """A variable declared in a local scope.
+
+    `slot` is the variable's position in its scope's `Environment`, `index`
+    its position in the flat frame of the function declaring it. Whether the
+    variable is captured, and which of the blocks between a reference and the
+    declaration get an `Environment`, is only known once its scope ends, so
+    references are collected together with the scope they appear in and
+    annotated then.
+    """
+
+    def __init__(
+        self,
+        slot: int,
+        scope: "Scope",
+        frame: FrameLayout,
+        declaration: Optional[Stmt] = None,
+    ):
+        self.slot = slot
+        self.scope = scope
+        self.frame = frame
+        self.index = frame.allocate()
+        self.declaration = declaration
+        self.defined = False
+        self.captured = False
+        self.assigned = False
+        self.references: list[tuple[Expr, "Scope"]] = []
@@ -1,25 +1,55 @@
 from parser.stmt import Stmt
+from typing import Optional
 from scanner.token import Token
-from parser.expr import ExprVisitor
+from scanner.tokenType import TokenType
+from parser.expr import ExprVisitor, This
 from parser.stmt import StmtVisitor
 import parser.expr as expr
 import parser.stmt as stmt
+from resolver.accessType import AccessType
+from resolver.frameLayout import FrameLayout
 from resolver.functionType import FunctionType
+from resolver.local import Local
+from resolver.scope import Scope
 from resolver.classType import ClassType
+from runtime.globals import Globals
 from runtime.ploxRuntimeError import PloxRuntimeError
 from resolver.resolveError import ResolveError
 
 
 class Resolver(ExprVisitor, StmtVisitor):
-    def __init__(self, interpreter, runtime):
-        self.__interpreter = interpreter
+    def __init__(self, runtime, globals: Optional[Globals] = None):
         self.__runtime = runtime
-        self.__scopes = []
+        # The globals of the engine, if it keeps them in slots.
+        self.__globals = globals
+        self.__scopes: list[Scope] = []
+        self.__frame = FrameLayout(None)
+        self.__closures = 0
+        # The functions being resolved, innermost last, with their frames.
+        self.__functions: list[tuple[FrameLayout, stmt.Function]] = []
         self.__currentFunction = FunctionType.NONE
         self.__currentClass = ClassType.NONE
+        # The functions each global of the program can hold, or None for one
+        # that can hold other values, and the globals and the captured
+        # variables the functions read, their callees among them. What is known
+        # about the globals is kept on `globals` for the runs after this one.
+        purity = globals if globals is not None else Globals()
+        self.__globalFunctions: dict[str, Optional[list[stmt.Function]]] = (
+            purity.functions
+        )
+        self.__globalReads: list[tuple[stmt.Function, str]] = purity.reads
+        self.__reads: list[tuple[stmt.Function, Local]] = []
 
     def run(self, program: list[Stmt]):
+        for statement in program:
+            if isinstance(statement, stmt.Function):
+                self.__globalFunction(statement.name.lexeme, statement)
+            elif isinstance(statement, stmt.Var):
+                self.__globalFunction(statement.name.lexeme, statement.initializer)
+            elif isinstance(statement, stmt.Class):
+                self.__globalFunction(statement.name.lexeme, None)
         self.__resolve(program)
+        self.__impureReaders()
 
     def __resolve(self, statements: list[Stmt]):
         self.__resolveStatements(statements)
@@ -34,49 +64,223 @@ class Resolver(ExprVisitor, StmtVisitor):
     def __resolveExpression(self, expression: expr.Expr):
         expression.accept(self)
 
-    def __resolveLocal(self, expr: expr.Expr, name: Token):
-        for idx, scope in enumerate(reversed(self.__scopes)):
-            if name.lexeme in scope:
-                self.__interpreter.resolve(expr, idx)
-                return
+    def __lookup(self, name: str) -> Optional[Local]:
+        for scope in reversed(self.__scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    def __resolveLocal(
+        self, expr: expr.Variable | expr.Assign | expr.This | expr.Super, name: Token
+    ) -> Optional[Local]:
+        if (local := self.__lookup(name.lexeme)) is not None:
+            expr.slot = local.slot
+            local.references.append((expr, self.__scopes[-1]))
+            if local.frame is self.__frame:
+                expr.access = AccessType.LOCAL
+                expr.index = local.index
+            else:
+                expr.access = AccessType.UPVALUE
+                expr.index = self.__resolveUpvalue(self.__frame, local)
+            return local
+        if self.__globals is not None:
+            expr.index = self.__globals.slot(name.lexeme)
+        return None
+
+    def __resolveUpvalue(self, frame: FrameLayout, local: Local) -> int:
+        assert frame.enclosing is not None
+        if local.frame is frame.enclosing:
+            local.captured = True
+            return frame.addUpvalue(True, local.index)
+        index = self.__resolveUpvalue(frame.enclosing, local)
+        return frame.addUpvalue(False, index)
 
     def __resolveFunction(self, function: stmt.Function, type: FunctionType):
         enclosingFunction = self.__currentFunction
+        enclosingFrame = self.__frame
         self.__currentFunction = type
+        self.__frame = FrameLayout(enclosingFrame)
+        self.__closures += 1
+        # A method depends on the fields of its receiver as well as on its
+        # arguments.
+        function.pure = type is FunctionType.FUNCTION
+        self.__functions.append((self.__frame, function))
+        parameters = []
+        if type in (FunctionType.METHOD, FunctionType.INITIALIZER):
+            # The receiver takes slot zero of every method frame.
+            receiver = Local(0, self.__scopes[-1], self.__frame)
+            receiver.defined = True
+            self.__scopes[-1]["this"] = receiver
+            parameters.append(receiver)
         self.__beginScope()
         for param in function.params:
-            self.__declare(param)
+            parameters.append(self.__declare(param))
             self.__define(param)
 
         self.__resolveStatements(function.body)
-        self.__endScope()
+        function.size = self.__endScope()
+        if type in (FunctionType.METHOD, FunctionType.INITIALIZER):
+            self.__endLocal(parameters[0])
+        function.frameSize = self.__frame.size
+        function.upvalues = self.__frame.upvalues
+        function.cells = [local.index for local in parameters if local.captured]
+        self.__functions.pop()
+        self.__frame = enclosingFrame
         self.current_function = enclosingFunction
 
-    def __beginScope(self):
-        self.__scopes.append({})
-
-    def __endScope(self):
-        self.__scopes.pop()
-
-    def __declare(self, name: Token):
-        if len(self.__scopes) == 0:
+    def __impure(self, frame: Optional[FrameLayout] = None):
+        """Mark the functions being resolved as impure, up to the one owning
+        `frame`, the frame of the variable being assigned.
+
+        A function is pure when it does not assign variables declared outside
+        of it, print, get or set fields, reads only the program's functions and
+        the variables of enclosing functions that are never assigned, and calls
+        only pure functions.
+        """
+        for functionFrame, function in reversed(self.__functions):
+            if functionFrame is frame:
+                break
+            function.pure = False
+
+    def __call(self, callee: expr.Expr):
+        """Record a call in the function being resolved, which is impure
+        unless the callee is one of the program's functions and is pure."""
+        function = self.__functions[-1][1]
+        if not isinstance(callee, expr.Variable):
+            function.pure = False
             return
+        name = callee.name.lexeme
+        local = self.__lookup(name)
+        if local is None and name in self.__globalFunctions:
+            self.__globalReads.append((function, name))
+        elif local is not None and isinstance(local.declaration, stmt.Function):
+            self.__reads.append((function, local))
+        else:
+            function.pure = False
+
+    def __read(self, local: Optional[Local], name: str):
+        """Record a read of a variable in the function being resolved, which is
+        impure unless the variable is its own or is never assigned. A global
+        other than the program's functions can be given a value by any later
+        declaration, so reading one is impure."""
+        function = self.__functions[-1][1]
+        if local is None and name in self.__globalFunctions:
+            self.__globalReads.append((function, name))
+        elif local is None:
+            function.pure = False
+        elif local.frame is not self.__frame:
+            self.__reads.append((function, local))
+
+    def __impureReaders(self):
+        """Mark impure the functions that read assigned variables or call
+        impure functions, until none is left.
+
+        Reads make functions impure only once all of them are resolved, as a
+        function can read variables that are assigned after it and call
+        functions declared after it."""
+        changed = True
+        while changed:
+            changed = False
+            for function, variable in self.__globalReads + self.__reads:
+                if function.pure and not self.__pureRead(variable):
+                    function.pure = False
+                    changed = True
+
+    def __pureRead(self, variable: Local | str) -> bool:
+        if isinstance(variable, str):
+            functions = self.__globalFunctions[variable]
+            return functions is not None and all(f.pure for f in functions)
+        if variable.assigned:
+            return False
+        declaration = variable.declaration
+        return not isinstance(declaration, stmt.Function) or declaration.pure
+
+    def __globalFunction(self, name: str, value: Optional[stmt.Function | expr.Expr]):
+        """Record that the global `name` is given `value`. The functions `memo`
+        returns are pure, so they leave the global as pure as it was."""
+        functions = self.__globalFunctions.setdefault(name, [])
+        if functions is None:
+            return
+        if isinstance(value, stmt.Function):
+            functions.append(value)
+        elif not (
+            isinstance(value, expr.Call)
+            and isinstance(value.callee, expr.Variable)
+            and value.callee.name.lexeme == "memo"
+            and "memo" not in self.__globalFunctions
+            and self.__lookup("memo") is None
+        ):
+            self.__globalFunctions[name] = None
+
+    def __beginScope(self, isBlock: bool = False):
+        parent = self.__scopes[-1] if self.__scopes else None
+        self.__scopes.append(Scope(parent, isBlock))
+
+    def __endScope(self) -> int:
+        """Close the innermost scope and return the number of slots it needs."""
+        scope = self.__scopes.pop()
+        for local in scope.values():
+            self.__endLocal(local)
+            if local.frame is self.__frame:
+                self.__frame.next -= 1
+        return len(scope)
+
+    def __endLocal(self, local: Local):
+        """Annotate the references and the declaration of a local going out of
+        scope, now that its captures and the blocks in between are known."""
+        access = AccessType.CELL if local.captured else AccessType.LOCAL
+        for reference, scope in local.references:
+            reference.depth = self.__depth(scope, local)
+            if reference.access is AccessType.LOCAL:
+                reference.access = access
+        if local.declaration is not None:
+            local.declaration.captured = local.captured
+            local.declaration.assigned = local.assigned
+
+    def __depth(self, scope: Scope, local: Local) -> int:
+        """Count the environments between a reference in `scope` and `local`."""
+        depth = 0
+        while scope is not local.scope:
+            if scope.allocates:
+                depth += 1
+            assert scope.parent is not None
+            scope = scope.parent
+        return depth
+
+    def __declare(
+        self,
+        name: Token,
+        declaration: Optional[stmt.Var | stmt.Function | stmt.Class] = None,
+    ) -> Optional[Local]:
+        if len(self.__scopes) == 0:
+            return None
         scope = self.__scopes[-1]
         if name.lexeme in scope:
             self.__throwResolveError(
                 name, "Variable with this name already declared in this scope."
             )
-        scope[name.lexeme] = False
+        local = Local(len(scope), scope, self.__frame, declaration)
+        scope[name.lexeme] = local
+        if declaration is not None:
+            declaration.slot = local.slot
+            declaration.index = local.index
+        return local
 
     def __define(self, name: Token):
         if len(self.__scopes) == 0:
             return
         scope = self.__scopes[-1]
-        scope[name.lexeme] = True
+        scope[name.lexeme].defined = True
 
     def visit_assign_expr(self, expr: expr.Assign):
         self.__resolveExpression(expr.value)
-        self.__resolveLocal(expr, expr.name)
+        if (local := self.__resolveLocal(expr, expr.name)) is not None:
+            local.assigned = True
+            self.__impure(local.frame)
+        else:
+            self.__impure()
+            if expr.name.lexeme in self.__globalFunctions:
+                self.__globalFunction(expr.name.lexeme, expr.value)
 
     def visit_binary_expr(self, expr: expr.Binary):
         self.__resolveExpression(expr.left)
@@ -86,6 +290,8 @@ class Resolver(ExprVisitor, StmtVisitor):
         self.__resolveExpression(expr.callee)
         for argument in expr.arguments:
             self.__resolveExpression(argument)
+        if self.__functions:
+            self.__call(expr.callee)
 
     def visit_comma_expr(self, expr: expr.Comma):
         for expression in expr.expressions:
@@ -93,6 +299,7 @@ class Resolver(ExprVisitor, StmtVisitor):
 
     def visit_get_expr(self, expr: expr.Get):
         self.__resolveExpression(expr.obj)
+        self.__impure()
 
     def visit_grouping_expr(self, expr: expr.Grouping):
         self.__resolveExpression(expr.expression)
@@ -107,6 +314,7 @@ class Resolver(ExprVisitor, StmtVisitor):
     def visit_set_expr(self, expr: expr.Set):
         self.__resolveExpression(expr.value)
         self.__resolveExpression(expr.obj)
+        self.__impure()
 
     def visit_super_expr(self, expr: expr.Super):
         if self.__currentClass == ClassType.NONE:
@@ -118,6 +326,8 @@ class Resolver(ExprVisitor, StmtVisitor):
                 expr.keyword, "Cannot use 'super' in a class with no superclass."
             )
         self.__resolveLocal(expr, expr.keyword)
+        expr.receiver = This(Token(TokenType.THIS, "this", None, expr.keyword.line))
+        self.__resolveLocal(expr.receiver, expr.receiver.keyword)
 
     def visit_this_expr(self, expr: expr.This):
         if self.__currentClass == ClassType.NONE:
@@ -130,21 +340,28 @@ class Resolver(ExprVisitor, StmtVisitor):
         self.__resolveExpression(expr.right)
 
     def visit_variable_expr(self, expr: expr.Variable):
-        if len(self.__scopes) != 0 and self.__scopes[-1].get(expr.name.lexeme) == False:
+        local = self.__scopes[-1].get(expr.name.lexeme) if self.__scopes else None
+        if local is not None and not local.defined:
             self.__throwRuntimeError(
                 expr.name, "Cannot read local variable in its own initializer."
             )
-        self.__resolveLocal(expr, expr.name)
+        local = self.__resolveLocal(expr, expr.name)
+        if self.__functions:
+            self.__read(local, expr.name.lexeme)
 
     def visit_block_stmt(self, stmt: stmt.Block):
-        self.__beginScope()
+        closures = self.__closures
+        self.__beginScope(isBlock=True)
         self.__resolveStatements(stmt.statements)
-        self.__endScope()
+        stmt.size = self.__endScope()
+        # A closure created inside the block holds on to its environment.
+        stmt.escapes = self.__closures != closures
+        stmt.frameSize = self.__frame.size
 
     def visit_class_stmt(self, stmt: stmt.Class):
         enclosingClass = self.__currentClass
         self.__currentClass = ClassType.CLASS
-        self.__declare(stmt.name)
+        self.__declare(stmt.name, stmt)
         self.__define(stmt.name)
         if stmt.superclass and stmt.name.lexeme == stmt.superclass.name.lexeme:
             self.__throwResolveError(
@@ -155,9 +372,10 @@ class Resolver(ExprVisitor, StmtVisitor):
             self.__resolveExpression(stmt.superclass)
         if stmt.superclass is not None:
             self.__beginScope()
-            self.__scopes[-1]["super"] = True
+            superclass = Token(TokenType.SUPER, "super", None, stmt.name.line)
+            stmt.superIndex = self.__declare(superclass).index
+            self.__define(superclass)
         self.__beginScope()
-        self.__scopes[-1]["this"] = True
         for method in stmt.methods:
             declaration = FunctionType.METHOD
             if method.name.lexeme == "init":
@@ -166,13 +384,14 @@ class Resolver(ExprVisitor, StmtVisitor):
         self.__endScope()
         if stmt.superclass is not None:
             self.__endScope()
+        stmt.frameSize = self.__frame.size
         self.__currentClass = enclosingClass
 
     def visit_expression_stmt(self, stmt: stmt.Expression):
         self.__resolveExpression(stmt.expression)
 
     def visit_function_stmt(self, stmt: stmt.Function):
-        self.__declare(stmt.name)
+        self.__declare(stmt.name, stmt)
         self.__define(stmt.name)
         self.__resolveFunction(stmt, FunctionType.FUNCTION)
 
@@ -184,6 +403,7 @@ class Resolver(ExprVisitor, StmtVisitor):
 
     def visit_print_stmt(self, stmt: stmt.Print):
         self.__resolveExpression(stmt.expression)
+        self.__impure()
 
     def visit_return_stmt(self, stmt: stmt.Return):
         if self.__currentFunction == FunctionType.NONE:
@@ -194,9 +414,12 @@ class Resolver(ExprVisitor, StmtVisitor):
                     stmt.keyword, "Cannot return a value from an initializer."
                 )
             self.__resolveExpression(stmt.value)
+            if isinstance(stmt.value, expr.Call):
+                # Nothing is left to do in this call once the callee returns.
+                stmt.value.tail = True
 
     def visit_var_stmt(self, stmt: stmt.Var):
-        self.__declare(stmt.name)
+        self.__declare(stmt.name, stmt)
         if stmt.initializer is not None:
             self.__resolveExpression(stmt.initializer)
         self.__define(stmt.name)
@@ -0,0 +1,21 @@
+from typing import Optional
+from resolver.local import Local
+
+
+class Scope(dict[str, Local]):
+    """The locals declared in one lexical scope, keyed by name.
+
+    Function, receiver and superclass scopes always get an `Environment` at
+    runtime. A block only gets one if it declares something; otherwise the
+    Environment based engines run it in the enclosing environment, so it does
+    not count towards the depth of the variables resolved through it.
+    """
+
+    def __init__(self, parent: Optional["Scope"], isBlock: bool):
+        super().__init__()
+        self.parent = parent
+        self.isBlock = isBlock
+
+    @property
+    def allocates(self) -> bool:
+        return not self.isBlock or len(self) > 0
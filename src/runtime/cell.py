@@ -0,0 +1,10 @@
+from typing import Any
+
+
+class Cell:
+    """A box holding a captured local, shared by its frame and its closures."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
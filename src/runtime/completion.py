@@ -0,0 +1,21 @@
+class Completion:
+    """How a statement run by the `Interpreter` ended when it did not simply
+    fall through to the next one."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+# A `return` statement ran. Blocks, branches and loops stop and hand it up to
+# the function call, which finds the value in `Interpreter.returnValue`.
+RETURN = Completion("RETURN")
+
+# A `return` statement whose value is a call to a Lox function. It is handed up
+# like `RETURN`, with `Interpreter.returnValue` holding the function, receiver
+# and arguments, and the function call that ends runs the callee in its place.
+TAIL_CALL = Completion("TAIL_CALL")
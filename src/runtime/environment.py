@@ -1,41 +1,25 @@
-from scanner.token import Token
-from runtime.ploxRuntimeError import PloxRuntimeError
 from typing import Optional, Any
 
 
 class Environment:
-    def __init__(self, enclosing: "Optional[Environment]" = None):
+    """The locals of one scope, stored in the slots assigned by the `Resolver`."""
+
+    def __init__(self, enclosing: "Optional[Environment]" = None, size: int = 0):
         self.enclosing = enclosing
-        self.values: dict[str, Any] = {}
+        self.values: list[Any] = [None] * size
 
-    def define(self, name: str, value: Any):
-        self.values[name] = value
+    def define(self, slot: int, value: Any):
+        self.values[slot] = value
 
-    def __ancestor(self, distance: int) -> "Environment":
+    def ancestor(self, distance: int) -> "Environment":
         environment = self
         for _ in range(distance):
             if enclosing := environment.enclosing:
                 environment = enclosing
         return environment
 
-    def getAt(self, distance: int, name: str) -> Any:
-        return self.__ancestor(distance).values[name]
-
-    def get(self, name: Token) -> Any:
-        if name.lexeme in self.values:
-            return self.values[name.lexeme]
-        if self.enclosing:
-            return self.enclosing.get(name)
-        raise PloxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
-
-    def assign(self, name: Token, value: Any):
-        if name.lexeme in self.values:
-            self.values[name.lexeme] = value
-            return
-        if self.enclosing:
-            self.enclosing.assign(name, value)
-            return
-        raise PloxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
+    def getAt(self, distance: int, slot: int) -> Any:
+        return self.ancestor(distance).values[slot]
 
-    def assignAt(self, distance: int, name: Token, value: Any):
-        self.__ancestor(distance).values[name.lexeme] = value
+    def assignAt(self, distance: int, slot: int, value: Any):
+        self.ancestor(distance).values[slot] = value
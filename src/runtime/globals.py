@@ -0,0 +1,65 @@
+from scanner.token import Token
+from runtime.ploxCallable import PloxCallable
+from runtime.ploxRuntimeError import PloxRuntimeError
+from typing import Any, Optional
+
+# The value of a global that has been given a slot but not defined yet.
+UNDEFINED = object()
+
+
+class Globals:
+    """Top level variables, which the `Resolver` leaves unresolved.
+
+    Every name has a slot in `values`, given to it the first time it is
+    resolved or defined, so that reading a global indexes a list. A name the
+    program refers to before defining it, as a REPL line can, keeps its slot
+    once it is defined.
+
+    `version` changes whenever a global holding a function or class changes, so
+    a call site that has checked the global function it calls can skip the
+    checks for as long as `version` stays the same.
+
+    `functions` and `reads` keep what the `Resolver` found out about the purity
+    of the globals, so that the declarations it resolves in later runs, as REPL
+    lines and streamed declarations are, can depend on the earlier ones.
+    """
+
+    def __init__(self):
+        self.slots: dict[str, int] = {}
+        self.values: list[Any] = []
+        self.version = 0
+        self.functions: dict[str, Optional[list]] = {}
+        self.reads: list[tuple[Any, str]] = []
+
+    def slot(self, name: str) -> int:
+        index = self.slots.get(name)
+        if index is None:
+            index = len(self.values)
+            self.slots[name] = index
+            self.values.append(UNDEFINED)
+        return index
+
+    def define(self, name: str, value: Any):
+        self.__store(self.slot(name), value)
+
+    def get(self, name: Token, index: Optional[int] = None) -> Any:
+        if index is None:
+            index = self.slot(name.lexeme)
+        value = self.values[index]
+        if value is UNDEFINED:
+            raise PloxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
+        return value
+
+    def assign(self, name: Token, value: Any, index: Optional[int] = None):
+        if index is None:
+            index = self.slot(name.lexeme)
+        if self.values[index] is UNDEFINED:
+            raise PloxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
+        self.__store(index, value)
+
+    def __store(self, index: int, value: Any):
+        if isinstance(value, PloxCallable) or isinstance(
+            self.values[index], PloxCallable
+        ):
+            self.version += 1
+        self.values[index] = value
@@ -0,0 +1,36 @@
+from typing import Any, Optional
+
+# A site that has seen this many keys stops caching and looks properties up
+# directly.
+POLYMORPHIC_LIMIT = 4
+
+
+class InlineCache:
+    """Remembers what one property access or `super` expression found, by the
+    shape of the instance or by the superclass: a single key in the common
+    monomorphic case, then a few more before the site is considered
+    megamorphic."""
+
+    __slots__ = ("key", "value", "entries")
+
+    def __init__(self):
+        self.key: Any = None
+        self.value: Any = None
+        self.entries: list[tuple[Any, Any]] = []
+
+    def lookup(self, key, name: str) -> Optional[Any]:
+        """What `key.lookup(name)` returns."""
+        if key is self.key:
+            return self.value
+        for cached, value in self.entries:
+            if cached is key:
+                return value
+        value = key.lookup(name)
+        if value is None:
+            return None
+        if self.key is None:
+            self.key = key
+            self.value = value
+        elif len(self.entries) < POLYMORPHIC_LIMIT - 1:
+            self.entries.append((key, value))
+        return value
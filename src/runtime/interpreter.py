@@ -1,41 +1,69 @@
 from parser.stmt import Stmt
-from typing import Any
-from parser.expr import ExprVisitor
-from parser.stmt import StmtVisitor
+from typing import TYPE_CHECKING, Any, Optional
+from parser.expr import Binary, Call, ExprVisitor, Get, Super, Variable
+from parser.stmt import Block, Expression, StmtVisitor
 import parser.expr as expr
 import parser.stmt as stmt
 from runtime.ploxRuntimeError import PloxRuntimeError
-from runtime.ploxReturnException import PloxReturnException
+from runtime.nativeError import NativeError
+from runtime.number import MAX_INTEGER, integer
+from runtime.completion import RETURN, TAIL_CALL, Completion
 from scanner.token import TokenType
 from scanner.token import Token
-from runtime.environment import Environment
+from runtime.cell import Cell
+from resolver.accessType import AccessType
+from runtime.globals import Globals
 from runtime.ploxFunction import PloxFunction
-from runtime.native.natives import functions as NATIVE_FUNCTIONS
+from runtime.native.natives import callbackFunctions as NATIVE_FUNCTIONS
 from runtime.ploxInstance import PloxInstance
 from runtime.ploxCallable import PloxCallable
 from runtime.ploxClass import PloxClass
+from optimizer.countedLoop import CountedLoop
+from runtime.quickened import DirectCall, FloatBinary, IntArithmetic, IntComparison
+from runtime.quickened import deoptimize, quickenBinary, quickenCall
+from runtime.quickened import quickenVariable
+
+if TYPE_CHECKING:
+    from jit.jit import Jit
+
+# The types of Lox numbers, compared with `type` so that booleans are left out.
+NUMBERS = (int, float)
 
 
 class Interpreter(ExprVisitor, StmtVisitor):
-    def __init__(self, __runtime):
+    def __init__(self, __runtime, quicken: bool = False, jit: Optional["Jit"] = None):
         self.__runtime = __runtime
+        # Whether nodes specialize themselves as they run, see `runtime.quickened`.
+        self.__quicken = quicken
+        self.__jit = jit
         self.__result = None
-        self.__globals = Environment()
-        self.__environment: Environment = self.__globals
-        self.__locals = {}
+        self.__globals = Globals()
+        # The flat frame of the running function and the cells it captured.
+        # Top level blocks use a frame that grows as they need it.
+        self.__frame: list[Any] = []
+        self.__cells: list[Cell] = []
+        # The function whose body is running, which loops count iterations for.
+        self.__function: Optional[stmt.Function] = None
+        # The value of the `return` statement that is ending the current call,
+        # or the call it ends with, see `TAIL_CALL`.
+        self.returnValue: Any = None
         self.__defineNativeFunctions()
 
     @property
     def result(self) -> Any:
         return self.__result
 
-    def resolve(self, expr: expr.Expr, depth: int):
-        self.__locals[expr] = depth
+    @property
+    def globals(self) -> Globals:
+        return self.__globals
 
     def run(self, program: list[Stmt]):
         try:
             for stmt in program:
-                self.__result = self.__execute(stmt)
+                if isinstance(stmt, Expression):
+                    self.__result = self.evaluate(stmt.expression)
+                else:
+                    self.__result = self.__execute(stmt)
         except PloxRuntimeError as error:
             self.__runtime.reportError(error)
 
@@ -44,71 +72,122 @@ class Interpreter(ExprVisitor, StmtVisitor):
 
     def visit_assign_expr(self, expression: expr.Assign):
         value = self.evaluate(expression.value)
-        distance = self.__locals.get(expression)
-        if distance is not None:
-            self.__environment.assignAt(distance, expression.name, value)
+        access = expression.access
+        if access is AccessType.LOCAL:
+            self.__frame[expression.index] = value
+        elif access is AccessType.CELL:
+            self.__frame[expression.index].value = value
+        elif access is AccessType.UPVALUE:
+            self.__cells[expression.index].value = value
         else:
-            self.__globals.assign(expression.name, value)
+            self.__globals.assign(expression.name, value, expression.index)
         return value
 
     def visit_binary_expr(self, expr: expr.Binary) -> Any:
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
-        tokenType = expr.operator.tokenType
-        if tokenType in (
-            TokenType.GREATER,
-            TokenType.GREATER_EQUAL,
-            TokenType.LESS,
-            TokenType.LESS_EQUAL,
-            TokenType.MINUS,
-            TokenType.SLASH,
-            TokenType.STAR,
-        ):
-            self.checkNumberOperands(expr.operator, left, right)
-        choices = {
-            TokenType.GREATER: lambda: float(left) > float(right),
-            TokenType.GREATER_EQUAL: lambda: float(left) >= float(right),
-            TokenType.LESS: lambda: float(left) < float(right),
-            TokenType.LESS_EQUAL: lambda: float(left) <= float(right),
-            TokenType.BANG_EQUAL: lambda: not isEqual(left, right),
-            TokenType.EQUAL_EQUAL: lambda: isEqual(left, right),
-            TokenType.MINUS: lambda: float(left) - float(right),
-            TokenType.SLASH: lambda: maybeZeroDivision(expr, left, right),
-            TokenType.STAR: lambda: float(left) * float(right),
-            TokenType.PLUS: lambda: self.overloadedPlus(expr, left, right),
-        }
-        try:
-            choice = choices[tokenType]
-            result = choice()
-            return result
-        except KeyError:
-            raise PloxRuntimeError(
-                expr.operator, f"Unknown operator {expr.operator.lexeme}"
-            )
+        value = binary(expr.operator, left, right)
+        if self.__quicken and type(expr) is Binary:
+            quickenBinary(expr, left, right)
+        return value
+
+    def visit_float_binary_expr(self, expr: FloatBinary) -> Any:
+        left = self.evaluate(expr.left)
+        right = self.evaluate(expr.right)
+        if type(left) is float and type(right) is float:
+            return expr.quickOp(left, right)
+        deoptimize(expr)
+        return binary(expr.operator, left, right)
 
-    def overloadedPlus(self, expr: expr.Binary, left: Any, right: Any) -> Any:
-        if (type(left) == type(right)) and type(left) in [str, float]:
-            return left + right
-        if type(left) == str or type(right) == str:
-            return str(left) + str(right)
-        raise PloxRuntimeError(
-            expr.operator,
-            "Operands must be either a string and any type or two numbers.",
-        )
+    def visit_int_arithmetic_expr(self, expr: IntArithmetic) -> Any:
+        left = self.evaluate(expr.left)
+        right = self.evaluate(expr.right)
+        if type(left) is int and type(right) is int:
+            value = expr.quickOp(left, right)
+            if -MAX_INTEGER <= value <= MAX_INTEGER:
+                return value
+            return float(value)
+        deoptimize(expr)
+        return binary(expr.operator, left, right)
+
+    def visit_int_comparison_expr(self, expr: IntComparison) -> Any:
+        left = self.evaluate(expr.left)
+        right = self.evaluate(expr.right)
+        if type(left) is int and type(right) is int:
+            return expr.quickOp(left, right)
+        deoptimize(expr)
+        return binary(expr.operator, left, right)
 
     def visit_call_expr(self, expr: expr.Call):
+        function, this, arguments = self.__evaluateCall(expr)
+        if self.__quicken and type(expr) is Call:
+            quickenCall(expr, function, this)
+        try:
+            if this is None:
+                return function.call(self, arguments)
+            return function.invoke(self, this, arguments)
+        except RecursionError:
+            # Every Lox call takes several Python frames here, see the vm engine
+            # for deep recursion.
+            raise PloxRuntimeError(expr.paren, "Stack overflow.")
+        except NativeError as error:
+            raise PloxRuntimeError(expr.paren, error.message)
+
+    def visit_direct_call_expr(self, expr: DirectCall):
         function = self.evaluate(expr.callee)
+        if function is not expr.target:
+            deoptimize(expr)
+            # Reading the variable again has no effects.
+            return self.visit_call_expr(expr)
+        arguments = []
+        for argument in expr.arguments:
+            arguments.append(self.evaluate(argument))
+        try:
+            return function.call(self, arguments)
+        except RecursionError:
+            raise PloxRuntimeError(expr.paren, "Stack overflow.")
+
+    def __evaluateCall(
+        self, expr: expr.Call
+    ) -> tuple[PloxCallable, Optional[PloxInstance], list[Any]]:
+        """Evaluate the callee and the arguments of a call and check them.
+
+        A method called as `obj.name(...)` or `super.name(...)` is returned
+        with its receiver, so that calling it does not need a bound method.
+        """
+        callee = expr.callee
+        this = None
+        if isinstance(callee, Get):
+            obj = self.evaluate(callee.obj)
+            if not isinstance(obj, PloxInstance):
+                raise PloxRuntimeError(callee.name, "Only instances have properties.")
+            function = obj.getMethod(callee.name, callee.cache)
+            if function is None:
+                # A field, which can hold any value, or an undefined property.
+                function = obj.getAttr(callee.name, callee.cache)
+            else:
+                this = obj
+        elif isinstance(callee, Super):
+            this, function = self.__findSuperMethod(callee)
+        elif expr.cachedVersion == self.__globals.version:
+            # The global function called here is the one checked last time.
+            arguments = []
+            for argument in expr.arguments:
+                arguments.append(self.evaluate(argument))
+            return expr.cachedCallee, None, arguments
+        else:
+            function = self.evaluate(callee)
         arguments = []
         for argument in expr.arguments:
             arguments.append(self.evaluate(argument))
         if not isinstance(function, PloxCallable):
             raise PloxRuntimeError(expr.paren, "Can only call functions and classes.")
         if len(arguments) != function.arity():
-            raise PloxRuntimeError(
-                expr.paren,
-                f"Expected {function.arity()} arguments but got {len(arguments)}.",
-            )
-        return function.call(self, arguments)
+            raise arityError(expr.paren, function, arguments)
+        if isinstance(callee, Variable) and callee.access is AccessType.GLOBAL:
+            expr.cachedCallee = function
+            expr.cachedVersion = self.__globals.version
+        return function, this, arguments
 
     def visit_comma_expr(self, expr: expr.Comma):
         values = []
@@ -119,7 +198,7 @@ class Interpreter(ExprVisitor, StmtVisitor):
     def visit_get_expr(self, expr: expr.Get):
         obj = self.evaluate(expr.obj)
         if isinstance(obj, PloxInstance):
-            return obj.getAttr(expr.name)
+            return obj.getAttr(expr.name, expr.cache)
         raise PloxRuntimeError(expr.name, "Only instances have properties.")
 
     def visit_grouping_expr(self, expr: expr.Grouping) -> Any:
@@ -147,47 +226,78 @@ class Interpreter(ExprVisitor, StmtVisitor):
         return value
 
     def visit_super_expr(self, expr: expr.Super):
-        distance = self.__locals[expr]
-        superclass = self.__environment.getAt(distance, "super")
-        obj = self.__environment.getAt(distance - 1, "this")
-        method = superclass.findMethod(expr.method.lexeme)
+        obj, method = self.__findSuperMethod(expr)
+        return method.bind(obj)
+
+    def __findSuperMethod(self, expr: expr.Super) -> tuple[PloxInstance, PloxFunction]:
+        superclass = self.__cells[expr.index].value
+        assert expr.receiver is not None
+        obj = self.__lookUpVariable(expr.receiver.keyword, expr.receiver)
+        method = expr.cache.lookup(superclass, expr.method.lexeme)
         if method is None:
             raise PloxRuntimeError(
                 expr.method, f"Undefined property {expr.method.lexeme}."
             )
-        return method.bind(obj)
+        return obj, method
 
     def visit_this_expr(self, expr: expr.This):
         return self.__lookUpVariable(expr.keyword, expr)
 
-    def __lookUpVariable(self, name: Token, expr: expr.Expr):
-        distance = self.__locals.get(expr)
-        if distance is not None:
-            return self.__environment.getAt(distance, name.lexeme)
+    def __lookUpVariable(self, name: Token, expr: expr.Variable | expr.This):
+        access = expr.access
+        if access is AccessType.LOCAL:
+            return self.__frame[expr.index]
+        if access is AccessType.CELL:
+            return self.__frame[expr.index].value
+        if access is AccessType.UPVALUE:
+            return self.__cells[expr.index].value
+        return self.__globals.get(name, expr.index)
+
+    def __define(self, declaration: stmt.Var | stmt.Function | stmt.Class, value: Any):
+        if declaration.index is None:
+            self.__globals.define(declaration.name.lexeme, value)
+        elif declaration.captured:
+            self.__frame[declaration.index] = Cell(value)
+        else:
+            self.__frame[declaration.index] = value
+
+    def __initialize(self, declaration: stmt.Function | stmt.Class, value: Any):
+        """Set a variable defined earlier, which closures may already share."""
+        if declaration.index is None:
+            self.__globals.define(declaration.name.lexeme, value)
+        elif declaration.captured:
+            self.__frame[declaration.index].value = value
         else:
-            return self.__globals.get(name)
+            self.__frame[declaration.index] = value
+
+    def __capture(self, upvalues: list[tuple[bool, int]]) -> list[Cell]:
+        return [
+            self.__frame[index] if isLocal else self.__cells[index]
+            for isLocal, index in upvalues
+        ]
 
     def visit_unary_expr(self, expr: expr.Unary) -> Any:
         right = self.evaluate(expr.right)
         match expr.operator.tokenType:
             case TokenType.MINUS:
-                self.checkNumberOperand(expr.operator, right)
-                return -float(right)
+                return negate(expr.operator, right)
             case TokenType.BANG:
                 return not self.isTruthy(right)
 
-    def checkNumberOperand(self, operator: Token, operand: Any):
-        if isinstance(operand, (float, int)):
-            return
-        raise PloxRuntimeError(operator, "Operand must be a number.")
-
-    def checkNumberOperands(self, operator: Token, left: Any, right: Any):
-        if not (isinstance(left, (float, int)) and isinstance(right, (float, int))):
-            raise PloxRuntimeError(operator, "Operands must be numbers.")
-
     def visit_variable_expr(self, expr: expr.Variable) -> Any:
+        if self.__quicken and type(expr) is Variable:
+            quickenVariable(expr)
         return self.__lookUpVariable(expr.name, expr)
 
+    def visit_local_variable_expr(self, expr: expr.Variable) -> Any:
+        return self.__frame[expr.index]
+
+    def visit_cell_variable_expr(self, expr: expr.Variable) -> Any:
+        return self.__frame[expr.index].value
+
+    def visit_upvalue_variable_expr(self, expr: expr.Variable) -> Any:
+        return self.__cells[expr.index].value
+
     def evaluate(self, expr: expr.Expr) -> Any:
         return expr.accept(self)
 
@@ -198,17 +308,46 @@ class Interpreter(ExprVisitor, StmtVisitor):
             return obj
         return True
 
-    def visit_block_stmt(self, stmt: stmt.Block) -> Any:
-        self.executeBlock(stmt.statements, Environment(self.__environment))
-
-    def executeBlock(self, statements: list[Stmt], environment: Environment):
-        previous = self.__environment
+    def visit_block_stmt(self, stmt: stmt.Block) -> Optional[Completion]:
+        self.__reserve(stmt.frameSize)
+        for statement in stmt.statements:
+            if (completion := self.__execute(statement)) is not None:
+                return completion
+        return None
+
+    def __reserve(self, size: int):
+        # Function frames are allocated at their full size, so this only ever
+        # grows the top level frame.
+        if len(self.__frame) < size:
+            self.__frame.extend([None] * (size - len(self.__frame)))
+
+    def executeFunction(
+        self, function: stmt.Function, frame: list[Any], cells: list[Cell]
+    ) -> Optional[Completion]:
+        """Run a function body, returning how it ended if that was through a
+        `return` statement.
+
+        The body runs compiled once the jit has found the function hot.
+        """
+        if function.compiled is not None:
+            return function.compiled(self, frame, cells)
+        if self.__jit is not None and self.__jit.countCall(function, self.__globals):
+            return function.compiled(self, frame, cells)
+        previous = self.__frame, self.__cells, self.__function
         try:
-            self.__environment = environment
-            for statement in statements:
-                self.__execute(statement)
+            self.__frame = frame
+            self.__cells = cells
+            self.__function = function
+            for statement in function.body:
+                if (completion := self.__execute(statement)) is not None:
+                    return completion
+            return None
         finally:
-            self.__environment = previous
+            self.__frame, self.__cells, self.__function = previous
+
+    def __countBackEdges(self, iterations: int):
+        if self.__jit is not None and self.__function is not None:
+            self.__jit.countBackEdges(self.__function, iterations)
 
     def visit_class_stmt(self, stmt: stmt.Class):
         superclass = None
@@ -218,66 +357,209 @@ class Interpreter(ExprVisitor, StmtVisitor):
                 raise PloxRuntimeError(
                     stmt.superclass.name, "Superclass must be a class."
                 )
-        self.__environment.define(stmt.name.lexeme, None)
-        if stmt.superclass is not None:
-            self.__environment = Environment(self.__environment)
-            self.__environment.define("super", superclass)
+        self.__define(stmt, None)
+        if superclass is not None:
+            self.__reserve(stmt.frameSize)
+            self.__frame[stmt.superIndex] = Cell(superclass)
         methods = {}
         for method in stmt.methods:
             function = PloxFunction(
-                method, self.__environment, method.name.lexeme == "init"
+                method, self.__capture(method.upvalues), method.name.lexeme == "init"
             )
             methods[method.name.lexeme] = function
         klass = PloxClass(stmt.name.lexeme, superclass, methods)
-        if superclass is not None:
-            if enclosing := self.__environment.enclosing:
-                self.__environment = enclosing
-        self.__environment.assign(stmt.name, klass)
+        self.__initialize(stmt, klass)
 
-    def visit_expression_stmt(self, stmt: stmt.Expression) -> Any:
-        return self.evaluate(stmt.expression)
+    def visit_expression_stmt(self, stmt: stmt.Expression):
+        self.evaluate(stmt.expression)
 
     def visit_function_stmt(self, stmt: stmt.Function):
-        function = PloxFunction(stmt, self.__environment, False)
-        self.__environment.define(stmt.name.lexeme, function)
+        self.__define(stmt, None)
+        function = PloxFunction(stmt, self.__capture(stmt.upvalues), False)
+        self.__initialize(stmt, function)
 
-    def visit_if_stmt(self, stmt: stmt.If):
+    def visit_if_stmt(self, stmt: stmt.If) -> Optional[Completion]:
         if self.isTruthy(self.evaluate(stmt.condition)):
-            self.__execute(stmt.thenBranch)
-        elif stmt.elseBranch is not None:
-            self.__execute(stmt.elseBranch)
+            return self.__execute(stmt.thenBranch)
+        if stmt.elseBranch is not None:
+            return self.__execute(stmt.elseBranch)
+        return None
 
     def visit_print_stmt(self, stmt: stmt.Print):
         value = self.evaluate(stmt.expression)
         print(stringify(value))
 
-    def visit_return_stmt(self, stmt: stmt.Return):
-        value = None
-        if stmt.value is not None:
-            value = self.evaluate(stmt.value)
-        raise PloxReturnException(value)
+    def visit_return_stmt(self, stmt: stmt.Return) -> Completion:
+        value = stmt.value
+        if isinstance(value, Call) and value.tail:
+            function, this, arguments = self.__evaluateCall(value)
+            if isinstance(function, PloxFunction):
+                self.returnValue = function, this, arguments
+                return TAIL_CALL
+            try:
+                self.returnValue = function.call(self, arguments)
+            except RecursionError:
+                raise PloxRuntimeError(value.paren, "Stack overflow.")
+            except NativeError as error:
+                raise PloxRuntimeError(value.paren, error.message)
+            return RETURN
+        self.returnValue = None if value is None else self.evaluate(value)
+        return RETURN
 
     def visit_var_stmt(self, stmt: stmt.Var):
         value = None
         if stmt.initializer is not None:
             value = self.evaluate(stmt.initializer)
-        self.__environment.define(stmt.name.lexeme, value)
-
-    def visit_while_stmt(self, stmt: stmt.While):
-        while self.isTruthy(self.evaluate(stmt.condition)):
-            self.__execute(stmt.body)
+        self.__define(stmt, value)
+
+    def visit_while_stmt(self, stmt: stmt.While) -> Optional[Completion]:
+        condition = stmt.condition
+        body = stmt.body
+        counted = stmt.counted
+        if counted is not None:
+            start = self.__frame[counted.counter.index]
+            limit = self.evaluate(counted.limit)
+            if (
+                type(start) is int
+                and type(limit) is int
+                and abs(limit) + abs(counted.step) <= MAX_INTEGER
+            ):
+                assert isinstance(body, Block)
+                return self.__runCountedLoop(body, counted, start, limit)
+        iterations = 0
+        completion = None
+        if isinstance(condition, expr.Literal) and self.isTruthy(condition.value):
+            # A loop without a condition only ends through `return`.
+            while completion is None:
+                iterations += 1
+                completion = self.__execute(body)
+        else:
+            while self.isTruthy(self.evaluate(condition)):
+                iterations += 1
+                if (completion := self.__execute(body)) is not None:
+                    break
+        self.__countBackEdges(iterations)
+        return completion
+
+    def __runCountedLoop(
+        self, body: Block, counted: CountedLoop, start: int, limit: int
+    ) -> Optional[Completion]:
+        """Run a loop the optimizer found to count from `start` to `limit`
+        over a range, without evaluating its condition and increment."""
+        self.__reserve(body.frameSize)
+        frame = self.__frame
+        index = counted.counter.index
+        step = counted.step
+        statements = body.statements
+        before = statements[: counted.increment]
+        after = statements[counted.increment + 1 :]
+        values = range(start, counted.stop(limit), step)
+        # Counted up front, including the iterations a `return` cuts short.
+        self.__countBackEdges(len(values))
+        for value in values:
+            frame[index] = value
+            for statement in before:
+                if (completion := self.__execute(statement)) is not None:
+                    return completion
+            frame[index] = value + step
+            for statement in after:
+                if (completion := self.__execute(statement)) is not None:
+                    return completion
+        return None
 
     def __defineNativeFunctions(self):
         for name, function in NATIVE_FUNCTIONS.items():
-            self.__environment.define(name, function)
-
-
-def maybeZeroDivision(expr: expr.Binary, left: Any, right: Any) -> float:
+            self.__globals.define(name, function)
+
+
+def binary(operator: Token, left: Any, right: Any) -> Any:
+    match operator.tokenType:
+        case TokenType.PLUS:
+            return overloadedPlus(operator, left, right)
+        case TokenType.MINUS:
+            return subtract(operator, left, right)
+        case TokenType.STAR:
+            return multiply(operator, left, right)
+        case TokenType.SLASH:
+            return divide(operator, left, right)
+        case TokenType.EQUAL_EQUAL:
+            return isEqual(left, right)
+        case TokenType.BANG_EQUAL:
+            return not isEqual(left, right)
+    checkNumberOperands(operator, left, right)
+    # Ints are exact as floats, so numbers compare the same either way.
+    match operator.tokenType:
+        case TokenType.GREATER:
+            return left > right
+        case TokenType.GREATER_EQUAL:
+            return left >= right
+        case TokenType.LESS:
+            return left < right
+        case TokenType.LESS_EQUAL:
+            return left <= right
+    raise PloxRuntimeError(operator, f"Unknown operator {operator.lexeme}")
+
+
+def checkNumberOperands(operator: Token, left: Any, right: Any):
+    if not (isinstance(left, (float, int)) and isinstance(right, (float, int))):
+        raise PloxRuntimeError(operator, "Operands must be numbers.")
+
+
+def overloadedPlus(operator: Token, left: Any, right: Any) -> Any:
+    if type(left) is int and type(right) is int:
+        return integer(left + right)
+    if type(left) in NUMBERS and type(right) in NUMBERS:
+        return float(left) + float(right)
+    if type(left) is str and type(right) is str:
+        return left + right
+    if type(left) is str or type(right) is str:
+        return concatenated(left) + concatenated(right)
+    raise PloxRuntimeError(
+        operator,
+        "Operands must be either a string and any type or two numbers.",
+    )
+
+
+def concatenated(value: Any) -> str:
+    # Numbers are concatenated as the floats they stand for.
+    if type(value) is int:
+        return str(float(value))
+    return str(value)
+
+
+def subtract(operator: Token, left: Any, right: Any) -> int | float:
+    if type(left) is int and type(right) is int:
+        return integer(left - right)
+    checkNumberOperands(operator, left, right)
+    return float(left) - float(right)
+
+
+def multiply(operator: Token, left: Any, right: Any) -> int | float:
+    if type(left) is int and type(right) is int:
+        product = left * right
+        if product == 0 and (left < 0 or right < 0):
+            # Multiplying floats gives negative zero here.
+            return -0.0
+        return integer(product)
+    checkNumberOperands(operator, left, right)
+    return float(left) * float(right)
+
+
+def divide(operator: Token, left: Any, right: Any) -> float:
+    checkNumberOperands(operator, left, right)
     if right == 0:
-        raise PloxRuntimeError(expr.operator, "Cannot divide by zero.")
+        raise PloxRuntimeError(operator, "Cannot divide by zero.")
     return float(left) / float(right)
 
 
+def negate(operator: Token, operand: Any) -> int | float:
+    if type(operand) is int and operand != 0:
+        return -operand
+    if not isinstance(operand, (float, int)):
+        raise PloxRuntimeError(operator, "Operand must be a number.")
+    return -float(operand)
+
+
 def isEqual(a: Any, b: Any) -> bool:
     if a is None and b is None:
         return True
@@ -286,6 +568,14 @@ def isEqual(a: Any, b: Any) -> bool:
     return a == b
 
 
+def arityError(
+    paren: Token, function: PloxCallable, arguments: list
+) -> PloxRuntimeError:
+    return PloxRuntimeError(
+        paren, f"Expected {function.arity()} arguments but got {len(arguments)}."
+    )
+
+
 def stringify(obj: Any) -> str:
     if obj is None:
         return "nil"
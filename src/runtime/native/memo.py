@@ -0,0 +1,89 @@
+import math
+from collections import OrderedDict
+from typing import Any
+from runtime.nativeError import NativeError
+from runtime.ploxCallable import PloxCallable
+
+# The number of results a memoized function keeps before evicting the least
+# recently used one.
+CAPACITY = 1024
+
+
+class Memoized(PloxCallable):
+    """A pure function that remembers its results by the values of its
+    arguments."""
+
+    def __init__(self, function: PloxCallable, capacity: int = CAPACITY):
+        self.__function = function
+        self.__capacity = capacity
+        self.__results: OrderedDict[tuple, Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self) -> str:
+        return str(self.__function)
+
+    def __len__(self) -> int:
+        return len(self.__results)
+
+    def arity(self) -> int:
+        return self.__function.arity()
+
+    def call(self, interpreter, arguments: list[Any]) -> Any:
+        key = tuple(self.__key(argument) for argument in arguments)
+        results = self.__results
+        if key in results:
+            self.hits += 1
+            results.move_to_end(key)
+            return results[key]
+        self.misses += 1
+        result = self.__function.call(interpreter, arguments)
+        results[key] = result
+        if len(results) > self.__capacity:
+            results.popitem(last=False)
+        return result
+
+    def __key(self, argument: Any) -> tuple:
+        # Python considers `true` and `1` the same key, Lox does not.
+        key = (type(argument), argument)
+        if isinstance(argument, float):
+            # 0.0 and -0.0 are equal but print differently.
+            key += (math.copysign(1.0, argument),)
+        return key
+
+
+class Memo(PloxCallable):
+    def call(self, interpreter, arguments) -> Memoized:
+        function = arguments[0]
+        pure = getattr(function, "pure", None)
+        if not isinstance(function, PloxCallable) or pure is None:
+            raise NativeError("Can only memoize functions.")
+        if not pure:
+            raise NativeError("Can only memoize pure functions.")
+        return Memoized(function)
+
+    def arity(self) -> int:
+        return 1
+
+    def __str__(self) -> str:
+        return "<native fn>"
+
+
+class MemoStats(PloxCallable):
+    def call(self, interpreter, arguments) -> str:
+        function = arguments[0]
+        if not isinstance(function, Memoized):
+            raise NativeError("Can only report on memoized functions.")
+        return (
+            f"{function.hits} hits, {function.misses} misses, "
+            f"{len(function)} cached"
+        )
+
+    def arity(self) -> int:
+        return 1
+
+    def __str__(self) -> str:
+        return "<native fn>"
+
+
+functions = {"memo": Memo(), "memoStats": MemoStats()}
@@ -1,3 +1,8 @@
 from runtime.native.clock import functions as clock_functions
+from runtime.native.memo import functions as memo_functions
 
 functions = {**clock_functions}
+
+# Natives that call Lox functions back, which only the engines whose functions
+# are `PloxCallable`s provide.
+callbackFunctions = {**functions, **memo_functions}
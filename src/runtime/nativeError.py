@@ -0,0 +1,6 @@
+class NativeError(Exception):
+    """Raised by a native function, and reported by the engine as a runtime
+    error at the call."""
+
+    def __init__(self, message: str):
+        self.message: str = message
@@ -0,0 +1,17 @@
+# Integral numbers are Python ints while a float would hold them exactly, where
+# int and float arithmetic give the same results. Anything larger is a float.
+MAX_INTEGER = 2**53
+
+
+def integer(value: int) -> int | float:
+    if -MAX_INTEGER <= value <= MAX_INTEGER:
+        return value
+    return float(value)
+
+
+def asFloat(value):
+    """The float an int stands for. The compiled engines turn literals into
+    floats, as their inline fast paths are for floats only."""
+    if type(value) is int:
+        return float(value)
+    return value
@@ -1,6 +1,7 @@
 from runtime.ploxCallable import PloxCallable
 from runtime.ploxFunction import PloxFunction
 from runtime.ploxInstance import PloxInstance
+from runtime.shape import Shape
 from typing import Optional, Any
 
 
@@ -14,6 +15,13 @@ class PloxClass(PloxCallable):
         self.name = name
         self.methods = methods
         self.superclass = superclass
+        # Inherited methods are copied in once, so that looking a method up never
+        # walks the superclass chain.
+        self.__methodTable = {}
+        if superclass is not None:
+            self.__methodTable.update(superclass.__methodTable)
+        self.__methodTable.update(methods)
+        self.shape = Shape(self)
 
     def __str__(self) -> str:
         return self.name
@@ -22,7 +30,7 @@ class PloxClass(PloxCallable):
         instance = PloxInstance(self)
         initializer = self.findMethod("init")
         if initializer is not None:
-            initializer.bind(instance).call(interpreter, arguments)
+            initializer.invoke(interpreter, instance, arguments)
         return instance
 
     def arity(self) -> int:
@@ -32,7 +40,7 @@ class PloxClass(PloxCallable):
         return initializer.arity()
 
     def findMethod(self, name: str) -> Optional[PloxFunction]:
-        if name in self.methods:
-            return self.methods[name]
-        if self.superclass is not None:
-            return self.superclass.findMethod(name)
+        return self.__methodTable.get(name)
+
+    # Lets an `InlineCache` remember the methods of a superclass.
+    lookup = findMethod
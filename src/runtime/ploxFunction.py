@@ -1,18 +1,23 @@
 from runtime.ploxCallable import PloxCallable
 from runtime.ploxInstance import PloxInstance
-from runtime.ploxReturnException import PloxReturnException
-from runtime.environment import Environment
+from runtime.completion import RETURN
+from runtime.cell import Cell
 from parser import stmt
-from typing import Any
+from typing import Any, Optional
 
 
 class PloxFunction(PloxCallable):
     def __init__(
-        self, declaration: stmt.Function, closure: Environment, isInitializer: bool
+        self,
+        declaration: stmt.Function,
+        cells: list[Cell],
+        isInitializer: bool,
+        this: Optional[PloxInstance] = None,
     ):
         self.__declaration = declaration
-        self.__closure = closure
+        self.__cells = cells
         self.__isInitializer = isInitializer
+        self.__this = this
 
     def __str__(self) -> str:
         return f"< fn {self.__declaration.name.lexeme} >"
@@ -20,18 +25,48 @@ class PloxFunction(PloxCallable):
     def arity(self) -> int:
         return len(self.__declaration.params)
 
+    @property
+    def pure(self) -> bool:
+        return self.__declaration.pure
+
     def bind(self, instance: PloxInstance) -> "PloxFunction":
-        environment = Environment(self.__closure)
-        environment.define("this", instance)
-        return PloxFunction(self.__declaration, environment, self.__isInitializer)
+        return PloxFunction(
+            self.__declaration, self.__cells, self.__isInitializer, instance
+        )
 
     def call(self, interpreter, arguments: list[Any]) -> Any:
-        environment = Environment(self.__closure)
-        for i in range(len(self.__declaration.params)):
-            environment.define(self.__declaration.params[i].lexeme, arguments[i])
-        try:
-            interpreter.executeBlock(self.__declaration.body, environment)
-        except PloxReturnException as ploxReturnException:
-            if self.__isInitializer:
-                return self.__closure.getAt(0, "this")
-            return ploxReturnException.value
+        return self.invoke(interpreter, self.__this, arguments)
+
+    def invoke(
+        self, interpreter, this: Optional[PloxInstance], arguments: list[Any]
+    ) -> Any:
+        """Call the function with `this` as its receiver, so that calling a
+        method does not need a bound copy of it.
+
+        A call the body ends with in a `return` statement runs here in place of
+        the function that made it, so tail calls do not use the host stack.
+        """
+        function = self
+        while True:
+            declaration = function.__declaration
+            frame: list[Any] = [None] * declaration.frameSize
+            if this is None:
+                frame[: len(arguments)] = arguments
+            else:
+                # Methods keep their receiver in slot zero.
+                frame[0] = this
+                frame[1 : len(arguments) + 1] = arguments
+            for index in declaration.cells:
+                frame[index] = Cell(frame[index])
+            completion = interpreter.executeFunction(
+                declaration, frame, function.__cells
+            )
+            if completion is None:
+                return None
+            if completion is RETURN:
+                if function.__isInitializer:
+                    return this
+                return interpreter.returnValue
+            function, this, arguments = interpreter.returnValue
+            if this is None:
+                this = function.__this
@@ -1,23 +1,49 @@
+from typing import Any, Optional
 from scanner.token import Token
+from runtime.inlineCache import InlineCache
 from runtime.ploxRuntimeError import PloxRuntimeError
 
 
 class PloxInstance:
+    """An instance keeps its field values in a list, laid out by a `Shape` it
+    shares with the instances of its class that set the same fields."""
+
+    __slots__ = ("__klass", "__shape", "__values")
+
     def __init__(self, klass):
         self.__klass = klass
-        self.__fields = {}
+        self.__shape = klass.shape
+        self.__values: list[Any] = []
 
     def __str__(self) -> str:
         return self.__klass.name + " instance"
 
-    def getAttr(self, name: Token) -> object:
-        if name.lexeme in self.__fields:
-            return self.__fields[name.lexeme]
-
-        method = self.__klass.findMethod(name.lexeme)
-        if method is not None:
-            return method.bind(self)
+    def getAttr(self, name: Token, cache: Optional[InlineCache] = None) -> object:
+        if cache is None:
+            found = self.__shape.lookup(name.lexeme)
+        else:
+            found = cache.lookup(self.__shape, name.lexeme)
+        if type(found) is int:
+            return self.__values[found]
+        if found is not None:
+            return found.bind(self)
         raise PloxRuntimeError(name, f"Undefined property {name.lexeme}.")
 
+    def getMethod(self, name: Token, cache: Optional[InlineCache] = None):
+        """The unbound method `getAttr` would bind, or None when a field shadows
+        it or there is no such method."""
+        if cache is None:
+            found = self.__shape.lookup(name.lexeme)
+        else:
+            found = cache.lookup(self.__shape, name.lexeme)
+        if type(found) is int:
+            return None
+        return found
+
     def setAttr(self, name: Token, value: object) -> None:
-        self.__fields[name.lexeme] = value
+        index = self.__shape.slots.get(name.lexeme)
+        if index is None:
+            self.__shape = self.__shape.withField(name.lexeme)
+            self.__values.append(value)
+        else:
+            self.__values[index] = value
@@ -0,0 +1,148 @@
+import operator
+from typing import Any, Callable
+from parser.expr import Binary, Call, ExprVisitor, Variable
+from resolver.accessType import AccessType
+from runtime.ploxFunction import PloxFunction
+from scanner.tokenType import TokenType
+
+# Specialized variants of the nodes the interpreter runs most. With `--quicken`
+# a node changes its class to one of them the first time it runs, after seeing
+# what it works on, and its `accept` then calls a visitor method that skips the
+# checks the generic one makes. A node whose guess turns out wrong changes to a
+# generic variant, which is never specialized again.
+
+COMPARISONS = {
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.EQUAL_EQUAL: operator.eq,
+    TokenType.BANG_EQUAL: operator.ne,
+}
+
+# Int products need a check for negative zero and quotients are floats, so
+# neither is specialized for ints.
+INT_ARITHMETIC = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+}
+
+# Division needs a check for zero, so it is not specialized.
+FLOAT_OPERATORS = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.STAR: operator.mul,
+    **COMPARISONS,
+}
+
+
+class FloatBinary(Binary):
+    """A `Binary` that has only seen floats, which applies `quickOp` to them."""
+
+    quickOp: Callable[[Any, Any], Any]
+
+    def accept(self, visitor: ExprVisitor):
+        return visitor.visit_float_binary_expr(self)
+
+
+class IntArithmetic(Binary):
+    """A `+` or `-` that has only seen ints."""
+
+    quickOp: Callable[[Any, Any], Any]
+
+    def accept(self, visitor: ExprVisitor):
+        return visitor.visit_int_arithmetic_expr(self)
+
+
+class IntComparison(Binary):
+    """A comparison that has only seen ints."""
+
+    quickOp: Callable[[Any, Any], Any]
+
+    def accept(self, visitor: ExprVisitor):
+        return visitor.visit_int_comparison_expr(self)
+
+
+class GenericBinary(Binary):
+    pass
+
+
+class LocalVariable(Variable):
+    def accept(self, visitor: ExprVisitor):
+        return visitor.visit_local_variable_expr(self)
+
+
+class CellVariable(Variable):
+    def accept(self, visitor: ExprVisitor):
+        return visitor.visit_cell_variable_expr(self)
+
+
+class UpvalueVariable(Variable):
+    def accept(self, visitor: ExprVisitor):
+        return visitor.visit_upvalue_variable_expr(self)
+
+
+class GlobalVariable(Variable):
+    pass
+
+
+class DirectCall(Call):
+    """A call of a variable that has always held the same function `target`,
+    which was checked to be callable with these arguments the first time."""
+
+    target: PloxFunction
+
+    def accept(self, visitor: ExprVisitor):
+        return visitor.visit_direct_call_expr(self)
+
+
+class GenericCall(Call):
+    pass
+
+
+VARIABLES = {
+    AccessType.LOCAL: LocalVariable,
+    AccessType.CELL: CellVariable,
+    AccessType.UPVALUE: UpvalueVariable,
+    AccessType.GLOBAL: GlobalVariable,
+}
+
+
+def quickenBinary(expr: Binary, left: Any, right: Any):
+    tokenType = expr.operator.tokenType
+    if type(left) is float and type(right) is float:
+        if tokenType in FLOAT_OPERATORS:
+            expr.__class__ = FloatBinary
+            expr.quickOp = FLOAT_OPERATORS[tokenType]
+            return
+    elif type(left) is int and type(right) is int:
+        if tokenType in INT_ARITHMETIC:
+            expr.__class__ = IntArithmetic
+            expr.quickOp = INT_ARITHMETIC[tokenType]
+            return
+        if tokenType in COMPARISONS:
+            expr.__class__ = IntComparison
+            expr.quickOp = COMPARISONS[tokenType]
+            return
+    expr.__class__ = GenericBinary
+
+
+def quickenVariable(expr: Variable):
+    expr.__class__ = VARIABLES[expr.access]
+
+
+def quickenCall(expr: Call, function: Any, this: Any):
+    """Specialize a call that has just called `function` on `this`."""
+    if this is None and isinstance(function, PloxFunction):
+        if isinstance(expr.callee, Variable):
+            expr.__class__ = DirectCall
+            expr.target = function
+            return
+    expr.__class__ = GenericCall
+
+
+def deoptimize(expr: Binary | Call):
+    if isinstance(expr, Binary):
+        expr.__class__ = GenericBinary
+    else:
+        expr.__class__ = GenericCall
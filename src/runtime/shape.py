@@ -0,0 +1,34 @@
+from typing import Any, Optional
+
+
+class Shape:
+    """The layout of the instances of a class that set the same fields in the
+    same order: the index of every field in the instance's list of values.
+
+    Every class starts with an empty shape. Adding a field moves an instance to
+    the child shape for that field, which is created the first time and shared
+    from then on, so the shapes of a class form a tree of transitions.
+    """
+
+    __slots__ = ("klass", "slots", "transitions")
+
+    def __init__(self, klass, slots: Optional[dict[str, int]] = None):
+        self.klass = klass
+        self.slots: dict[str, int] = slots or {}
+        self.transitions: dict[str, Shape] = {}
+
+    def withField(self, name: str) -> "Shape":
+        shape = self.transitions.get(name)
+        if shape is None:
+            slots = dict(self.slots)
+            slots[name] = len(slots)
+            shape = Shape(self.klass, slots)
+            self.transitions[name] = shape
+        return shape
+
+    def lookup(self, name: str) -> Optional[Any]:
+        """The index of the field `name`, or else the method of that name."""
+        index = self.slots.get(name)
+        if index is not None:
+            return index
+        return self.klass.findMethod(name)
@@ -0,0 +1,12 @@
+class Damage:
+    """The tokens an edit changed: the tokens before `first` are the ones from
+    before the edit, and the old tokens from `oldEnd` on are the new ones from
+    `newEnd` on, `lines` lines further down."""
+
+    __slots__ = ("first", "oldEnd", "newEnd", "lines")
+
+    def __init__(self, first: int, oldEnd: int, newEnd: int, lines: int):
+        self.first = first
+        self.oldEnd = oldEnd
+        self.newEnd = newEnd
+        self.lines = lines
@@ -1,184 +1,244 @@
-from typing import Optional
+import re
+from typing import Iterable, Iterator, Optional
 
+from scanner.damage import Damage
 from scanner.token import Token
+from scanner.tokenBuffer import CODES, EOF, IDENTIFIER, NUMBER, STRING, TokenBuffer
 from scanner.tokenType import TokenType
 from scanner.scanError import ScanError
+from runtime.number import integer
+
+KEYWORDS = {
+    "and": TokenType.AND,
+    "class": TokenType.CLASS,
+    "else": TokenType.ELSE,
+    "false": TokenType.FALSE,
+    "for": TokenType.FOR,
+    "fun": TokenType.FUN,
+    "if": TokenType.IF,
+    "nil": TokenType.NIL,
+    "or": TokenType.OR,
+    "print": TokenType.PRINT,
+    "return": TokenType.RETURN,
+    "super": TokenType.SUPER,
+    "this": TokenType.THIS,
+    "true": TokenType.TRUE,
+    "var": TokenType.VAR,
+    "while": TokenType.WHILE,
+    "assert": TokenType.ASSERT,
+}
+
+PUNCTUATION = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "*": TokenType.STAR,
+    "%": TokenType.PERCENT,
+    "/": TokenType.SLASH,
+    "!": TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+}
+
+# One token, or a run of newlines or a block comment, with the spaces and line
+# comments before it. The unterminated block comment and string and the
+# unexpected character are errors. Spaces and comments at the end of the source
+# come with an empty match, as nothing follows them.
+ITEM = re.compile(
+    r"""
+    (?:[ \r\t]+|//[^\n]*)*
+    (
+        \n+
+        | /\*.*?\*/
+        | /\*
+        | [^\W\d]\w*
+        | \d+(?:\.\d+)?
+        | "[^"]*"
+        | [!=<>]=?
+        | [(){},.\-+;*%/]
+        | "
+        | .
+        | \Z
+    )
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+IDENTIFIER_START = re.compile(r"[^\W\d]")
+
+# The type codes of keywords and punctuation by lexeme, and the other way round.
+FIXED = {lexeme: CODES[tokenType] for lexeme, tokenType in KEYWORDS.items()}
+FIXED.update((lexeme, CODES[tokenType]) for lexeme, tokenType in PUNCTUATION.items())
+LEXEMES = {code: lexeme for lexeme, code in FIXED.items()}
+LEXEMES[EOF] = ""
 
 
 class Scanner:
+    """Splits the source into tokens with a single regular expression, which
+    finds all of them in one pass, and records them in a `TokenBuffer`.
+
+    A token is on the line it ends on.
+    """
+
     def __init__(self, runtime):
         self.__runtime = runtime
-        self.__tokens = []
-        self.__start = 0
-        self.__current = 0
-        self.__line = 1
+        self.__tokens = TokenBuffer("", LEXEMES)
 
     def run(self, source: str):
-        self.__source = source
+        self.__tokens = TokenBuffer(source, LEXEMES)
         try:
-            self.__scanTokens()
+            line, _ = self.__scanText(self.__tokens, 1, final=True)
+            self.__tokens.append(EOF, len(source), len(source), line)
         except ScanError as error:
             self.__runtime.reportError(error)
 
+    def stream(self, chunks: Iterable[str]) -> Iterator[Token]:
+        """Scan the source read in `chunks` as its tokens are asked for.
+
+        Strings and block comments are the only things that run past the end of
+        a line, so the source is scanned up to the last newline read, and a
+        string or comment still open there waits for the next chunks. Errors
+        are raised rather than reported, as they end the stream.
+        """
+        line = 1
+        pending = ""
+        for chunk in chunks:
+            pending += chunk
+            end = pending.rfind("\n") + 1
+            if end:
+                tokens = TokenBuffer(pending[:end], LEXEMES)
+                line, rest = self.__scanText(tokens, line)
+                pending = pending[rest:]
+                yield from tokens
+        tokens = TokenBuffer(pending, LEXEMES)
+        line, _ = self.__scanText(tokens, line, final=True)
+        tokens.append(EOF, len(pending), len(pending), line)
+        yield from tokens
+
+    def relex(
+        self, tokens: TokenBuffer, offset: int, deleted: int, inserted: str
+    ) -> Damage:
+        """Replace `deleted` characters at `offset` in the source of `tokens`
+        with `inserted`, and scan the tokens again from before the edit until
+        they are the same as before it. Errors are raised, as in `stream`, and
+        leave `tokens` as they were.
+        """
+        old = tokens.source
+        source = old[:offset] + inserted + old[offset + deleted :]
+        shift = len(inserted) - deleted
+        lines = inserted.count("\n") - old.count("\n", offset, offset + deleted)
+        edited = offset + len(inserted)
+        # A token is kept if the scan did not look at the edited text to find
+        # where it ends, which takes up to two characters after it.
+        first = tokens.firstEnding(offset - 1)
+        position = tokens.end(first - 1) if first else 0
+        line = tokens.line(first - 1) if first else 1
+        fresh = TokenBuffer(source, LEXEMES)
+        size = 1
+        while True:
+            # The tokens are scanned a line at a time at first, then in ever
+            # longer runs of lines while they keep changing.
+            limit = source.find("\n", max(position, edited) + size) + 1
+            scanned = len(fresh)
+            if limit == 0:
+                line, position = self.__scanText(fresh, line, position, final=True)
+                fresh.append(EOF, len(source), len(source), line)
+            else:
+                line, position = self.__scanText(fresh, line, position, limit)
+            # Once a token after the edit starts where one did before, the
+            # tokens from there on are the ones from before, moved by the edit.
+            for index in range(scanned, len(fresh)):
+                start = fresh.starts[index]
+                if start < edited:
+                    continue
+                end = tokens.startingAt(start - shift)
+                if end is not None:
+                    tokens.splice(source, first, end, fresh, index, shift, lines)
+                    return Damage(first, end, first + index, lines)
+            size *= 2
+
     @property
-    def tokens(self) -> list[Token]:
+    def tokens(self) -> TokenBuffer:
         return self.__tokens
 
-    def __scanTokens(self):
-        while not self.__isEOF():
-            self.__scanToken()
-        self.__eof()
-
-    def __scanToken(self):
-        self.__start = self.__current
-        char = self.__advance()
-        match char:
-            case "(":
-                self.__addToken(TokenType.LEFT_PAREN)
-            case ")":
-                self.__addToken(TokenType.RIGHT_PAREN)
-            case "{":
-                self.__addToken(TokenType.LEFT_BRACE)
-            case "}":
-                self.__addToken(TokenType.RIGHT_BRACE)
-            case ",":
-                self.__addToken(TokenType.COMMA)
-            case ".":
-                self.__addToken(TokenType.DOT)
-            case "-":
-                self.__addToken(TokenType.MINUS)
-            case "+":
-                self.__addToken(TokenType.PLUS)
-            case ";":
-                self.__addToken(TokenType.SEMICOLON)
-            case "*":
-                self.__addToken(TokenType.STAR)
-            case "%":
-                self.__addToken(TokenType.PERCENT)
-            case "!":
-                self.__addToken(
-                    TokenType.BANG_EQUAL if self.__match("=") else TokenType.BANG
-                )
-            case "=":
-                self.__addToken(
-                    TokenType.EQUAL_EQUAL if self.__match("=") else TokenType.EQUAL
-                )
-            case "<":
-                self.__addToken(
-                    TokenType.LESS_EQUAL if self.__match("=") else TokenType.LESS
-                )
-            case ">":
-                self.__addToken(
-                    TokenType.GREATER_EQUAL if self.__match("=") else TokenType.GREATER
-                )
-            case " " | "\r" | "\t" | "\n":
-                pass
-            case '"':
-                self.__string()
-            case "/":
-                if self.__match("/"):
-                    while self.__peek() != "\n" and not self.__isEOF():
-                        self.__advance()
-                elif self.__match("*"):
-                    self.__blockComment()
-                else:
-                    self.__addToken(TokenType.SLASH)
-            case _:
-                if char.isdigit():
-                    self.__number()
-                elif self.isIdentifierPart(char):
-                    self.__identifier()
-                else:
-                    raise ScanError(self.__line, f"Unexpected character '{char}'")
-        return
-
-    def __blockComment(self):
-        while self.__peek() + self.__peekNext() != "*/":
-            self.__advance()
-            if self.__isEOF():
-                self.__advance()
-                raise ScanError(self.__line, "Unterminated block comment")
-        self.__advance()
-        self.__advance()
-
-    def __string(self):
-        while self.__peek() != '"' and not self.__isEOF():
-            self.__advance()
-        if self.__isEOF():
-            raise ScanError(self.__line, "Unterminated string")
-        self.__advance()
-        literal = self.__source[self.__start + 1 : self.__current - 1]
-        self.__addToken(TokenType.STRING, literal)
-
-    def __number(self):
-        while self.__peek().isdigit():
-            self.__advance()
-        if self.__peek() == "." and self.__peekNext().isdigit():
-            self.__advance()
-            while self.__peek().isdigit():
-                self.__advance()
-        self.__addToken(
-            TokenType.NUMBER, float(self.__source[self.__start : self.__current])
-        )
-
-    def __eof(self):
-        self.__tokens.append(Token(TokenType.EOF, "", None, self.__line))
-
-    def __identifier(self):
-        __keywords = {
-            "and": TokenType.AND,
-            "class": TokenType.CLASS,
-            "else": TokenType.ELSE,
-            "false": TokenType.FALSE,
-            "for": TokenType.FOR,
-            "fun": TokenType.FUN,
-            "if": TokenType.IF,
-            "nil": TokenType.NIL,
-            "or": TokenType.OR,
-            "print": TokenType.PRINT,
-            "return": TokenType.RETURN,
-            "super": TokenType.SUPER,
-            "this": TokenType.THIS,
-            "true": TokenType.TRUE,
-            "var": TokenType.VAR,
-            "while": TokenType.WHILE,
-            "assert": TokenType.ASSERT,
-        }
-        while self.isIdentifierPart(self.__peek()):
-            self.__advance()
-        text = self.__source[self.__start : self.__current]
-        self.__addToken(__keywords.get(text, TokenType.IDENTIFIER))
-
-    @staticmethod
-    def isIdentifierPart(c: str):
-        return c.replace("_", "a").isalnum()
-
-    def __match(self, expected: str) -> bool:
-        if self.__source[self.__current] != expected or self.__isEOF():
-            return False
-        self.__advance()
-        return True
-
-    def __peek(self) -> str:
-        if self.__isEOF():
-            return "\0"
-        return self.__source[self.__current]
-
-    def __peekNext(self) -> str:
-        if self.__current + 1 >= len(self.__source):
-            return "\0"
-        return self.__source[self.__current + 1]
-
-    def __advance(self) -> str:
-        current = self.__peek()
-        if current == "\n":
-            self.__line += 1
-        self.__current += 1
-        return current
-
-    def __addToken(self, type: TokenType, literal: Optional[float | str] = None):
-        text = self.__source[self.__start : self.__current]
-        self.__tokens.append(Token(type, text, literal, self.__line))
-
-    def __isEOF(self) -> bool:
-        return self.__current >= len(self.__source)
+    def __scanText(
+        self,
+        tokens: TokenBuffer,
+        line: int,
+        start: int = 0,
+        end: Optional[int] = None,
+        final: bool = False,
+    ) -> tuple[int, int]:
+        """Scan the source of `tokens` from `start` to `end`, which must end a
+        line, into them. The text scanned starts on `line`, and the line it
+        ends on is returned with the position where it ends. Unless the source
+        ends there, a string or block comment left open stops the scan before
+        it.
+        """
+        text = tokens.source
+        fixed = FIXED.get
+        add = tokens.append
+        # Most tokens are keywords, punctuation or identifiers, which are added
+        # without going through `add`.
+        types = tokens.types.append
+        starts = tokens.starts.append
+        ends = tokens.ends.append
+        lines = tokens.lines.append
+        literals = tokens.literals.append
+        if end is None:
+            end = len(text)
+        for match in ITEM.finditer(text, start, end):
+            item = match[1]
+            code = fixed(item)
+            if code is not None:
+                types(code)
+                starts(match.start(1))
+                ends(match.end(1))
+                lines(line)
+                literals(None)
+                continue
+            first = item[:1]
+            if first == "\n":
+                line += len(item)
+            elif first == '"':
+                if item == '"':
+                    return self.__unterminated(match, line, final, "string")
+                line += item.count("\n")
+                add(STRING, *match.span(1), line, item[1:-1])
+            elif first == "/":
+                if item == "/*":
+                    return self.__unterminated(match, line, final, "block comment")
+                line += item.count("\n")
+            elif first.isdecimal():
+                value = float(item) if "." in item else integer(int(item))
+                add(NUMBER, *match.span(1), line, value)
+            elif len(item) > 1 or IDENTIFIER_START.match(item):
+                types(IDENTIFIER)
+                starts(match.start(1))
+                ends(match.end(1))
+                lines(line)
+                literals(None)
+            elif item:
+                raise ScanError(line, f"Unexpected character '{item}'")
+        return line, end
+
+    def __unterminated(
+        self, match: re.Match, line: int, final: bool, kind: str
+    ) -> tuple[int, int]:
+        start = match.start(1)
+        if final:
+            # The error is on the last line, where the source ends.
+            line += match.string.count("\n", start)
+            raise ScanError(line, f"Unterminated {kind}")
+        return line, start
@@ -4,11 +4,13 @@ from scanner.tokenType import TokenType
 
 
 class Token:
+    __slots__ = ("tokenType", "lexeme", "literal", "line")
+
     def __init__(
         self,
         tokenType: TokenType,
         lexeme: str,
-        literal: Optional[str | float],
+        literal: Optional[str | int | float],
         line: int,
     ) -> None:
         self.tokenType = tokenType
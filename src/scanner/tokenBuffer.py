@@ -0,0 +1,189 @@
+import sys
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+from typing import Any, Iterator, Optional
+
+from scanner.token import Token
+from scanner.tokenType import TokenType
+
+# Token types are stored as their index in this list.
+TOKEN_TYPES = list(TokenType)
+CODES = {tokenType: code for code, tokenType in enumerate(TOKEN_TYPES)}
+
+IDENTIFIER = CODES[TokenType.IDENTIFIER]
+STRING = CODES[TokenType.STRING]
+NUMBER = CODES[TokenType.NUMBER]
+EOF = CODES[TokenType.EOF]
+
+
+# Corrections an edited buffer holds before it applies them to its arrays.
+MAX_CORRECTIONS = 64
+
+
+class TokenBuffer(Sequence[Token]):
+    """The tokens of `source` as parallel arrays of their type codes, the
+    offsets where they start and end in `source` and their lines, with a side
+    list of the literals of strings and numbers.
+
+    Indexing the buffer builds a `Token` for code that wants one. Its lexeme is
+    sliced out of `source` then, or taken from `lexemes` for keywords and
+    punctuation, and identifiers are interned so that the tokens of a name
+    share one string.
+
+    An edit moves the tokens after it, which `splice` records as a correction
+    rather than rewriting the arrays: from each index in `corrected` up to the
+    next one, the offsets and lines in the arrays are off by the `shifts` and
+    `lineShifts` at the same position. `start`, `end` and `line` apply them.
+    """
+
+    def __init__(self, source: str, lexemes: dict[int, str]):
+        self.source = source
+        self.lexemes = lexemes
+        self.types = array("B")
+        self.starts = array("I")
+        self.ends = array("I")
+        self.lines = array("I")
+        self.literals: list[Any] = []
+        self.corrected: list[int] = []
+        self.shifts: list[int] = []
+        self.lineShifts: list[int] = []
+
+    def append(
+        self, code: int, start: int, end: int, line: int, literal: Optional[Any] = None
+    ):
+        self.types.append(code)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+        self.literals.append(literal)
+
+    def start(self, index: int) -> int:
+        return self.starts[index] + self.__correction(index)[0]
+
+    def end(self, index: int) -> int:
+        return self.ends[index] + self.__correction(index)[0]
+
+    def line(self, index: int) -> int:
+        return self.lines[index] + self.__correction(index)[1]
+
+    def firstEnding(self, offset: int) -> int:
+        """The index of the first token that ends at `offset` or after it."""
+        return self.__search(self.ends, offset)
+
+    def startingAt(self, offset: int) -> Optional[int]:
+        """The index of the token starting at `offset`, if there is one."""
+        index = self.__search(self.starts, offset)
+        if index < len(self.types) and self.start(index) == offset:
+            return index
+        return None
+
+    def splice(
+        self,
+        source: str,
+        first: int,
+        end: int,
+        tokens: "TokenBuffer",
+        count: int,
+        shift: int,
+        lines: int,
+    ):
+        """Make this the buffer of `source`, an edited version of its source,
+        in which the tokens from `first` to `end` are replaced with the first
+        `count` of `tokens`, and the ones after them are `shift` characters and
+        `lines` lines further down."""
+        moved, movedLines = self.__correction(end)
+        self.types[first:end] = tokens.types[:count]
+        self.starts[first:end] = tokens.starts[:count]
+        self.ends[first:end] = tokens.ends[:count]
+        self.lines[first:end] = tokens.lines[:count]
+        self.literals[first:end] = tokens.literals[:count]
+        self.source = source
+        corrections = []
+        after = []
+        for index, by, byLines in zip(self.corrected, self.shifts, self.lineShifts):
+            if index < first:
+                corrections.append((index, by, byLines))
+            elif index > end:
+                index += first + count - end
+                after.append((index, by + shift, byLines + lines))
+        # The new tokens need no correction, and the ones after them need the
+        # edit's on top of the one they had.
+        if count:
+            corrections.append((first, 0, 0))
+        corrections.append((first + count, moved + shift, movedLines + lines))
+        corrections.extend(after)
+        self.corrected.clear()
+        self.shifts.clear()
+        self.lineShifts.clear()
+        previous = (0, 0)
+        for index, by, byLines in corrections:
+            if (by, byLines) != previous:
+                self.corrected.append(index)
+                self.shifts.append(by)
+                self.lineShifts.append(byLines)
+                previous = (by, byLines)
+        if len(self.corrected) > MAX_CORRECTIONS:
+            self.__applyCorrections()
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __getitem__(self, index: int) -> Token:
+        if index < 0:
+            index += len(self.types)
+        code = self.types[index]
+        shift, lines = self.__correction(index)
+        lexeme = self.lexemes.get(code)
+        if lexeme is None:
+            start = self.starts[index] + shift
+            lexeme = self.source[start : self.ends[index] + shift]
+            if code == IDENTIFIER:
+                lexeme = sys.intern(lexeme)
+        return Token(
+            TOKEN_TYPES[code], lexeme, self.literals[index], self.lines[index] + lines
+        )
+
+    def __iter__(self) -> Iterator[Token]:
+        return self.tokensFrom(0)
+
+    def tokensFrom(self, start: int) -> Iterator[Token]:
+        for index in range(start, len(self.types)):
+            yield self[index]
+
+    def __correction(self, index: int) -> tuple[int, int]:
+        at = bisect_right(self.corrected, index) - 1
+        if at < 0:
+            return 0, 0
+        return self.shifts[at], self.lineShifts[at]
+
+    def __search(self, values: array, offset: int) -> int:
+        """The index of the first token whose value in `values`, corrected,
+        is at least `offset`."""
+        low, high = 0, len(values)
+        while low < high:
+            middle = (low + high) // 2
+            if values[middle] + self.__correction(middle)[0] < offset:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def __applyCorrections(self):
+        bounds = self.corrected + [len(self.types)]
+        for at, index in enumerate(self.corrected):
+            end = bounds[at + 1]
+            shift, lines = self.shifts[at], self.lineShifts[at]
+            self.starts[index:end] = moved(self.starts[index:end], shift)
+            self.ends[index:end] = moved(self.ends[index:end], shift)
+            self.lines[index:end] = moved(self.lines[index:end], lines)
+        self.corrected.clear()
+        self.shifts.clear()
+        self.lineShifts.clear()
+
+
+def moved(values: array, distance: int) -> array:
+    if distance == 0:
+        return values
+    # Mapping a bound method keeps the loop out of the interpreter.
+    return array(values.typecode, map(distance.__add__, values))
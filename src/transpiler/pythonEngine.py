@@ -0,0 +1,84 @@
+from functools import partial
+from itertools import count
+from types import FunctionType, MethodType, TracebackType
+from typing import Any, Optional
+from parser.stmt import Stmt
+from runtime.native.natives import functions as NATIVE_FUNCTIONS
+from runtime.ploxRuntimeError import PloxRuntimeError
+from scanner.token import Token
+from scanner.tokenType import TokenType
+from transpiler import support
+from transpiler.transpiler import Transpiler
+
+
+class PythonEngine:
+    """Execution engine that transpiles the program to Python source.
+
+    The source is compiled with CPython's own compiler and executed in a
+    namespace that persists across runs, so the REPL keeps its globals. Lox
+    globals live in that namespace as ``g_*`` names; locals become Python
+    locals, which is where the speed comes from.
+    """
+
+    def __init__(self, __runtime):
+        self.__runtime = __runtime
+        self.__result = None
+        self.__counter = count()
+        self.__tokens: list[Token] = []
+        self.__names: dict[str, str] = {}
+        self.__lineMaps: dict[str, list[int]] = {}
+        self.__namespace: dict[str, Any] = dict(support.NAMESPACE)
+        self.__namespace["_G"] = self.__namespace
+        self.__namespace["_K"] = self.__tokens
+        self.__namespace["_stringify"] = partial(support.stringify, self.__names)
+        for name, function in NATIVE_FUNCTIONS.items():
+            self.__namespace["g_" + name] = function
+
+    @property
+    def result(self) -> Any:
+        if isinstance(self.__result, (FunctionType, MethodType, support.Method)):
+            return support.stringify(self.__names, self.__result)
+        return self.__result
+
+    def run(self, program: list[Stmt]):
+        transpiler = Transpiler(self.__tokens, self.__names, self.__counter)
+        source, lineMap = transpiler.transpile(program)
+        filename = f"<plox-{next(self.__counter)}>"
+        self.__lineMaps[filename] = lineMap
+        code = compile(source, filename, "exec")
+        self.__result = None
+        try:
+            exec(code, self.__namespace)
+            self.__result = self.__namespace.pop("_result")
+        except PloxRuntimeError as error:
+            self.__runtime.reportError(error)
+        except NameError as error:
+            name = demangle(error.name)
+            token = self.__token(name, error.__traceback__)
+            message = f"Undefined variable '{name}'."
+            self.__runtime.reportError(PloxRuntimeError(token, message))
+        except AttributeError as error:
+            name = demangle(error.name)
+            token = self.__token(name, error.__traceback__)
+            message = f"Undefined property {name}."
+            self.__runtime.reportError(PloxRuntimeError(token, message))
+        except RecursionError as error:
+            token = self.__token("", error.__traceback__)
+            self.__runtime.reportError(PloxRuntimeError(token, "Stack overflow."))
+
+    def __token(self, lexeme: str, traceback: Optional[TracebackType]) -> Token:
+        """Build a token on the Lox line of the innermost transpiled frame."""
+        line = 0
+        while traceback is not None:
+            lineMap = self.__lineMaps.get(traceback.tb_frame.f_code.co_filename)
+            if lineMap is not None and traceback.tb_lineno < len(lineMap):
+                line = lineMap[traceback.tb_lineno]
+            traceback = traceback.tb_next
+        return Token(TokenType.IDENTIFIER, lexeme, None, line)
+
+
+def demangle(pyName: str) -> str:
+    """Recover the Lox name from a transpiled ``g_``/``l_``/``p_`` name."""
+    if pyName.startswith("l_"):
+        return pyName[2:].rsplit("_", 1)[0]
+    return pyName[2:]
@@ -0,0 +1,229 @@
+from itertools import count
+from typing import Iterator, Optional
+from parser.expr import ExprVisitor
+from parser.stmt import StmtVisitor
+import parser.expr as expr
+import parser.stmt as stmt
+from parser.stmt import Stmt
+from scanner.token import Token
+
+
+class Binding:
+    """A Lox local variable and the Python name it is translated to.
+
+    Python closures capture variables per *call*, Lox captures them per
+    *declaration*. The two only disagree for a captured variable declared
+    inside a loop, which therefore lives in a one element list (a box) that
+    closures receive through a keyword-only default argument.
+    """
+
+    def __init__(self, pyName: str, function: "FunctionScope", inLoop: bool):
+        self.pyName = pyName
+        self.function = function
+        self.inLoop = inLoop
+        self.captured = False
+
+    @property
+    def boxed(self) -> bool:
+        return self.captured and self.inLoop
+
+
+class FunctionScope:
+    def __init__(self, parent: Optional["FunctionScope"]):
+        self.parent = parent
+        self.loopDepth = 0
+        self.freeBoxes: list[Binding] = []
+        self.nonlocals: list[str] = []
+        self.globals: list[str] = []
+
+    @property
+    def isModule(self) -> bool:
+        return self.parent is None
+
+    def addFreeBox(self, binding: Binding):
+        if binding not in self.freeBoxes:
+            self.freeBoxes.append(binding)
+
+    def addNonlocal(self, binding: Binding):
+        names = self.globals if binding.function.isModule else self.nonlocals
+        if binding.pyName not in names:
+            names.append(binding.pyName)
+
+    def addGlobal(self, pyName: str):
+        if pyName not in self.globals:
+            self.globals.append(pyName)
+
+
+class ScopeAnalyzer(ExprVisitor, StmtVisitor):
+    """Maps every Lox variable declaration and reference to a `Binding`.
+
+    References that resolve to ``None`` are globals. The scoping rules mirror
+    the `Resolver`: the top level has no scope, blocks and functions do.
+    """
+
+    def __init__(self, counter: Optional[Iterator[int]] = None):
+        self.__counter = counter or count()
+        self.bindings: dict[object, Optional[Binding]] = {}
+        self.functions: dict[object, FunctionScope] = {}
+        self.__scopes: list[dict[str, Binding]] = []
+        self.__function = FunctionScope(None)
+
+    def run(self, program: list[Stmt]) -> FunctionScope:
+        self.__analyzeStatements(program)
+        return self.__function
+
+    def __analyzeStatements(self, statements: list[Stmt]):
+        for statement in statements:
+            statement.accept(self)
+
+    def __analyzeExpression(self, expression: expr.Expr):
+        expression.accept(self)
+
+    def __declare(self, key: object, name: Token) -> Optional[Binding]:
+        if len(self.__scopes) == 0:
+            return None
+        pyName = f"l_{mangle(name.lexeme)}_{next(self.__counter)}"
+        binding = Binding(pyName, self.__function, self.__function.loopDepth > 0)
+        self.__scopes[-1][name.lexeme] = binding
+        self.bindings[key] = binding
+        return binding
+
+    def __reference(self, key: object, name: str, assign: bool = False):
+        binding = None
+        for scope in reversed(self.__scopes):
+            if name in scope:
+                binding = scope[name]
+                break
+        self.bindings[key] = binding
+        if binding is None:
+            if assign and not self.__function.isModule:
+                self.__function.addGlobal("g_" + mangle(name))
+            return
+        if binding.function is self.__function:
+            return
+        binding.captured = True
+        if binding.inLoop:
+            function = self.__function
+            while function is not binding.function:
+                function.addFreeBox(binding)
+                assert function.parent is not None
+                function = function.parent
+        elif assign:
+            self.__function.addNonlocal(binding)
+
+    def __analyzeFunction(self, function: stmt.Function):
+        enclosing = self.__function
+        self.__function = FunctionScope(enclosing)
+        self.functions[function] = self.__function
+        self.__scopes.append({})
+        for param in function.params:
+            self.__declare(param, param)
+        self.__analyzeStatements(function.body)
+        self.__scopes.pop()
+        self.__function = enclosing
+
+    def visit_assign_expr(self, expr: expr.Assign):
+        self.__analyzeExpression(expr.value)
+        self.__reference(expr, expr.name.lexeme, assign=True)
+
+    def visit_binary_expr(self, expr: expr.Binary):
+        self.__analyzeExpression(expr.left)
+        self.__analyzeExpression(expr.right)
+
+    def visit_call_expr(self, expr: expr.Call):
+        self.__analyzeExpression(expr.callee)
+        for argument in expr.arguments:
+            self.__analyzeExpression(argument)
+
+    def visit_comma_expr(self, expr: expr.Comma):
+        for expression in expr.expressions:
+            self.__analyzeExpression(expression)
+
+    def visit_get_expr(self, expr: expr.Get):
+        self.__analyzeExpression(expr.obj)
+
+    def visit_grouping_expr(self, expr: expr.Grouping):
+        self.__analyzeExpression(expr.expression)
+
+    def visit_literal_expr(self, expr: expr.Literal):
+        return
+
+    def visit_logical_expr(self, expr: expr.Logical):
+        self.__analyzeExpression(expr.left)
+        self.__analyzeExpression(expr.right)
+
+    def visit_set_expr(self, expr: expr.Set):
+        self.__analyzeExpression(expr.value)
+        self.__analyzeExpression(expr.obj)
+
+    def visit_super_expr(self, expr: expr.Super):
+        self.__reference(expr, "super")
+
+    def visit_this_expr(self, expr: expr.This):
+        return
+
+    def visit_unary_expr(self, expr: expr.Unary):
+        self.__analyzeExpression(expr.right)
+
+    def visit_variable_expr(self, expr: expr.Variable):
+        self.__reference(expr, expr.name.lexeme)
+
+    def visit_block_stmt(self, stmt: stmt.Block):
+        self.__scopes.append({})
+        self.__analyzeStatements(stmt.statements)
+        self.__scopes.pop()
+
+    def visit_class_stmt(self, stmt: stmt.Class):
+        self.__declare(stmt, stmt.name)
+        if stmt.superclass is not None:
+            self.__analyzeExpression(stmt.superclass)
+            self.__scopes.append({})
+            # Methods close over the superclass through a "super" local.
+            superclass = Token(stmt.name.tokenType, "super", None, stmt.name.line)
+            self.__declare(superKey(stmt), superclass)
+        for method in stmt.methods:
+            self.__analyzeFunction(method)
+        if stmt.superclass is not None:
+            self.__scopes.pop()
+
+    def visit_expression_stmt(self, stmt: stmt.Expression):
+        self.__analyzeExpression(stmt.expression)
+
+    def visit_function_stmt(self, stmt: stmt.Function):
+        self.__declare(stmt, stmt.name)
+        self.__analyzeFunction(stmt)
+
+    def visit_if_stmt(self, stmt: stmt.If):
+        self.__analyzeExpression(stmt.condition)
+        stmt.thenBranch.accept(self)
+        if stmt.elseBranch is not None:
+            stmt.elseBranch.accept(self)
+
+    def visit_print_stmt(self, stmt: stmt.Print):
+        self.__analyzeExpression(stmt.expression)
+
+    def visit_return_stmt(self, stmt: stmt.Return):
+        if stmt.value is not None:
+            self.__analyzeExpression(stmt.value)
+
+    def visit_var_stmt(self, stmt: stmt.Var):
+        if stmt.initializer is not None:
+            self.__analyzeExpression(stmt.initializer)
+        self.__declare(stmt, stmt.name)
+
+    def visit_while_stmt(self, stmt: stmt.While):
+        self.__function.loopDepth += 1
+        self.__analyzeExpression(stmt.condition)
+        stmt.body.accept(self)
+        self.__function.loopDepth -= 1
+
+
+def superKey(stmt: stmt.Class) -> tuple[str, stmt.Class]:
+    return ("super", stmt)
+
+
+def mangle(name: str) -> str:
+    """Turn a Lox identifier into a string usable inside a Python identifier."""
+    if name.isidentifier():
+        return name
+    return "x" + name.encode().hex()
@@ -0,0 +1,189 @@
+from types import FunctionType, MethodType
+from typing import Any
+from runtime.interpreter import checkNumberOperands, overloadedPlus
+from runtime.interpreter import stringify as stringifyValue
+from runtime.ploxCallable import PloxCallable
+from runtime.ploxRuntimeError import PloxRuntimeError
+from scanner.token import Token
+
+
+class LoxClass(type):
+    """Metaclass of every transpiled Lox class, printing it by its Lox name."""
+
+    def __str__(cls) -> str:
+        return cls._loxName
+
+
+class Instance(metaclass=LoxClass):
+    """Base class of every transpiled Lox class.
+
+    Lox fields and methods are stored as attributes prefixed with ``p_`` so
+    they can never collide with Python's own attributes.
+    """
+
+    _loxName = "Instance"
+
+    def __str__(self) -> str:
+        return type(self)._loxName + " instance"
+
+
+class Method:
+    """A Lox method bound to its receiver, which unlike a Python bound method
+    is only equal to itself."""
+
+    __slots__ = ("__func__", "__self__")
+
+    def __init__(self, function: FunctionType, receiver: Instance):
+        self.__func__ = function
+        self.__self__ = receiver
+
+    def __call__(self, *arguments: Any) -> Any:
+        return self.__func__(self.__self__, *arguments)
+
+
+def arity(callee: Any) -> int:
+    if type(callee) is FunctionType:
+        return callee.__code__.co_argcount
+    if type(callee) is MethodType or type(callee) is Method:
+        return callee.__func__.__code__.co_argcount - 1
+    if type(callee) is LoxClass:
+        initializer = getattr(callee, "p_init", None)
+        if initializer is None:
+            return 0
+        return initializer.__code__.co_argcount - 1
+    return callee.arity()
+
+
+def call(token: Token, callee: Any, *arguments: Any) -> Any:
+    """Call ``callee`` with the checks of `Interpreter.visit_call_expr`."""
+    if not isinstance(
+        callee, (FunctionType, MethodType, Method, LoxClass, PloxCallable)
+    ):
+        raise PloxRuntimeError(token, "Can only call functions and classes.")
+    expected = arity(callee)
+    if len(arguments) != expected:
+        raise PloxRuntimeError(
+            token, f"Expected {expected} arguments but got {len(arguments)}."
+        )
+    if isinstance(callee, PloxCallable):
+        return callee.call(None, list(arguments))
+    if type(callee) is LoxClass:
+        instance = callee()
+        initializer = getattr(callee, "p_init", None)
+        if initializer is not None:
+            initializer(instance, *arguments)
+        return instance
+    return callee(*arguments)
+
+
+def superclass(token: Token, value: Any) -> LoxClass:
+    if type(value) is not LoxClass:
+        raise PloxRuntimeError(token, "Superclass must be a class.")
+    return value
+
+
+def superMethod(token: Token, klass: LoxClass, attribute: str) -> FunctionType:
+    method = getattr(klass, attribute, None)
+    if method is None:
+        raise PloxRuntimeError(token, f"Undefined property {token.lexeme}.")
+    return method
+
+
+def setProperty(token: Token, obj: Any, attribute: str, value: Any) -> Any:
+    if not isinstance(obj, Instance):
+        raise PloxRuntimeError(token, "Only instances have fields.")
+    setattr(obj, attribute, value)
+    return value
+
+
+def notAnInstance(token: Token, what: str):
+    raise PloxRuntimeError(token, f"Only instances have {what}.")
+
+
+def undefinedVariable(token: Token):
+    raise PloxRuntimeError(token, f"Undefined variable '{token.lexeme}'.")
+
+
+def assignBox(box: list, value: Any) -> Any:
+    box[0] = value
+    return value
+
+
+def negate(token: Token, operand: Any) -> float:
+    if not isinstance(operand, (float, int)):
+        raise PloxRuntimeError(token, "Operand must be a number.")
+    return -float(operand)
+
+
+def add(token: Token, left: Any, right: Any) -> Any:
+    return overloadedPlus(token, left, right)
+
+
+def subtract(token: Token, left: Any, right: Any) -> float:
+    checkNumberOperands(token, left, right)
+    return float(left) - float(right)
+
+
+def multiply(token: Token, left: Any, right: Any) -> float:
+    checkNumberOperands(token, left, right)
+    return float(left) * float(right)
+
+
+def divide(token: Token, left: Any, right: Any) -> float:
+    checkNumberOperands(token, left, right)
+    if right == 0:
+        raise PloxRuntimeError(token, "Cannot divide by zero.")
+    return float(left) / float(right)
+
+
+def greater(token: Token, left: Any, right: Any) -> bool:
+    checkNumberOperands(token, left, right)
+    return float(left) > float(right)
+
+
+def greaterEqual(token: Token, left: Any, right: Any) -> bool:
+    checkNumberOperands(token, left, right)
+    return float(left) >= float(right)
+
+
+def less(token: Token, left: Any, right: Any) -> bool:
+    checkNumberOperands(token, left, right)
+    return float(left) < float(right)
+
+
+def lessEqual(token: Token, left: Any, right: Any) -> bool:
+    checkNumberOperands(token, left, right)
+    return float(left) <= float(right)
+
+
+def stringify(names: dict[str, str], obj: Any) -> str:
+    """`stringify` that also knows how to print transpiled functions."""
+    if type(obj) is MethodType or type(obj) is Method:
+        obj = obj.__func__
+    if type(obj) is FunctionType:
+        return f"< fn {names[obj.__name__]} >"
+    return stringifyValue(obj)
+
+
+NAMESPACE = {
+    "_Instance": Instance,
+    "_Function": FunctionType,
+    "_Method": Method,
+    "_MethodType": MethodType,
+    "_call": call,
+    "_superclass": superclass,
+    "_superMethod": superMethod,
+    "_setProperty": setProperty,
+    "_notAnInstance": notAnInstance,
+    "_undefinedVariable": undefinedVariable,
+    "_assignBox": assignBox,
+    "_negate": negate,
+    "_add": add,
+    "_subtract": subtract,
+    "_multiply": multiply,
+    "_divide": divide,
+    "_greater": greater,
+    "_greaterEqual": greaterEqual,
+    "_less": less,
+    "_lessEqual": lessEqual,
+}
@@ -0,0 +1,451 @@
+from itertools import count
+from typing import Iterator, Optional
+from parser.expr import ExprVisitor
+from parser.expr import Assign, Binary, Get, Grouping, Literal, Logical
+from parser.expr import Set, Super, This, Unary
+from parser.stmt import StmtVisitor
+import parser.expr as expr
+import parser.stmt as stmt
+from parser.stmt import Stmt
+from scanner.token import Token
+from scanner.tokenType import TokenType
+from runtime.number import asFloat
+from transpiler.scopeAnalyzer import (
+    Binding,
+    FunctionScope,
+    ScopeAnalyzer,
+    mangle,
+    superKey,
+)
+
+# Binary operators with a float fast path and the support helper implementing
+# the full Lox semantics for every other operand type.
+ARITHMETIC = {
+    TokenType.PLUS: ("+", "_add"),
+    TokenType.MINUS: ("-", "_subtract"),
+    TokenType.STAR: ("*", "_multiply"),
+    TokenType.SLASH: ("/", "_divide"),
+    TokenType.GREATER: (">", "_greater"),
+    TokenType.GREATER_EQUAL: (">=", "_greaterEqual"),
+    TokenType.LESS: ("<", "_less"),
+    TokenType.LESS_EQUAL: ("<=", "_lessEqual"),
+}
+
+BOOLEAN_OPERATORS = (
+    TokenType.GREATER,
+    TokenType.GREATER_EQUAL,
+    TokenType.LESS,
+    TokenType.LESS_EQUAL,
+    TokenType.EQUAL_EQUAL,
+    TokenType.BANG_EQUAL,
+)
+
+
+class Transpiler(ExprVisitor, StmtVisitor):
+    """Translates a resolved Lox program into Python source.
+
+    Expression visitors return Python expression text, statement visitors
+    emit indented lines. Every emitted line remembers the Lox line it came
+    from so Python tracebacks can be mapped back to the Lox source.
+
+    The generated code relies on the helpers `PythonEngine` puts into the
+    module namespace: ``_K`` is the table of tokens used in error messages
+    and ``_G`` is the namespace itself, where Lox globals live as ``g_*``.
+    """
+
+    def __init__(
+        self,
+        tokens: list[Token],
+        names: dict[str, str],
+        counter: Optional[Iterator[int]] = None,
+    ):
+        self.__tokens = tokens
+        self.__names = names
+        self.__counter = counter or count()
+        self.__lines: list[str] = []
+        self.__lineMap: list[int] = [0]
+        self.__indent = 0
+        self.__line = 1
+        self.__temporaries = 0
+        self.__bindings: dict[object, Optional[Binding]] = {}
+        self.__functions: dict[object, FunctionScope] = {}
+        self.__function: Optional[FunctionScope] = None
+        self.__isInitializer = False
+
+    def transpile(self, program: list[Stmt]) -> tuple[str, list[int]]:
+        """Return the Python source and a map from Python to Lox lines."""
+        analyzer = ScopeAnalyzer(self.__counter)
+        self.__function = analyzer.run(program)
+        self.__bindings = analyzer.bindings
+        self.__functions = analyzer.functions
+        last = program[-1] if program else None
+        for statement in program[:-1]:
+            statement.accept(self)
+        if isinstance(last, stmt.Expression):
+            self.__emit(f"_result = {self.__expression(last.expression)}")
+        else:
+            if last is not None:
+                last.accept(self)
+            self.__emit("_result = None")
+        return "\n".join(self.__lines) + "\n", self.__lineMap
+
+    def __emit(self, line: str):
+        self.__lines.append("    " * self.__indent + line)
+        self.__lineMap.append(self.__line)
+
+    def __emitBody(self, statements: list[Stmt]):
+        self.__indent += 1
+        start = len(self.__lines)
+        for statement in statements:
+            statement.accept(self)
+        if len(self.__lines) == start:
+            self.__emit("pass")
+        self.__indent -= 1
+
+    def __expression(self, expression: expr.Expr) -> str:
+        return expression.accept(self)
+
+    def __temporary(self) -> str:
+        self.__temporaries += 1
+        return f"_t{self.__temporaries}"
+
+    def __token(self, token: Token) -> str:
+        self.__line = token.line
+        self.__tokens.append(token)
+        return f"_K[{len(self.__tokens) - 1}]"
+
+    def __condition(self, expression: expr.Expr) -> str:
+        """Python text for the Lox truthiness of ``expression``."""
+        if isBoolean(expression):
+            return self.__expression(expression)
+        temporary = self.__temporary()
+        code = self.__expression(expression)
+        return f"(({temporary} := {code}) is not None and {temporary} is not False)"
+
+    def __read(self, key: object, name: Token) -> str:
+        self.__line = name.line
+        binding = self.__bindings.get(key)
+        if binding is None:
+            return "g_" + mangle(name.lexeme)
+        if binding.boxed:
+            return f"{binding.pyName}[0]"
+        return binding.pyName
+
+    def __declaredName(self, key: object, name: Token) -> str:
+        binding = self.__bindings.get(key)
+        if binding is None:
+            return "g_" + mangle(name.lexeme)
+        return binding.pyName
+
+    def __define(self, key: object, name: Token, value: str):
+        """Emit the definition of a new variable holding ``value``."""
+        binding = self.__bindings.get(key)
+        pyName = self.__declaredName(key, name)
+        if binding is not None and binding.boxed:
+            self.__emit(f"{pyName} = [{value}]")
+        else:
+            self.__emit(f"{pyName} = {value}")
+
+    def __emitFunction(self, function: stmt.Function, defName: str, method: bool):
+        scope = self.__functions[function]
+        self.__names[defName] = function.name.lexeme
+        params = [self.__declaredName(param, param) for param in function.params]
+        if method:
+            params.insert(0, "this")
+        if scope.freeBoxes:
+            params.append("*")
+            params.extend(f"{b.pyName}={b.pyName}" for b in scope.freeBoxes)
+        self.__line = function.name.line
+        self.__emit(f"def {defName}({', '.join(params)}):")
+        enclosing = (self.__function, self.__temporaries, self.__isInitializer)
+        self.__function = scope
+        self.__temporaries = 0
+        self.__isInitializer = method and function.name.lexeme == "init"
+        self.__indent += 1
+        if scope.globals:
+            self.__emit(f"global {', '.join(scope.globals)}")
+        if scope.nonlocals:
+            self.__emit(f"nonlocal {', '.join(scope.nonlocals)}")
+        self.__indent -= 1
+        self.__emitBody(function.body)
+        self.__function, self.__temporaries, self.__isInitializer = enclosing
+
+    def visit_assign_expr(self, expr: expr.Assign) -> str:
+        value = self.__expression(expr.value)
+        binding = self.__bindings.get(expr)
+        if binding is None:
+            pyName = "g_" + mangle(expr.name.lexeme)
+            temporary = self.__temporary()
+            token = self.__token(expr.name)
+            return (
+                f"(({pyName} := {temporary}) "
+                f"if (({temporary} := {value}), '{pyName}' in _G)[1] "
+                f"else _undefinedVariable({token}))"
+            )
+        if binding.boxed:
+            return f"_assignBox({binding.pyName}, {value})"
+        return f"({binding.pyName} := {value})"
+
+    def visit_binary_expr(self, expr: expr.Binary) -> str:
+        tokenType = expr.operator.tokenType
+        if tokenType in (TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL):
+            op = "==" if tokenType == TokenType.EQUAL_EQUAL else "!="
+            left = self.__expression(expr.left)
+            right = self.__expression(expr.right)
+            return f"({left} {op} {right})"
+        op, helper = ARITHMETIC[tokenType]
+        leftCode, leftFloat = self.__operand(expr.left)
+        rightCode, rightFloat = self.__operand(expr.right)
+        checks = []
+        if not leftFloat:
+            left = self.__temporary()
+            checks.append(f"(type({left} := {leftCode}) is float)")
+        else:
+            left = leftCode
+        if not rightFloat:
+            right = self.__temporary()
+            checks.append(f"(type({right} := {rightCode}) is float)")
+        else:
+            right = rightCode
+        token = self.__token(expr.operator)
+        if tokenType == TokenType.SLASH and rightFloat and float(rightCode) == 0:
+            return f"{helper}({token}, {leftCode}, {rightCode})"
+        fallback = f"{helper}({token}, {left}, {right})"
+        if tokenType == TokenType.SLASH:
+            checks.append(f"({right} != 0.0)")
+        if not checks:
+            return f"({left} {op} {right})"
+        return f"({left} {op} {right} if {' & '.join(checks)} else {fallback})"
+
+    def __operand(self, expression: expr.Expr) -> tuple[str, bool]:
+        """Python text for an operand and whether it is a float literal."""
+        while isinstance(expression, Grouping):
+            expression = expression.expression
+        if isinstance(expression, Literal):
+            value = asFloat(expression.value)
+            if type(value) is float:
+                return repr(value), True
+        return self.__expression(expression), False
+
+    def visit_call_expr(self, expr: expr.Call) -> str:
+        callee = expr.callee
+        arity = len(expr.arguments)
+        function = self.__temporary()
+        if isinstance(callee, Super):
+            superclass = self.__read(callee, callee.keyword)
+            attribute = "p_" + mangle(callee.method.lexeme)
+            arguments = ["this"] + [self.__expression(a) for a in expr.arguments]
+            token = self.__token(expr.paren)
+            methodToken = self.__token(callee.method)
+            return (
+                f"({function}({', '.join(arguments)}) "
+                f"if ({function} := _superMethod({methodToken}, {superclass}, "
+                f"'{attribute}')).__code__.co_argcount == {arity + 1} "
+                f"else _call({token}, _MethodType({function}, this), "
+                f"{', '.join(arguments[1:])}))"
+            )
+        if isinstance(callee, Get):
+            calleeCode = self.__property(callee)
+        else:
+            calleeCode = self.__expression(callee)
+        arguments = [self.__expression(argument) for argument in expr.arguments]
+        token = self.__token(expr.paren)
+        if isinstance(callee, Get):
+            check = (
+                f"type({function} := {calleeCode}) is _MethodType "
+                f"and {function}.__func__.__code__.co_argcount == {arity + 1}"
+            )
+        else:
+            check = (
+                f"type({function} := {calleeCode}) is _Function "
+                f"and {function}.__code__.co_argcount == {arity}"
+            )
+        return (
+            f"({function}({', '.join(arguments)}) if {check} "
+            f"else _call({token}, {', '.join([function] + arguments)}))"
+        )
+
+    def visit_comma_expr(self, expr: expr.Comma) -> str:
+        expressions = [self.__expression(e) for e in expr.expressions]
+        return f"({', '.join(expressions)})[-1]"
+
+    def visit_get_expr(self, expr: expr.Get) -> str:
+        # A method read as a value is wrapped, as Python's bound methods of the
+        # same function and receiver are equal and Lox's are not.
+        value = self.__property(expr)
+        temporary = self.__temporary()
+        return (
+            f"(_Method({temporary}.__func__, {temporary}.__self__) "
+            f"if type({temporary} := {value}) is _MethodType else {temporary})"
+        )
+
+    def __property(self, expr: expr.Get) -> str:
+        """The property `expr` reads, a Python bound method if it is one."""
+        attribute = "p_" + mangle(expr.name.lexeme)
+        if isinstance(expr.obj, This):
+            self.__line = expr.name.line
+            return f"this.{attribute}"
+        obj = self.__expression(expr.obj)
+        temporary = self.__temporary()
+        token = self.__token(expr.name)
+        return (
+            f"({temporary}.{attribute} if isinstance({temporary} := {obj}, _Instance) "
+            f"else _notAnInstance({token}, 'properties'))"
+        )
+
+    def visit_grouping_expr(self, expr: expr.Grouping) -> str:
+        return self.__expression(expr.expression)
+
+    def visit_literal_expr(self, expr: expr.Literal) -> str:
+        return repr(asFloat(expr.value))
+
+    def visit_logical_expr(self, expr: expr.Logical) -> str:
+        left = self.__expression(expr.left)
+        right = self.__expression(expr.right)
+        if isBoolean(expr.left):
+            op = "or" if expr.operator.tokenType == TokenType.OR else "and"
+            return f"({left} {op} {right})"
+        temporary = self.__temporary()
+        truthy = f"({temporary} := {left}) is not None and {temporary} is not False"
+        if expr.operator.tokenType == TokenType.OR:
+            return f"({temporary} if {truthy} else {right})"
+        return f"({right} if {truthy} else {temporary})"
+
+    def visit_set_expr(self, expr: expr.Set) -> str:
+        obj = self.__expression(expr.obj)
+        value = self.__expression(expr.value)
+        attribute = "p_" + mangle(expr.name.lexeme)
+        token = self.__token(expr.name)
+        return f"_setProperty({token}, {obj}, '{attribute}', {value})"
+
+    def visit_super_expr(self, expr: expr.Super) -> str:
+        superclass = self.__read(expr, expr.keyword)
+        attribute = "p_" + mangle(expr.method.lexeme)
+        token = self.__token(expr.method)
+        return f"_Method(_superMethod({token}, {superclass}, '{attribute}'), this)"
+
+    def visit_this_expr(self, expr: expr.This) -> str:
+        self.__line = expr.keyword.line
+        return "this"
+
+    def visit_unary_expr(self, expr: expr.Unary) -> str:
+        if expr.operator.tokenType == TokenType.BANG:
+            if isBoolean(expr.right):
+                return f"(not {self.__expression(expr.right)})"
+            temporary = self.__temporary()
+            right = self.__expression(expr.right)
+            return f"(({temporary} := {right}) is None or {temporary} is False)"
+        right = self.__expression(expr.right)
+        temporary = self.__temporary()
+        token = self.__token(expr.operator)
+        return (
+            f"(-{temporary} if type({temporary} := {right}) is float "
+            f"else _negate({token}, {temporary}))"
+        )
+
+    def visit_variable_expr(self, expr: expr.Variable) -> str:
+        return self.__read(expr, expr.name)
+
+    def visit_block_stmt(self, stmt: stmt.Block):
+        for statement in stmt.statements:
+            statement.accept(self)
+
+    def visit_class_stmt(self, stmt: stmt.Class):
+        assert self.__function is not None
+        binding = self.__bindings.get(stmt)
+        className = self.__declaredName(stmt, stmt.name)
+        if binding is not None and binding.boxed:
+            self.__emit(f"{className} = [None]")
+            defName = f"c_{mangle(stmt.name.lexeme)}_{next(self.__counter)}"
+        else:
+            defName = className
+        base = "_Instance"
+        if stmt.superclass is not None:
+            superclass = self.__expression(stmt.superclass)
+            token = self.__token(stmt.superclass.name)
+            self.__define(
+                superKey(stmt), stmt.name, f"_superclass({token}, {superclass})"
+            )
+            base = self.__read(superKey(stmt), stmt.name)
+        self.__line = stmt.name.line
+        self.__emit(f"class {defName}({base}):")
+        self.__indent += 1
+        self.__emit(f"_loxName = {stmt.name.lexeme!r}")
+        for method in stmt.methods:
+            self.__emitFunction(method, "p_" + mangle(method.name.lexeme), True)
+        self.__indent -= 1
+        if binding is not None and binding.boxed:
+            self.__emit(f"{className}[0] = {defName}")
+
+    def visit_expression_stmt(self, stmt: stmt.Expression):
+        expression = stmt.expression
+        while isinstance(expression, Grouping):
+            expression = expression.expression
+        if isinstance(expression, Set) and isinstance(expression.obj, This):
+            attribute = "p_" + mangle(expression.name.lexeme)
+            value = self.__expression(expression.value)
+            self.__emit(f"this.{attribute} = {value}")
+            return
+        if isinstance(expression, Assign):
+            binding = self.__bindings.get(expression)
+            if binding is not None:
+                value = self.__expression(expression.value)
+                self.__emit(f"{self.__read(expression, expression.name)} = {value}")
+                return
+        self.__emit(self.__expression(stmt.expression))
+
+    def visit_function_stmt(self, stmt: stmt.Function):
+        binding = self.__bindings.get(stmt)
+        pyName = self.__declaredName(stmt, stmt.name)
+        if binding is not None and binding.boxed:
+            self.__emit(f"{pyName} = [None]")
+            defName = f"f_{mangle(stmt.name.lexeme)}_{next(self.__counter)}"
+            self.__emitFunction(stmt, defName, False)
+            self.__emit(f"{pyName}[0] = {defName}")
+            return
+        self.__emitFunction(stmt, pyName, False)
+
+    def visit_if_stmt(self, stmt: stmt.If):
+        self.__emit(f"if {self.__condition(stmt.condition)}:")
+        self.__emitBody([stmt.thenBranch])
+        if stmt.elseBranch is not None:
+            self.__emit("else:")
+            self.__emitBody([stmt.elseBranch])
+
+    def visit_print_stmt(self, stmt: stmt.Print):
+        self.__emit(f"print(_stringify({self.__expression(stmt.expression)}))")
+
+    def visit_return_stmt(self, stmt: stmt.Return):
+        self.__line = stmt.keyword.line
+        if stmt.value is not None:
+            self.__emit(f"return {self.__expression(stmt.value)}")
+        elif self.__isInitializer:
+            self.__emit("return this")
+        else:
+            self.__emit("return None")
+
+    def visit_var_stmt(self, stmt: stmt.Var):
+        self.__line = stmt.name.line
+        value = "None"
+        if stmt.initializer is not None:
+            value = self.__expression(stmt.initializer)
+        self.__define(stmt, stmt.name, value)
+
+    def visit_while_stmt(self, stmt: stmt.While):
+        self.__emit(f"while {self.__condition(stmt.condition)}:")
+        self.__emitBody([stmt.body])
+
+
+def isBoolean(expression: expr.Expr) -> bool:
+    """Whether ``expression`` always evaluates to a Python bool."""
+    while isinstance(expression, Grouping):
+        expression = expression.expression
+    if isinstance(expression, Binary):
+        return expression.operator.tokenType in BOOLEAN_OPERATORS
+    if isinstance(expression, Unary):
+        return expression.operator.tokenType == TokenType.BANG
+    if isinstance(expression, Logical):
+        return isBoolean(expression.left) and isBoolean(expression.right)
+    if isinstance(expression, Literal):
+        return type(expression.value) is bool
+    return False
@@ -0,0 +1,39 @@
+import math
+from typing import Any
+from scanner.token import Token
+
+
+class Chunk:
+    """A compiled unit of bytecode.
+
+    ``code`` holds opcodes and their inline operands. ``tokens`` runs parallel
+    to ``code`` and records the source token each byte was emitted for, so the
+    VM can report runtime errors with the same token the tree-walker uses.
+    """
+
+    def __init__(self):
+        self.code: list[int] = []
+        self.tokens: list[Token] = []
+        self.constants: list[Any] = []
+        self.__constantIndex: dict[tuple[type, Any], int] = {}
+
+    def write(self, byte: int, token: Token) -> int:
+        self.code.append(int(byte))
+        self.tokens.append(token)
+        return len(self.code) - 1
+
+    def addConstant(self, value: Any) -> int:
+        key = (type(value), value)
+        if isinstance(value, float):
+            # 0.0 and -0.0 are equal but print differently.
+            key += (math.copysign(1.0, value),)
+        index = self.__constantIndex.get(key)
+        if index is None:
+            index = len(self.constants)
+            self.constants.append(value)
+            self.__constantIndex[key] = index
+        return index
+
+    def addObject(self, value: Any) -> int:
+        self.constants.append(value)
+        return len(self.constants) - 1
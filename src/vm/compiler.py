@@ -0,0 +1,383 @@
+from typing import Any, Optional
+from parser.expr import ExprVisitor
+from parser.stmt import StmtVisitor
+import parser.expr as expr
+import parser.stmt as stmt
+from parser.expr import Get, Super
+from parser.stmt import Stmt
+from resolver.functionType import FunctionType
+from scanner.token import Token
+from scanner.tokenType import TokenType
+from vm.opCode import OpCode
+from vm.objects import ObjFunction
+from runtime.number import asFloat
+
+
+class Local:
+    def __init__(self, name: str, depth: int):
+        self.name = name
+        self.depth = depth
+        self.isCaptured = False
+
+
+class FunctionState:
+    def __init__(
+        self,
+        enclosing: Optional["FunctionState"],
+        function: ObjFunction,
+        type: FunctionType,
+    ):
+        self.enclosing = enclosing
+        self.function = function
+        self.type = type
+        self.scopeDepth = 0
+        self.upvalues: list[tuple[bool, int]] = []
+        # Slot zero holds the callee, or the receiver when compiling a method.
+        isMethod = type in (FunctionType.METHOD, FunctionType.INITIALIZER)
+        self.locals: list[Local] = [Local("this" if isMethod else "", 0)]
+
+
+class Compiler(ExprVisitor, StmtVisitor):
+    """Compiles a resolved program into bytecode for the VM.
+
+    The resolver has already rejected invalid programs, so the compiler only
+    has to map every variable to a stack slot, an upvalue or a global name.
+    """
+
+    def __init__(self):
+        self.__state: Optional[FunctionState] = None
+        self.__token: Optional[Token] = None
+
+    def compile(self, program: list[Stmt]) -> ObjFunction:
+        self.__state = FunctionState(None, ObjFunction("script"), FunctionType.NONE)
+        self.__token = Token(TokenType.EOF, "", None, 1)
+        # The value of a trailing expression statement is the program result,
+        # which the prompt prints.
+        last = program[-1] if program else None
+        for statement in program[:-1]:
+            self.__compileStatement(statement)
+        if isinstance(last, stmt.Expression):
+            self.__compileExpression(last.expression)
+            self.__emit(OpCode.RETURN)
+        else:
+            if last is not None:
+                self.__compileStatement(last)
+            self.__emitReturn()
+        return self.__state.function
+
+    @property
+    def __chunk(self):
+        assert self.__state is not None
+        return self.__state.function.chunk
+
+    def __compileStatement(self, statement: Stmt):
+        statement.accept(self)
+
+    def __compileStatements(self, statements: list[Stmt]):
+        for statement in statements:
+            self.__compileStatement(statement)
+
+    def __compileExpression(self, expression: expr.Expr):
+        expression.accept(self)
+
+    def __emit(self, *bytes: int, token: Optional[Token] = None) -> int:
+        if token is not None:
+            self.__token = token
+        offset = len(self.__chunk.code)
+        for byte in bytes:
+            self.__chunk.write(byte, self.__token)
+        return offset
+
+    def __emitConstant(self, value: Any):
+        self.__emit(OpCode.CONSTANT, self.__chunk.addConstant(value))
+
+    def __emitJump(self, op: OpCode, token: Optional[Token] = None) -> int:
+        self.__emit(op, 0, token=token)
+        return len(self.__chunk.code) - 1
+
+    def __patchJump(self, offset: int):
+        self.__chunk.code[offset] = len(self.__chunk.code) - offset - 1
+
+    def __emitLoop(self, loopStart: int):
+        offset = len(self.__chunk.code) - loopStart + 2
+        self.__emit(OpCode.LOOP, offset)
+
+    def __emitReturn(self):
+        self.__emit(OpCode.NIL, OpCode.RETURN)
+
+    def __identifierConstant(self, name: Token) -> int:
+        return self.__chunk.addConstant(name.lexeme)
+
+    def __beginScope(self):
+        assert self.__state is not None
+        self.__state.scopeDepth += 1
+
+    def __endScope(self):
+        state = self.__state
+        assert state is not None
+        state.scopeDepth -= 1
+        while state.locals and state.locals[-1].depth > state.scopeDepth:
+            if state.locals[-1].isCaptured:
+                self.__emit(OpCode.CLOSE_UPVALUE)
+            else:
+                self.__emit(OpCode.POP)
+            state.locals.pop()
+
+    def __addLocal(self, name: str):
+        assert self.__state is not None
+        self.__state.locals.append(Local(name, self.__state.scopeDepth))
+
+    def __defineVariable(self, name: Token):
+        """Bind the value on top of the stack to ``name``."""
+        assert self.__state is not None
+        if self.__state.scopeDepth > 0:
+            self.__addLocal(name.lexeme)
+            return
+        self.__emit(OpCode.DEFINE_GLOBAL, self.__identifierConstant(name), token=name)
+
+    def __resolveLocal(self, state: FunctionState, name: str) -> int:
+        for idx in range(len(state.locals) - 1, -1, -1):
+            if state.locals[idx].name == name:
+                return idx
+        return -1
+
+    def __addUpvalue(self, state: FunctionState, index: int, isLocal: bool) -> int:
+        upvalue = (isLocal, index)
+        if upvalue in state.upvalues:
+            return state.upvalues.index(upvalue)
+        state.upvalues.append(upvalue)
+        state.function.upvalueCount = len(state.upvalues)
+        return len(state.upvalues) - 1
+
+    def __resolveUpvalue(self, state: FunctionState, name: str) -> int:
+        if state.enclosing is None:
+            return -1
+        local = self.__resolveLocal(state.enclosing, name)
+        if local != -1:
+            state.enclosing.locals[local].isCaptured = True
+            return self.__addUpvalue(state, local, True)
+        upvalue = self.__resolveUpvalue(state.enclosing, name)
+        if upvalue != -1:
+            return self.__addUpvalue(state, upvalue, False)
+        return -1
+
+    def __namedVariable(self, name: Token, assign: bool = False):
+        assert self.__state is not None
+        if (arg := self.__resolveLocal(self.__state, name.lexeme)) != -1:
+            op = OpCode.SET_LOCAL if assign else OpCode.GET_LOCAL
+        elif (arg := self.__resolveUpvalue(self.__state, name.lexeme)) != -1:
+            op = OpCode.SET_UPVALUE if assign else OpCode.GET_UPVALUE
+        else:
+            arg = self.__identifierConstant(name)
+            op = OpCode.SET_GLOBAL if assign else OpCode.GET_GLOBAL
+        self.__emit(op, arg, token=name)
+
+    def __function(self, function: stmt.Function, type: FunctionType):
+        state = FunctionState(
+            self.__state, ObjFunction(function.name.lexeme, len(function.params)), type
+        )
+        self.__state = state
+        self.__beginScope()
+        for param in function.params:
+            self.__addLocal(param.lexeme)
+        self.__compileStatements(function.body)
+        self.__emitReturn()
+        assert state.enclosing is not None
+        self.__state = state.enclosing
+        index = self.__chunk.addObject(state.function)
+        self.__emit(OpCode.CLOSURE, index, token=function.name)
+        for isLocal, upvalueIndex in state.upvalues:
+            self.__emit(1 if isLocal else 0, upvalueIndex)
+
+    def visit_assign_expr(self, expr: expr.Assign):
+        self.__compileExpression(expr.value)
+        self.__namedVariable(expr.name, assign=True)
+
+    def visit_binary_expr(self, expr: expr.Binary):
+        self.__compileExpression(expr.left)
+        self.__compileExpression(expr.right)
+        op = BINARY_OPCODES[expr.operator.tokenType]
+        self.__emit(op, token=expr.operator)
+
+    def visit_call_expr(self, expr: expr.Call):
+        callee = expr.callee
+        if isinstance(callee, Get):
+            self.__compileExpression(callee.obj)
+            self.__compileArguments(expr.arguments)
+            name = self.__identifierConstant(callee.name)
+            self.__emit(OpCode.INVOKE, name, token=callee.name)
+            self.__emit(len(expr.arguments), token=expr.paren)
+            return
+        if isinstance(callee, Super):
+            self.__namedVariable(Token(TokenType.THIS, "this", None, expr.paren.line))
+            self.__compileArguments(expr.arguments)
+            self.__namedVariable(callee.keyword)
+            name = self.__identifierConstant(callee.method)
+            self.__emit(OpCode.SUPER_INVOKE, name, token=callee.method)
+            self.__emit(len(expr.arguments), token=expr.paren)
+            return
+        self.__compileExpression(callee)
+        self.__compileArguments(expr.arguments)
+        self.__emit(OpCode.CALL, len(expr.arguments), token=expr.paren)
+
+    def __compileArguments(self, arguments: list[expr.Expr]):
+        for argument in arguments:
+            self.__compileExpression(argument)
+
+    def visit_comma_expr(self, expr: expr.Comma):
+        for expression in expr.expressions[:-1]:
+            self.__compileExpression(expression)
+            self.__emit(OpCode.POP)
+        self.__compileExpression(expr.expressions[-1])
+
+    def visit_get_expr(self, expr: expr.Get):
+        self.__compileExpression(expr.obj)
+        name = self.__identifierConstant(expr.name)
+        self.__emit(OpCode.GET_PROPERTY, name, token=expr.name)
+
+    def visit_grouping_expr(self, expr: expr.Grouping):
+        self.__compileExpression(expr.expression)
+
+    def visit_literal_expr(self, expr: expr.Literal):
+        if expr.value is None:
+            self.__emit(OpCode.NIL)
+        elif expr.value is True:
+            self.__emit(OpCode.TRUE)
+        elif expr.value is False:
+            self.__emit(OpCode.FALSE)
+        else:
+            self.__emitConstant(asFloat(expr.value))
+
+    def visit_logical_expr(self, expr: expr.Logical):
+        self.__compileExpression(expr.left)
+        if expr.operator.tokenType == TokenType.OR:
+            jump = self.__emitJump(OpCode.JUMP_IF_TRUE, token=expr.operator)
+        else:
+            jump = self.__emitJump(OpCode.JUMP_IF_FALSE, token=expr.operator)
+        self.__emit(OpCode.POP)
+        self.__compileExpression(expr.right)
+        self.__patchJump(jump)
+
+    def visit_set_expr(self, expr: expr.Set):
+        self.__compileExpression(expr.obj)
+        self.__compileExpression(expr.value)
+        name = self.__identifierConstant(expr.name)
+        self.__emit(OpCode.SET_PROPERTY, name, token=expr.name)
+
+    def visit_super_expr(self, expr: expr.Super):
+        self.__namedVariable(Token(TokenType.THIS, "this", None, expr.keyword.line))
+        self.__namedVariable(expr.keyword)
+        name = self.__identifierConstant(expr.method)
+        self.__emit(OpCode.GET_SUPER, name, token=expr.method)
+
+    def visit_this_expr(self, expr: expr.This):
+        self.__namedVariable(expr.keyword)
+
+    def visit_unary_expr(self, expr: expr.Unary):
+        self.__compileExpression(expr.right)
+        if expr.operator.tokenType == TokenType.MINUS:
+            self.__emit(OpCode.NEGATE, token=expr.operator)
+        else:
+            self.__emit(OpCode.NOT, token=expr.operator)
+
+    def visit_variable_expr(self, expr: expr.Variable):
+        self.__namedVariable(expr.name)
+
+    def visit_block_stmt(self, stmt: stmt.Block):
+        self.__beginScope()
+        self.__compileStatements(stmt.statements)
+        self.__endScope()
+
+    def visit_class_stmt(self, stmt: stmt.Class):
+        assert self.__state is not None
+        name = self.__identifierConstant(stmt.name)
+        self.__emit(OpCode.CLASS, name, token=stmt.name)
+        self.__defineVariable(stmt.name)
+        if stmt.superclass is not None:
+            self.__namedVariable(stmt.superclass.name)
+            self.__beginScope()
+            self.__addLocal("super")
+            self.__namedVariable(stmt.name)
+            self.__emit(OpCode.INHERIT, token=stmt.superclass.name)
+        self.__namedVariable(stmt.name)
+        for method in stmt.methods:
+            type = FunctionType.METHOD
+            if method.name.lexeme == "init":
+                type = FunctionType.INITIALIZER
+            self.__function(method, type)
+            self.__emit(OpCode.METHOD, self.__identifierConstant(method.name))
+        self.__emit(OpCode.POP)
+        if stmt.superclass is not None:
+            self.__endScope()
+
+    def visit_expression_stmt(self, stmt: stmt.Expression):
+        self.__compileExpression(stmt.expression)
+        self.__emit(OpCode.POP)
+
+    def visit_function_stmt(self, stmt: stmt.Function):
+        assert self.__state is not None
+        if self.__state.scopeDepth > 0:
+            # Declare the local before compiling the body so the function can
+            # refer to itself recursively.
+            self.__addLocal(stmt.name.lexeme)
+            self.__function(stmt, FunctionType.FUNCTION)
+            return
+        self.__function(stmt, FunctionType.FUNCTION)
+        self.__defineVariable(stmt.name)
+
+    def visit_if_stmt(self, stmt: stmt.If):
+        self.__compileExpression(stmt.condition)
+        thenJump = self.__emitJump(OpCode.POP_JUMP_IF_FALSE)
+        self.__compileStatement(stmt.thenBranch)
+        if stmt.elseBranch is None:
+            self.__patchJump(thenJump)
+            return
+        elseJump = self.__emitJump(OpCode.JUMP)
+        self.__patchJump(thenJump)
+        self.__compileStatement(stmt.elseBranch)
+        self.__patchJump(elseJump)
+
+    def visit_print_stmt(self, stmt: stmt.Print):
+        self.__compileExpression(stmt.expression)
+        self.__emit(OpCode.PRINT)
+
+    def visit_return_stmt(self, stmt: stmt.Return):
+        assert self.__state is not None
+        self.__token = stmt.keyword
+        if stmt.value is not None:
+            self.__compileExpression(stmt.value)
+            self.__emit(OpCode.RETURN)
+        elif self.__state.type == FunctionType.INITIALIZER:
+            self.__emit(OpCode.GET_LOCAL, 0, OpCode.RETURN)
+        else:
+            self.__emitReturn()
+
+    def visit_var_stmt(self, stmt: stmt.Var):
+        self.__token = stmt.name
+        if stmt.initializer is not None:
+            self.__compileExpression(stmt.initializer)
+        else:
+            self.__emit(OpCode.NIL)
+        self.__defineVariable(stmt.name)
+
+    def visit_while_stmt(self, stmt: stmt.While):
+        loopStart = len(self.__chunk.code)
+        self.__compileExpression(stmt.condition)
+        exitJump = self.__emitJump(OpCode.POP_JUMP_IF_FALSE)
+        self.__compileStatement(stmt.body)
+        self.__emitLoop(loopStart)
+        self.__patchJump(exitJump)
+
+
+BINARY_OPCODES = {
+    TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+    TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+    TokenType.GREATER: OpCode.GREATER,
+    TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+    TokenType.LESS: OpCode.LESS,
+    TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+    TokenType.MINUS: OpCode.SUBTRACT,
+    TokenType.PLUS: OpCode.ADD,
+    TokenType.SLASH: OpCode.DIVIDE,
+    TokenType.STAR: OpCode.MULTIPLY,
+}
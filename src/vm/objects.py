@@ -0,0 +1,83 @@
+from typing import Any, Optional
+from vm.chunk import Chunk
+
+
+class ObjFunction:
+    def __init__(self, name: str, arity: int = 0):
+        self.name = name
+        self.arity = arity
+        self.upvalueCount = 0
+        self.chunk = Chunk()
+
+    def __str__(self) -> str:
+        return f"< fn {self.name} >"
+
+
+class ObjUpvalue:
+    """A captured variable.
+
+    While the variable is still on the VM stack the upvalue is *open* and
+    ``index`` points at its stack slot. Once the slot goes away the value is
+    moved into ``value`` and the upvalue becomes *closed*.
+    """
+
+    __slots__ = ("index", "value", "isOpen")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.value: Any = None
+        self.isOpen = True
+
+
+class ObjClosure:
+    __slots__ = ("function", "upvalues")
+
+    def __init__(self, function: ObjFunction, upvalues: list[ObjUpvalue]):
+        self.function = function
+        self.upvalues = upvalues
+
+    def __str__(self) -> str:
+        return str(self.function)
+
+
+class ObjClass:
+    def __init__(self, name: str):
+        self.name = name
+        self.methods: dict[str, ObjClosure] = {}
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class ObjInstance:
+    __slots__ = ("klass", "fields")
+
+    def __init__(self, klass: ObjClass):
+        self.klass = klass
+        self.fields: dict[str, Any] = {}
+
+    def __str__(self) -> str:
+        return self.klass.name + " instance"
+
+
+class ObjBoundMethod:
+    __slots__ = ("receiver", "method")
+
+    def __init__(self, receiver: Any, method: ObjClosure):
+        self.receiver = receiver
+        self.method = method
+
+    def __str__(self) -> str:
+        return str(self.method)
+
+
+class CallFrame:
+    __slots__ = ("closure", "ip", "base", "construct")
+
+    def __init__(
+        self, closure: ObjClosure, base: int, construct: Optional[bool] = False
+    ):
+        self.closure = closure
+        self.ip = 0
+        self.base = base
+        self.construct = construct
@@ -0,0 +1,55 @@
+from enum import IntEnum, auto
+
+
+class OpCode(IntEnum):
+    # Constants and stack manipulation
+    CONSTANT = auto()
+    NIL = auto()
+    TRUE = auto()
+    FALSE = auto()
+    POP = auto()
+    # Variables
+    GET_LOCAL = auto()
+    SET_LOCAL = auto()
+    GET_GLOBAL = auto()
+    DEFINE_GLOBAL = auto()
+    SET_GLOBAL = auto()
+    GET_UPVALUE = auto()
+    SET_UPVALUE = auto()
+    # Properties
+    GET_PROPERTY = auto()
+    SET_PROPERTY = auto()
+    GET_SUPER = auto()
+    # Operators
+    EQUAL = auto()
+    NOT_EQUAL = auto()
+    GREATER = auto()
+    GREATER_EQUAL = auto()
+    LESS = auto()
+    LESS_EQUAL = auto()
+    ADD = auto()
+    SUBTRACT = auto()
+    MULTIPLY = auto()
+    DIVIDE = auto()
+    NOT = auto()
+    NEGATE = auto()
+    # Statements and control flow
+    PRINT = auto()
+    JUMP = auto()
+    JUMP_IF_FALSE = auto()
+    JUMP_IF_TRUE = auto()
+    POP_JUMP_IF_FALSE = auto()
+    LOOP = auto()
+    # Functions and classes
+    CALL = auto()
+    INVOKE = auto()
+    SUPER_INVOKE = auto()
+    CLOSURE = auto()
+    CLOSE_UPVALUE = auto()
+    RETURN = auto()
+    CLASS = auto()
+    INHERIT = auto()
+    METHOD = auto()
+
+    def __repr__(self) -> str:
+        return self.name
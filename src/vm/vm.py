@@ -0,0 +1,458 @@
+from typing import Any
+from parser.stmt import Stmt
+from runtime.interpreter import checkNumberOperands, isEqual, overloadedPlus
+from runtime.interpreter import stringify
+from runtime.native.natives import functions as NATIVE_FUNCTIONS
+from runtime.ploxCallable import PloxCallable
+from runtime.ploxRuntimeError import PloxRuntimeError
+from vm.compiler import Compiler
+from vm.objects import (
+    CallFrame,
+    ObjBoundMethod,
+    ObjClass,
+    ObjClosure,
+    ObjFunction,
+    ObjInstance,
+    ObjUpvalue,
+)
+from vm.opCode import OpCode
+
+# The dispatch loop compares against plain ints, which is noticeably cheaper
+# than going through the enum on every instruction.
+CONSTANT = OpCode.CONSTANT.value
+NIL = OpCode.NIL.value
+TRUE = OpCode.TRUE.value
+FALSE = OpCode.FALSE.value
+POP = OpCode.POP.value
+GET_LOCAL = OpCode.GET_LOCAL.value
+SET_LOCAL = OpCode.SET_LOCAL.value
+GET_GLOBAL = OpCode.GET_GLOBAL.value
+DEFINE_GLOBAL = OpCode.DEFINE_GLOBAL.value
+SET_GLOBAL = OpCode.SET_GLOBAL.value
+GET_UPVALUE = OpCode.GET_UPVALUE.value
+SET_UPVALUE = OpCode.SET_UPVALUE.value
+GET_PROPERTY = OpCode.GET_PROPERTY.value
+SET_PROPERTY = OpCode.SET_PROPERTY.value
+GET_SUPER = OpCode.GET_SUPER.value
+EQUAL = OpCode.EQUAL.value
+NOT_EQUAL = OpCode.NOT_EQUAL.value
+GREATER = OpCode.GREATER.value
+GREATER_EQUAL = OpCode.GREATER_EQUAL.value
+LESS = OpCode.LESS.value
+LESS_EQUAL = OpCode.LESS_EQUAL.value
+ADD = OpCode.ADD.value
+SUBTRACT = OpCode.SUBTRACT.value
+MULTIPLY = OpCode.MULTIPLY.value
+DIVIDE = OpCode.DIVIDE.value
+NOT = OpCode.NOT.value
+NEGATE = OpCode.NEGATE.value
+PRINT = OpCode.PRINT.value
+JUMP = OpCode.JUMP.value
+JUMP_IF_FALSE = OpCode.JUMP_IF_FALSE.value
+JUMP_IF_TRUE = OpCode.JUMP_IF_TRUE.value
+POP_JUMP_IF_FALSE = OpCode.POP_JUMP_IF_FALSE.value
+LOOP = OpCode.LOOP.value
+CALL = OpCode.CALL.value
+INVOKE = OpCode.INVOKE.value
+SUPER_INVOKE = OpCode.SUPER_INVOKE.value
+CLOSURE = OpCode.CLOSURE.value
+CLOSE_UPVALUE = OpCode.CLOSE_UPVALUE.value
+RETURN = OpCode.RETURN.value
+CLASS = OpCode.CLASS.value
+INHERIT = OpCode.INHERIT.value
+METHOD = OpCode.METHOD.value
+
+# The default limit on the number of nested Lox calls, which only costs memory.
+MAX_DEPTH = 100_000
+
+
+class VM:
+    """A stack based virtual machine executing the bytecode built by `Compiler`.
+
+    Lox calls push a `CallFrame` onto an explicit frame stack instead of
+    recursing in Python, so a call costs a handful of list operations and the
+    depth of a Lox recursion is only limited by `maxDepth`.
+    """
+
+    def __init__(self, runtime, maxDepth: int = MAX_DEPTH):
+        self.__runtime = runtime
+        self.__maxDepth = maxDepth
+        self.__result = None
+        self.__globals: dict[str, Any] = dict(NATIVE_FUNCTIONS)
+        self.__stack: list[Any] = []
+        self.__frames: list[CallFrame] = []
+        self.__openUpvalues: list[ObjUpvalue] = []
+
+    @property
+    def result(self) -> Any:
+        return self.__result
+
+    def run(self, program: list[Stmt]):
+        function = Compiler().compile(program)
+        closure = ObjClosure(function, [])
+        self.__stack = [closure]
+        self.__frames = [CallFrame(closure, 0)]
+        self.__openUpvalues = []
+        try:
+            self.__result = self.__run()
+        except PloxRuntimeError as error:
+            self.__stack = []
+            self.__frames = []
+            self.__openUpvalues = []
+            self.__runtime.reportError(error)
+
+    def __captureUpvalue(self, index: int) -> ObjUpvalue:
+        openUpvalues = self.__openUpvalues
+        position = len(openUpvalues)
+        while position > 0 and openUpvalues[position - 1].index > index:
+            position -= 1
+        if position > 0 and openUpvalues[position - 1].index == index:
+            return openUpvalues[position - 1]
+        upvalue = ObjUpvalue(index)
+        openUpvalues.insert(position, upvalue)
+        return upvalue
+
+    def __closeUpvalues(self, last: int):
+        openUpvalues = self.__openUpvalues
+        stack = self.__stack
+        while openUpvalues and openUpvalues[-1].index >= last:
+            upvalue = openUpvalues.pop()
+            upvalue.value = stack[upvalue.index]
+            upvalue.isOpen = False
+
+    def __run(self) -> Any:
+        stack = self.__stack
+        frames = self.__frames
+        globals = self.__globals
+        push = stack.append
+        pop = stack.pop
+        maxDepth = self.__maxDepth
+
+        frame = frames[-1]
+        closure = frame.closure
+        chunk = closure.function.chunk
+        code = chunk.code
+        constants = chunk.constants
+        tokens = chunk.tokens
+        base = frame.base
+        ip = frame.ip
+
+        while True:
+            op = code[ip]
+            ip += 1
+            if op == GET_LOCAL:
+                push(stack[base + code[ip]])
+                ip += 1
+            elif op == CONSTANT:
+                push(constants[code[ip]])
+                ip += 1
+            elif op == SET_LOCAL:
+                stack[base + code[ip]] = stack[-1]
+                ip += 1
+            elif op == POP_JUMP_IF_FALSE:
+                value = pop()
+                if value is None or value is False:
+                    ip += code[ip] + 1
+                else:
+                    ip += 1
+            elif op == GET_GLOBAL:
+                name = constants[code[ip]]
+                try:
+                    push(globals[name])
+                except KeyError:
+                    raise PloxRuntimeError(tokens[ip], f"Undefined variable '{name}'.")
+                ip += 1
+            elif op == LESS:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left < right
+                else:
+                    checkNumberOperands(tokens[ip - 1], left, right)
+                    stack[-1] = float(left) < float(right)
+            elif op == ADD:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left + right
+                else:
+                    stack[-1] = overloadedPlus(tokens[ip - 1], left, right)
+            elif op == SUBTRACT:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left - right
+                else:
+                    checkNumberOperands(tokens[ip - 1], left, right)
+                    stack[-1] = float(left) - float(right)
+            elif op == POP:
+                pop()
+            elif op == LOOP:
+                ip -= code[ip] - 1
+            elif op == GET_UPVALUE:
+                upvalue = closure.upvalues[code[ip]]
+                if upvalue.isOpen:
+                    push(stack[upvalue.index])
+                else:
+                    push(upvalue.value)
+                ip += 1
+            elif op == SET_UPVALUE:
+                upvalue = closure.upvalues[code[ip]]
+                if upvalue.isOpen:
+                    stack[upvalue.index] = stack[-1]
+                else:
+                    upvalue.value = stack[-1]
+                ip += 1
+            elif op == CALL or op == INVOKE or op == SUPER_INVOKE:
+                if op == CALL:
+                    argCount = code[ip]
+                    ip += 1
+                    callee = stack[-1 - argCount]
+                elif op == INVOKE:
+                    name = constants[code[ip]]
+                    argCount = code[ip + 1]
+                    ip += 2
+                    receiver = stack[-1 - argCount]
+                    if not isinstance(receiver, ObjInstance):
+                        raise PloxRuntimeError(
+                            tokens[ip - 2], "Only instances have properties."
+                        )
+                    if name in receiver.fields:
+                        callee = receiver.fields[name]
+                        stack[-1 - argCount] = callee
+                    else:
+                        callee = receiver.klass.methods.get(name)
+                        if callee is None:
+                            raise PloxRuntimeError(
+                                tokens[ip - 2], f"Undefined property {name}."
+                            )
+                else:
+                    name = constants[code[ip]]
+                    argCount = code[ip + 1]
+                    ip += 2
+                    superclass = pop()
+                    callee = superclass.methods.get(name)
+                    if callee is None:
+                        raise PloxRuntimeError(
+                            tokens[ip - 2], f"Undefined property {name}."
+                        )
+                construct = False
+                if type(callee) is ObjBoundMethod:
+                    stack[-1 - argCount] = callee.receiver
+                    callee = callee.method
+                elif type(callee) is ObjClass:
+                    stack[-1 - argCount] = ObjInstance(callee)
+                    initializer = callee.methods.get("init")
+                    if initializer is None:
+                        if argCount != 0:
+                            raise PloxRuntimeError(
+                                tokens[ip - 1],
+                                f"Expected 0 arguments but got {argCount}.",
+                            )
+                        continue
+                    callee = initializer
+                    construct = True
+                if type(callee) is ObjClosure:
+                    function = callee.function
+                    if argCount != function.arity:
+                        raise PloxRuntimeError(
+                            tokens[ip - 1],
+                            f"Expected {function.arity} arguments "
+                            f"but got {argCount}.",
+                        )
+                    if len(frames) == maxDepth:
+                        raise PloxRuntimeError(tokens[ip - 1], "Stack overflow.")
+                    frame.ip = ip
+                    frame = CallFrame(callee, len(stack) - argCount - 1, construct)
+                    frames.append(frame)
+                    closure = callee
+                    chunk = function.chunk
+                    code = chunk.code
+                    constants = chunk.constants
+                    tokens = chunk.tokens
+                    base = frame.base
+                    ip = 0
+                elif isinstance(callee, PloxCallable):
+                    if argCount != callee.arity():
+                        raise PloxRuntimeError(
+                            tokens[ip - 1],
+                            f"Expected {callee.arity()} arguments "
+                            f"but got {argCount}.",
+                        )
+                    arguments = stack[len(stack) - argCount :]
+                    del stack[len(stack) - argCount - 1 :]
+                    push(callee.call(self, arguments))
+                else:
+                    raise PloxRuntimeError(
+                        tokens[ip - 1], "Can only call functions and classes."
+                    )
+            elif op == RETURN:
+                result = pop()
+                if frame.construct:
+                    result = stack[base]
+                if self.__openUpvalues:
+                    self.__closeUpvalues(base)
+                frames.pop()
+                if not frames:
+                    del stack[:]
+                    return result
+                del stack[base:]
+                push(result)
+                frame = frames[-1]
+                closure = frame.closure
+                chunk = closure.function.chunk
+                code = chunk.code
+                constants = chunk.constants
+                tokens = chunk.tokens
+                base = frame.base
+                ip = frame.ip
+            elif op == GET_PROPERTY:
+                instance = stack[-1]
+                if not isinstance(instance, ObjInstance):
+                    raise PloxRuntimeError(
+                        tokens[ip], "Only instances have properties."
+                    )
+                name = constants[code[ip]]
+                if name in instance.fields:
+                    stack[-1] = instance.fields[name]
+                else:
+                    method = instance.klass.methods.get(name)
+                    if method is None:
+                        raise PloxRuntimeError(
+                            tokens[ip], f"Undefined property {name}."
+                        )
+                    stack[-1] = ObjBoundMethod(instance, method)
+                ip += 1
+            elif op == SET_PROPERTY:
+                instance = stack[-2]
+                if not isinstance(instance, ObjInstance):
+                    raise PloxRuntimeError(tokens[ip], "Only instances have fields.")
+                value = pop()
+                instance.fields[constants[code[ip]]] = value
+                stack[-1] = value
+                ip += 1
+            elif op == GREATER:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left > right
+                else:
+                    checkNumberOperands(tokens[ip - 1], left, right)
+                    stack[-1] = float(left) > float(right)
+            elif op == GREATER_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left >= right
+                else:
+                    checkNumberOperands(tokens[ip - 1], left, right)
+                    stack[-1] = float(left) >= float(right)
+            elif op == LESS_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left <= right
+                else:
+                    checkNumberOperands(tokens[ip - 1], left, right)
+                    stack[-1] = float(left) <= float(right)
+            elif op == MULTIPLY:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left * right
+                else:
+                    checkNumberOperands(tokens[ip - 1], left, right)
+                    stack[-1] = float(left) * float(right)
+            elif op == DIVIDE:
+                right = pop()
+                left = stack[-1]
+                checkNumberOperands(tokens[ip - 1], left, right)
+                if right == 0:
+                    raise PloxRuntimeError(tokens[ip - 1], "Cannot divide by zero.")
+                stack[-1] = float(left) / float(right)
+            elif op == EQUAL:
+                right = pop()
+                stack[-1] = isEqual(stack[-1], right)
+            elif op == NOT_EQUAL:
+                right = pop()
+                stack[-1] = not isEqual(stack[-1], right)
+            elif op == NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+            elif op == NEGATE:
+                value = stack[-1]
+                if not isinstance(value, (float, int)):
+                    raise PloxRuntimeError(tokens[ip - 1], "Operand must be a number.")
+                stack[-1] = -float(value)
+            elif op == NIL:
+                push(None)
+            elif op == TRUE:
+                push(True)
+            elif op == FALSE:
+                push(False)
+            elif op == JUMP:
+                ip += code[ip] + 1
+            elif op == JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip += code[ip] + 1
+                else:
+                    ip += 1
+            elif op == JUMP_IF_TRUE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip += 1
+                else:
+                    ip += code[ip] + 1
+            elif op == PRINT:
+                print(stringify(pop()))
+            elif op == DEFINE_GLOBAL:
+                globals[constants[code[ip]]] = pop()
+                ip += 1
+            elif op == SET_GLOBAL:
+                name = constants[code[ip]]
+                if name not in globals:
+                    raise PloxRuntimeError(tokens[ip], f"Undefined variable '{name}'.")
+                globals[name] = stack[-1]
+                ip += 1
+            elif op == CLOSURE:
+                function: ObjFunction = constants[code[ip]]
+                ip += 1
+                upvalues = []
+                for _ in range(function.upvalueCount):
+                    isLocal = code[ip]
+                    index = code[ip + 1]
+                    ip += 2
+                    if isLocal:
+                        upvalues.append(self.__captureUpvalue(base + index))
+                    else:
+                        upvalues.append(closure.upvalues[index])
+                push(ObjClosure(function, upvalues))
+            elif op == CLOSE_UPVALUE:
+                self.__closeUpvalues(len(stack) - 1)
+                pop()
+            elif op == GET_SUPER:
+                superclass = pop()
+                name = constants[code[ip]]
+                method = superclass.methods.get(name)
+                if method is None:
+                    raise PloxRuntimeError(tokens[ip], f"Undefined property {name}.")
+                stack[-1] = ObjBoundMethod(stack[-1], method)
+                ip += 1
+            elif op == CLASS:
+                push(ObjClass(constants[code[ip]]))
+                ip += 1
+            elif op == INHERIT:
+                superclass = stack[-2]
+                if not isinstance(superclass, ObjClass):
+                    raise PloxRuntimeError(
+                        tokens[ip - 1], "Superclass must be a class."
+                    )
+                subclass = pop()
+                subclass.methods.update(superclass.methods)
+            elif op == METHOD:
+                method = pop()
+                stack[-1].methods[constants[code[ip]]] = method
+                ip += 1
+            else:
+                raise RuntimeError(f"Unknown opcode {op}.")
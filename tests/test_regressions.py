@@ -0,0 +1,161 @@
+"""Programs that once ran differently on some engine or optimization level, run
+through `plox.py` on every engine at every level."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PLOX = Path(__file__).resolve().parent.parent / "src" / "plox.py"
+
+ENGINES = ["interpreter", "closure", "vm", "python"]
+LEVELS = ["-O0", "-O1", "-O2"]
+
+
+def run(tmp_path: Path, source: str, *options: str) -> str:
+    script = tmp_path / "script.lox"
+    script.write_text(source)
+    result = subprocess.run(
+        [sys.executable, str(PLOX), *options, str(script)],
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert "Traceback" not in result.stderr, result.stderr
+    return result.stdout
+
+
+@pytest.mark.parametrize("level", LEVELS)
+@pytest.mark.parametrize("engine", ENGINES)
+def test_top_level_loop_split_by_hoisting(tmp_path, engine, level):
+    source = "var q = 0; var z = 1; while (q < 2) { print 1 / z; q = q + 1; }\n"
+    assert run(tmp_path, source, "--engine", engine, level) == "1\n1\n"
+
+
+@pytest.mark.parametrize("level", LEVELS)
+@pytest.mark.parametrize("engine", ENGINES)
+def test_zeros_of_either_sign_kept_apart(tmp_path, engine, level):
+    source = "print -0;\nprint 0;\nprint -0.0;\nprint 0.0;\nprint -0;\n"
+    assert run(tmp_path, source, "--engine", engine, level) == "-0\n0\n-0\n0\n-0\n"
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        ["--engine", "interpreter"],
+        ["--engine", "closure"],
+        ["--engine", "interpreter", "--jit", "--jit-calls", "1"],
+    ],
+)
+def test_native_error_in_tail_call_reported_at_call(tmp_path, options):
+    source = (
+        "fun f() {}\n"
+        "fun g(x) {\n"
+        "  return memo(x);\n"
+        "}\n"
+        "g(f);\n"
+        "g(f);\n"
+        "g(f);\n"
+        "g(1);\n"
+    )
+    output = run(tmp_path, source, *options)
+    assert "Can only memoize functions. at line 3" in output
+
+
+@pytest.mark.parametrize("level", LEVELS)
+@pytest.mark.parametrize("engine", ["interpreter", "closure"])
+def test_memo_rejects_function_calling_impure_one(tmp_path, engine, level):
+    source = (
+        "fun log(x) { print x; }\n"
+        "fun f(x) { log(x); return x; }\n"
+        "fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }\n"
+        "fib = memo(fib);\n"
+        "print fib(30);\n"
+        "memo(f);\n"
+    )
+    output = run(tmp_path, source, "--engine", engine, level)
+    assert output.startswith("832040\n")
+    assert "Can only memoize pure functions. at line 6" in output
+
+
+@pytest.mark.parametrize("level", LEVELS)
+@pytest.mark.parametrize("engine", ["interpreter", "closure"])
+def test_memo_rejects_function_reading_assigned_global(tmp_path, engine, level):
+    source = "var k = 1;\n" "fun addk(x) { return x + k; }\n" "var ma = memo(addk);\n"
+    output = run(tmp_path, source, "--engine", engine, level)
+    assert "Can only memoize pure functions. at line 3" in output
+
+
+@pytest.mark.parametrize("level", LEVELS)
+@pytest.mark.parametrize("engine", ["interpreter", "closure"])
+def test_memo_rejects_function_reading_fields(tmp_path, engine, level):
+    source = (
+        "class P {}\n"
+        "var p = P();\n"
+        "p.x = 1;\n"
+        "fun getx(o) { return o.x; }\n"
+        "var mg = memo(getx);\n"
+    )
+    output = run(tmp_path, source, "--engine", engine, level)
+    assert "Can only memoize pure functions. at line 5" in output
+
+
+@pytest.mark.parametrize("engine", ["interpreter", "closure"])
+def test_memo_rejects_closure_reading_assigned_variable(tmp_path, engine):
+    source = (
+        "fun make(c) { fun f(x) { return x + c; } return f; }\n"
+        "fun bump(c) { fun f(x) { return x + c; } c = c + 1; return f; }\n"
+        "print memo(make(1))(1);\n"
+        "memo(bump(1));\n"
+    )
+    output = run(tmp_path, source, "--engine", engine)
+    assert output.startswith("2\n")
+    assert "Can only memoize pure functions. at line 4" in output
+
+
+@pytest.mark.parametrize("engine", ["interpreter", "closure"])
+def test_memo_accepts_function_calling_earlier_declaration_when_streamed(
+    tmp_path, engine
+):
+    source = (
+        "fun g(x) { return x * 2; }\n"
+        "fun f(x) { return g(x) + 1; }\n"
+        "print memo(f)(3);\n"
+        "g = 5;\n"
+        "memo(f);\n"
+    )
+    output = run(tmp_path, source, "--engine", engine, "--stream")
+    assert output.startswith("7\n")
+    assert "Can only memoize pure functions. at line 5" in output
+
+
+@pytest.mark.parametrize("engine", ["interpreter", "closure"])
+def test_memo_keeps_zeros_of_either_sign_apart(tmp_path, engine):
+    source = (
+        "fun id(x) { return x; }\n"
+        "var m = memo(id);\n"
+        "var a = 0.5 * 0;\n"
+        "var b = -0.5 * 0;\n"
+        "print m(a);\n"
+        "print m(b);\n"
+    )
+    assert run(tmp_path, source, "--engine", engine) == "0\n-0\n"
+
+
+@pytest.mark.parametrize("level", LEVELS)
+@pytest.mark.parametrize("engine", ENGINES)
+def test_bound_methods_are_only_equal_to_themselves(tmp_path, engine, level):
+    source = (
+        "class A { m() { return 1; } }\n"
+        "class B < A { m() { return super.m; } }\n"
+        "var a = A();\n"
+        "var f = a.m;\n"
+        "var b = B();\n"
+        "print a.m == a.m;\n"
+        "print f == f;\n"
+        "print b.m() == b.m();\n"
+        "print f() + b.m()();\n"
+    )
+    output = run(tmp_path, source, "--engine", engine, level)
+    assert output.split() == ["False", "True", "False", "2"]
@@ -4,6 +4,22 @@ from pathlib import Path
 
 import black
 
+# Resolved location of a variable: `depth` and `slot` for the Environment
+# based engines, `access` and `index` for the interpreter's flat frames.
+VARIABLE_ANNOTATIONS = [
+    "Optional[int] depth = None",
+    "Optional[int] slot = None",
+    "AccessType access = AccessType.GLOBAL",
+    "Optional[int] index = None",
+]
+
+DECLARATION_ANNOTATIONS = [
+    "Optional[int] slot = None",
+    "Optional[int] index = None",
+    "bool captured = False",
+    "bool assigned = False",
+]
+
 
 class GenerateAst:
     def __init__(self, outputdir):
@@ -28,7 +44,28 @@ class GenerateAst:
                 "Unary    : Token operator, Expr right",
                 "Variable : Token name",
             ],
-            imports={"typing": ["Any"], "scanner.token": ["Token"]},
+            imports={
+                "typing": ["Any", "Optional"],
+                "resolver.accessType": ["AccessType"],
+                "runtime.inlineCache": ["InlineCache"],
+                "scanner.token": ["Token"],
+            },
+            annotations={
+                "Assign": VARIABLE_ANNOTATIONS,
+                "Call": [
+                    "bool tail = False",
+                    "Any cachedCallee = None",
+                    "int cachedVersion = -1",
+                ],
+                "Get": ["InlineCache cache = InlineCache()"],
+                "Super": VARIABLE_ANNOTATIONS
+                + [
+                    "Optional[This] receiver = None",
+                    "InlineCache cache = InlineCache()",
+                ],
+                "This": VARIABLE_ANNOTATIONS,
+                "Variable": VARIABLE_ANNOTATIONS,
+            },
         )
 
         self.__defineAst(
@@ -46,9 +83,30 @@ class GenerateAst:
                 "While      : Expr condition, Stmt body",
             ],
             imports={
-                "typing": ["Optional"],
+                "typing": ["Callable", "Optional"],
                 "parser.expr": ["Expr", "Variable"],
                 "scanner.token": ["Token"],
+                "optimizer.countedLoop": ["CountedLoop"],
+            },
+            annotations={
+                "Block": [
+                    "int size = 0",
+                    "int frameSize = 0",
+                    "bool escapes = False",
+                ],
+                "Class": DECLARATION_ANNOTATIONS
+                + ["Optional[int] superIndex = None", "int frameSize = 0"],
+                "Function": DECLARATION_ANNOTATIONS
+                + [
+                    "int size = 0",
+                    "int frameSize = 0",
+                    "list[tuple[bool, int]] upvalues = []",
+                    "list[int] cells = []",
+                    "bool pure = True",
+                    "Optional[Callable] compiled = None",
+                ],
+                "Var": DECLARATION_ANNOTATIONS,
+                "While": ["Optional[CountedLoop] counted = None"],
             },
         )
 
@@ -59,13 +117,21 @@ class GenerateAst:
 
         Path.mkdir(self.outputdir, parents=True)
 
-    def __defineAst(self, base_name: str, types: list, imports: dict[str, list]):
+    def __defineAst(
+        self,
+        base_name: str,
+        types: list,
+        imports: dict[str, list],
+        annotations: dict[str, list],
+    ):
         """
         Create new AST class
 
         :param base_name: Base class, E.g: Expr or Stmt
         :param types: A list of types that will be implemented
         :param imports: A list of imports that will be created in the top of the file
+        :param annotations: Fields per type that are not constructor arguments but
+            are filled in by later passes, E.g: "Optional[int] depth = None"
         """
 
         lines = [
@@ -97,7 +163,11 @@ class GenerateAst:
             fields = (
                 class_type.split(":")[1].strip().replace("<", "[").replace(">", "]")
             )
-            lines.extend(self.__defineType(base_name, class_name, fields))
+            lines.extend(
+                self.__defineType(
+                    base_name, class_name, fields, annotations.get(class_name, [])
+                )
+            )
 
         self.__writeFile(base_name, lines)
 
@@ -129,7 +199,9 @@ class GenerateAst:
 
         return vistor_lines
 
-    def __defineType(self, base_name: str, class_name: str, fields_list: str) -> list:
+    def __defineType(
+        self, base_name: str, class_name: str, fields_list: str, annotations: list
+    ) -> list:
         # __init__ method
         fields = [field.strip().split() for field in fields_list.split(", ")]
 
@@ -143,6 +215,11 @@ class GenerateAst:
         for field in fields:
             lines.append(f"        self.{field[1]} = {field[1]}")
 
+        for annotation in annotations:
+            declaration, default = annotation.split(" = ")
+            field_type, field_name = declaration.rsplit(" ", 1)
+            lines.append(f"        self.{field_name}: {field_type} = {default}")
+
         # add the visit method
         visitor_method = [
             "",